@@ -0,0 +1,56 @@
+"""
+Benchmark of the bitboard engine (`model.bitboard.BitBoard`) against MineBoard (the object and the packed storage)
+on the common board sizes: generating a board, flooding an empty board, and playing whole games with random clicks.
+Both engines generate the same boards from the same seeds, so the games are the same, too.
+
+Usage:
+    python -m benchmarks.bitboard [games]
+"""
+import random
+import sys
+import time
+from typing import Callable
+
+from model.bitboard import BitBoard
+from model.board import MineBoard
+
+# width, height, number of mines
+SIZES = ((9, 9, 10), (16, 16, 40), (30, 16, 99), (64, 64, 600))
+
+ENGINES = (("objects", MineBoard),
+           ("packed", lambda *args, **kwargs: MineBoard(*args, packed=True, **kwargs)),
+           ("bitboard", BitBoard))
+
+
+def best_time(run: Callable[[], None], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def play(engine, width: int, height: int, mines: int, seed: int) -> None:
+    """
+    Play a game with random clicks (the mines are avoided after the first click) until it is over.
+    """
+    board = engine(width, height, mines, rng=random.Random(seed), lazy=True)
+    rnd = random.Random(seed)
+    while not board.game_over:
+        x, y = rnd.randrange(width), rnd.randrange(height)
+        if board.pending_mines or not board.is_mine_at(x, y):
+            board.uncover(x, y)
+
+
+if __name__ == '__main__':
+    GAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    print(f"{'board':>14} {'engine':>9} {'generate':>12} {'flood':>12} {'game':>12}")
+    for width, height, mines in SIZES:
+        for name, engine in ENGINES:
+            generate = best_time(lambda: [engine(width, height, mines, rng=random.Random(s)) for s in range(GAMES)])
+            flood = best_time(lambda: [engine(width, height).uncover(0, 0) for _ in range(GAMES)])
+            game = best_time(lambda: [play(engine, width, height, mines, s) for s in range(GAMES)], repeat=1)
+            print(f"{width:>5}x{height:<3}/{mines:<4} {name:>9} {generate / GAMES * 1e3:9.3f} ms "
+                  f"{flood / GAMES * 1e3:9.3f} ms {game / GAMES * 1e3:9.3f} ms")
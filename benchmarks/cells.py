@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of the object storage: a Cell instance per square (how the boards used to be filled) vs the shared
+cells (copy-on-write, see `model.cell.CellRow`). Both the build time and the memory held by the board are measured,
+for an empty board and for a board with mines.
+The boards with a cell per square are measured with the current Cell (with `__slots__`) and with LegacyCell,
+a copy of the Cell layout before the slots (an instance `__dict__`), which gives the numbers of the old boards.
+
+Usage:
+    python -m benchmarks.cells [width] [height] [density]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from model.board import MineBoard
+from model.cell import Cell
+
+
+def measure(build):
+    """
+    Build a board and measure how much memory it holds and how long it took to build.
+    The board is built twice: the time is measured without tracing the allocations (it slows them down a lot).
+    :param build:
+    :return: allocated bytes, build time in seconds
+    """
+    start = time.perf_counter()
+    board = build()
+    elapsed = time.perf_counter() - start
+    del board
+
+    tracemalloc.start()
+    board = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+    return allocated, elapsed
+
+
+class LegacyCell:
+    """
+    The cell as it was before `__slots__` (the state is kept in the instance `__dict__`).
+    """
+
+    def __init__(self, has_mine: bool = False, no_adjacent_mines: int = 0):
+        self.has_mine = has_mine
+        self.no_adjacent_mines: int = no_adjacent_mines
+        self.flagged: bool = False
+        self.uncovered: bool = False
+
+
+def cell_per_square(width: int, height: int, mines: int) -> MineBoard:
+    """
+    Build a board and give every square a Cell of its own (modifying a cell copies the shared one).
+    """
+    board = MineBoard(width, height, mines, rng=random.Random(1))
+    for row in board.cells:
+        for c in row:
+            c.flagged = False
+    return board
+
+
+def legacy_cell_per_square(width: int, height: int, mines: int) -> MineBoard:
+    """
+    Build a board and give every square a LegacyCell of its own (in the same state).
+    """
+    board = MineBoard(width, height, mines, rng=random.Random(1))
+    for row in board.cells:
+        for x, c in enumerate(row):
+            row[x] = LegacyCell(c.has_mine, c.no_adjacent_mines)
+    return board
+
+
+if __name__ == '__main__':
+    WIDTH = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    HEIGHT = int(sys.argv[2]) if len(sys.argv) > 2 else WIDTH
+    DENSITY = float(sys.argv[3]) if len(sys.argv) > 3 else 0.15
+
+    print(f"board: {WIDTH}x{HEIGHT}, Cell instance: {sys.getsizeof(Cell())} B")
+    for mines in (0, int(WIDTH * HEIGHT * DENSITY)):
+        for name, build in (("legacy cells", lambda: legacy_cell_per_square(WIDTH, HEIGHT, mines)),
+                            ("cell per square", lambda: cell_per_square(WIDTH, HEIGHT, mines)),
+                            ("shared cells", lambda: MineBoard(WIDTH, HEIGHT, mines, rng=random.Random(1)))):
+            allocated, elapsed = measure(build)
+            print(f"{mines:>8} mines, {name:>15}: {allocated / 2 ** 20:10.2f} MiB {elapsed:8.3f} s")
@@ -0,0 +1,77 @@
+"""
+Load generator for the game session server (see `server.py`): plays random games over many connections
+and reports the move latency.
+
+Usage:
+    python -m benchmarks.loadgen [--host HOST] [--port PORT] [--connections N] [--games N] [--moves N]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+
+async def play(host: str, port: int, games: int, moves: int, seed: int, latencies: List[float]) -> None:
+    """
+    Play random games over a single connection, recording the latency of every move.
+    """
+    rnd = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    request_id = 0
+
+    async def call(request: dict) -> dict:
+        nonlocal request_id
+        request_id += 1
+        request["id"] = request_id
+        start = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        return response
+
+    try:
+        for _ in range(games):
+            width, height, mines = rnd.choice(((9, 9, 10), (16, 16, 40), (30, 16, 99)))
+            response = await call({"cmd": "new", "width": width, "height": height, "mines": mines,
+                                   "seed": rnd.getrandbits(32)})
+            game = response["game"]
+            for _ in range(moves):
+                cmd = rnd.choice(("uncover", "uncover", "uncover", "flag", "chord"))
+                response = await call({"cmd": cmd, "game": game, "x": rnd.randrange(width),
+                                       "y": rnd.randrange(height)})
+                if response.get("ok") and (response["status"]["won"] or response["status"]["lost"]):
+                    break
+            await call({"cmd": "close", "game": game})
+    finally:
+        writer.close()
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def main(host: str, port: int, connections: int, games: int, moves: int) -> None:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(play(host, port, games, moves, seed, latencies) for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    print(f"requests: {len(latencies)} in {elapsed:.2f} s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.3f} ms")
+    print(f"latency p99: {percentile(latencies, 99) * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load generator for the game session server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--games", type=int, default=20, help="games played over every connection")
+    parser.add_argument("--moves", type=int, default=50, help="maximum number of moves in a game")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.host, args.port, args.connections, args.games, args.moves))
@@ -0,0 +1,44 @@
+"""
+Compare memory usage and build time of the board storages on an empty board: the object storage (shared cells,
+see `model.cell.CellRow`), the packed storage, and - as the baseline - the layout the object storage used to have,
+a Cell instance per square (with the current Cell and with LegacyCell, the Cell before `__slots__`).
+
+Usage (from the repository root; the script imports the `model` package, so it is run as a module,
+`python benchmarks/memory.py` does not find it):
+    python -m benchmarks.memory [width] [height]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.cells import cell_per_square, legacy_cell_per_square
+from model.board import MineBoard
+
+
+def measure(build):
+    """
+    Build a board and measure how much memory it holds and how long it took to build.
+    :param build:
+    :return: allocated bytes, build time in seconds
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    mb = build()
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del mb
+    return allocated, elapsed
+
+
+if __name__ == '__main__':
+    WIDTH = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    HEIGHT = int(sys.argv[2]) if len(sys.argv) > 2 else WIDTH
+
+    print(f"board: {WIDTH}x{HEIGHT}")
+    for name, build in (("legacy cells", lambda: legacy_cell_per_square(WIDTH, HEIGHT, 0)),
+                        ("cell per square", lambda: cell_per_square(WIDTH, HEIGHT, 0)),
+                        ("objects", lambda: MineBoard(WIDTH, HEIGHT)),
+                        ("packed", lambda: MineBoard(WIDTH, HEIGHT, packed=True))):
+        allocated, elapsed = measure(build)
+        print(f"{name:>15}: {allocated / 2 ** 20:10.2f} MiB {elapsed:8.3f} s")
@@ -0,0 +1,187 @@
+"""
+Benchmark suite for the board hot paths: generation, flood fill, mine planting, rendering and game replay.
+
+Every benchmark is run a few times and the best time is taken. The results can be saved as JSON and compared
+against a stored baseline; the exit code is non-zero if any benchmark got slower than the tolerance allows.
+
+Usage:
+    python -m benchmarks.suite [--output results.json] [--baseline benchmarks/baseline.json] [--tolerance 0.25]
+    python -m benchmarks.suite --save-baseline
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from model.board import MineBoard
+from model.movelog import replay
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def measure(setup: Callable[[], object], run: Callable[[object], None], repeat: int) -> float:
+    """
+    Get the best time of `run` (the state returned by `setup` is created anew for every run and not timed).
+
+    :param setup:
+    :param run:
+    :param repeat:
+    :return: seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmarks() -> List[Tuple[str, Callable[[], object], Callable[[object], None]]]:
+    """
+    Get the benchmarks: name, setup and the measured function.
+    """
+    result = []
+
+    # board generation at several sizes and densities
+    cases = [(9, 9, 0.1), (9, 9, 0.2), (30, 16, 0.1), (30, 16, 0.2), (200, 200, 0.1), (200, 200, 0.2),
+             (1000, 1000, 0.15)]
+    for width, height, density in cases:
+        mines = int(width * height * density)
+        for packed in (False, True):
+            name = f"init/{width}x{height}/{density}/{'packed' if packed else 'objects'}"
+            result.append((name, lambda: None,
+                           lambda _, w=width, h=height, m=mines, p=packed: MineBoard(w, h, m, packed=p,
+                                                                                     rng=random.Random(1))))
+
+    # worst case flood fill: uncovering an empty board reveals all of it
+    for size in (100, 300):
+        for packed in (False, True):
+            name = f"uncover/flood/{size}x{size}/{'packed' if packed else 'objects'}"
+            result.append((name, lambda s=size, p=packed: MineBoard(s, s, packed=p),
+                           lambda mb: mb.uncover(0, 0)))
+
+    # planting the mines one by one
+    def plant_setup(size: int = 200, mines: int = 8000):
+        rnd = random.Random(2)
+        return MineBoard(size, size), rnd.sample([(x, y) for y in range(size) for x in range(size)], mines)
+
+    def plant_run(state):
+        mb, coords = state
+        for x, y in coords:
+            mb.plant_mine(x, y)
+
+    result.append(("plant_mine/200x200/8000", plant_setup, plant_run))
+
+    # clearing a whole board, cell by cell: with flood fills, and with the index of the openings
+    def clear_setup(size: int, packed: bool, index_openings: bool):
+        return MineBoard(size, size, size * size // 8, packed=packed, rng=random.Random(5),
+                         index_openings=index_openings)
+
+    def clear_run(mb):
+        for y in range(mb.height):
+            for x in range(mb.width):
+                if not mb.is_mine_at(x, y) and not mb.cells[y][x].uncovered:
+                    mb.uncover(x, y)
+
+    for packed in (False, True):
+        for index_openings in (False, True):
+            name = f"clear/100x100/{'packed' if packed else 'objects'}/{'indexed' if index_openings else 'flood'}"
+            result.append((name, lambda p=packed, i=index_openings: clear_setup(100, p, i), clear_run))
+
+    # rendering
+    for size in (30, 300):
+        name = f"str/{size}x{size}"
+        result.append((name, lambda s=size: MineBoard(s, s, s * s // 6, rng=random.Random(3)), str))
+
+    # replaying logged games (see `model.movelog`): many short games, and one long game
+    def replay_setup(games: int, width: int, height: int, mines: int, moves: int):
+        log = io.BytesIO()
+        rnd = random.Random(4)
+        for _ in range(games):
+            mb = MineBoard(width, height, mines, rng=random.Random(rnd.getrandbits(32)), lazy=True)
+            mb.record_moves(log)
+            for _ in range(moves):
+                x, y = rnd.randrange(width), rnd.randrange(height)
+                if mb.cells[y][x].uncovered:
+                    mb.chord(x, y)
+                elif rnd.random() < 0.2:
+                    mb.flag(x, y, not mb.cells[y][x].flagged)
+                elif mb.pending_mines or not mb.is_mine_at(x, y):
+                    mb.uncover(x, y)
+        log.seek(0)
+        return log
+
+    def replay_run(log):
+        for _ in replay(log):
+            pass
+
+    result.append(("replay/9x9/1000 games", lambda: replay_setup(1000, 9, 9, 10, 50), replay_run))
+    result.append(("replay/30x16/100000 moves", lambda: replay_setup(1, 30, 16, 99, 100000), replay_run))
+
+    return result
+
+
+def run_all(repeat: int, only: str = None) -> Dict[str, float]:
+    results = {}
+    for name, setup, run in benchmarks():
+        if only and only not in name:
+            continue
+        results[name] = measure(setup, run, repeat)
+        print(f"{name:45} {results[name] * 1000:10.3f} ms", file=sys.stderr)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """
+    Find the benchmarks that got slower than the baseline (by more than the tolerance).
+
+    :return: descriptions of the regressions
+    """
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = seconds / base
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {base * 1000:.3f} ms -> {seconds * 1000:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks of the board hot paths.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="run only the benchmarks with names containing the text")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline to compare the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 means 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": run_all(args.repeat, args.only),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        sys.exit(0)
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            found = compare(report["results"], json.load(f)["results"], args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if found else 0)
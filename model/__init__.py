@@ -1,5 +1,4 @@
 # set to True for debugging
 REVEAL_HIDDEN_MINE = True
 
-# DEBUG_INFO = True
-DEBUG_INFO = False
+# instrumentation (counters and timing of the board methods) is switched on with `model.instrumentation.enable()`
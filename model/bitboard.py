@@ -0,0 +1,501 @@
+"""
+Bitboard engine for small (up to MAX_SIZE x MAX_SIZE) rectangular boards.
+
+The layers of the board (mines, uncovered cells, flags) are Python integers used as bit sets: the cell (x, y)
+is the bit `y * width + x`. The operations work on whole layers at once:
+    * the neighbourhood of a set of cells is its dilation: the layer shifted by one column both ways
+      (masked, so the rows don't wrap around), then the result shifted by one row both ways,
+    * the numbers of adjacent mines are kept bit-sliced, in four layers holding the bits of the counts;
+      they are summed with bitwise full adders (the row sums of the shifted mine layer first, then the sums
+      of the rows above and below),
+    * the flood fill is a breadth-first dilation: the newly revealed cells without adjacent mines are
+      dilated again, until there are none.
+
+BitBoard has the same game API as MineBoard (`uncover`, `expand`, `flag`, `plant_mine(s)`, `is_mine_at`,
+`status`), generates the same boards from the same seeds, and serializes to the same binary format
+(`to_bytes` output can be read with `MineBoard.from_bytes` and vice versa).
+Only the rectangle topology is supported. `cell` gives a copy of the cell state (there are no Cell instances
+to modify).
+"""
+import random
+from typing import Iterable, List, Sequence, Tuple
+
+from model import REVEAL_HIDDEN_MINE, instrumentation
+from model.board import MineBoard, BoardHeader, GameStatus, BOARD_HEADER, BOARD_MAGIC, BOARD_FORMAT_VERSION, \
+    BOARD_FLAG_SAFE_NEIGHBOURHOOD, sample_positions
+from model.cell import Cell
+from model.neighbours import RECTANGLE, rectangle_neighbours
+from model.packed import MINE_BIT, FLAG_BIT, UNCOVERED_BIT, COUNT_SHIFT
+
+# maximum width and height of the board
+MAX_SIZE = 64
+
+# binary digits to bytes 0 and 1
+DIGIT_VALUES = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def full_adder(a: int, b: int, c: int) -> Tuple[int, int]:
+    """
+    Add three layers bitwise.
+
+    :param a:
+    :param b:
+    :param c:
+    :return: sum and carry layers
+    """
+    return a ^ b ^ c, (a & b) | (c & (a ^ b))
+
+
+def spread(bits: int, size: int) -> int:
+    """
+    Spread the bits of a layer to bytes: the byte `i` (counted from the lowest one) of the result is the bit `i`
+    of the layer. The bytes of the spread layers can be added and multiplied by small numbers (as long as they
+    stay below 256) to combine the layers, without looping over the cells.
+
+    :param bits:
+    :param size: number of cells
+    :return:
+    """
+    return int.from_bytes(format(bits, f"0{size}b").encode().translate(DIGIT_VALUES), "big")
+
+
+def bit_coords(bits: int, width: int) -> List[Tuple[int, int]]:
+    """
+    Get coordinates of the cells of a layer (row after row).
+
+    :param bits:
+    :param width:
+    :return:
+    """
+    coords = []
+    while bits:
+        low = bits & -bits
+        i = low.bit_length() - 1
+        coords.append((i % width, i // width))
+        bits ^= low
+    return coords
+
+
+class BitBoard:
+    def __init__(self, width: int = 8, height: int = 8, expected_number_of_mines: int = 0,
+                 rng: random.Random = None, lazy: bool = False, safe_neighbourhood: bool = False):
+        if not (0 < width <= MAX_SIZE and 0 < height <= MAX_SIZE):
+            raise RuntimeError(f"Invalid board size ({width}x{height}) for the bitboard engine.")
+        self.width: int = width
+        self.height: int = height
+        self.topology = RECTANGLE
+
+        # source of randomness for mine generation (the same boards as MineBoard generates for the same seeds)
+        # (None: the global `random` generator; the module is not stored, so the board can be pickled)
+        self.rng = rng
+
+        self.expected_number_of_mines = expected_number_of_mines
+        self.number_of_mines = 0
+
+        # game status counters (see `status`)
+        self.number_of_uncovered = 0
+        self.number_of_flags = 0
+        self.number_of_triggered_mines = 0
+
+        # lazy mode: the mines are placed on the first `uncover` (see `MineBoard`)
+        self.safe_neighbourhood: bool = safe_neighbourhood
+        self.pending_mines: int = 0
+
+        # the layers: a bit per cell
+        self.mines: int = 0
+        self.uncovered: int = 0
+        self.flags: int = 0
+
+        # masks: all the cells, all the cells but the first (last) column
+        self.__full = (1 << width * height) - 1
+        first_column = sum(1 << y * width for y in range(height))
+        self.__not_first_column = self.__full & ~first_column
+        self.__not_last_column = self.__full & ~(first_column << width - 1)
+
+        # numbers of adjacent mines, bit-sliced: bits 0..3 of the counts (see `__count_mines`)
+        self.__counts: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        # the same, a byte per cell (built when needed, see `cell`)
+        self.__count_bytes: bytes = None
+        # cells without mines and without adjacent mines
+        self.__empty: int = self.__full
+
+        if lazy:
+            field_cnt: int = width * height
+            if not 0 <= expected_number_of_mines <= field_cnt - 1:
+                raise RuntimeError(
+                    f"Invalid mine count ({expected_number_of_mines}) for the lazy board ({field_cnt} cells).")
+            self.pending_mines = expected_number_of_mines
+        elif expected_number_of_mines > 0:
+            self.__generate_mines(expected_number_of_mines)
+
+    def __str__(self):
+        return '\n'.join(
+            ''.join(self.cell(x, y).get_representation(reveal_hidden_mine=REVEAL_HIDDEN_MINE)
+                    for x in range(self.width)) for y in range(self.height)
+        ) + '\n'
+
+    def __repr__(self):
+        return f"BitBoard({self.width}x{self.height}, no_of_mines: {self.number_of_mines})"
+
+    def header(self) -> BoardHeader:
+        """
+        Get the header of the binary board format describing this board (see `MineBoard.header`).
+
+        :return:
+        """
+        return BoardHeader(BOARD_MAGIC, BOARD_FORMAT_VERSION,
+                           BOARD_FLAG_SAFE_NEIGHBOURHOOD if self.safe_neighbourhood else 0,
+                           self.width, self.height,
+                           self.number_of_mines, self.expected_number_of_mines, self.pending_mines,
+                           self.number_of_uncovered, self.number_of_flags, self.number_of_triggered_mines)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the board in the binary board format (the same as `MineBoard.to_bytes`).
+
+        :return:
+        """
+        size = self.width * self.height
+        # the spread layers combined into the packed cells (see `model.packed`)
+        cells = (spread(self.mines, size) * MINE_BIT + spread(self.uncovered, size) * UNCOVERED_BIT
+                 + spread(self.flags, size) * FLAG_BIT + self.__spread_counts() * (1 << COUNT_SHIFT))
+        return BOARD_HEADER.pack(*self.header()) + cells.to_bytes(size, "little")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BitBoard':
+        """
+        Restore a board serialized in the binary board format (i.e. with `MineBoard.to_bytes`).
+        The numbers of adjacent mines are recomputed from the mines.
+
+        :param data:
+        :return:
+        """
+        header = MineBoard.read_header(data)
+        if header.flags & ~BOARD_FLAG_SAFE_NEIGHBOURHOOD:
+            raise RuntimeError("Only the rectangle boards can be restored in the bitboard engine.")
+        width, height = header.width, header.height
+        cells = data[BOARD_HEADER.size:BOARD_HEADER.size + width * height]
+        if len(cells) != width * height:
+            raise RuntimeError("Invalid board data (truncated cells).")
+
+        def layer(bit: int) -> int:
+            # the cells as binary digits, the last cell first
+            digits = bytes(cells[::-1]).translate(bytes(49 if value & bit else 48 for value in range(256)))
+            return int(digits, 2) if digits else 0
+
+        board = cls(width, height)
+        board.mines = layer(MINE_BIT)
+        board.uncovered = layer(UNCOVERED_BIT)
+        board.flags = layer(FLAG_BIT)
+        board.__count_mines()
+        board.number_of_mines = header.number_of_mines
+        board.expected_number_of_mines = header.expected_number_of_mines
+        board.pending_mines = header.pending_mines
+        board.number_of_uncovered = header.number_of_uncovered
+        board.number_of_flags = header.number_of_flags
+        board.number_of_triggered_mines = header.number_of_triggered_mines
+        board.safe_neighbourhood = bool(header.flags & BOARD_FLAG_SAFE_NEIGHBOURHOOD)
+        return board
+
+    @property
+    def status(self) -> GameStatus:
+        """
+        Get the game status (see `MineBoard.status`).
+
+        :return:
+        """
+        remaining = self.width * self.height - self.number_of_mines - self.pending_mines - self.number_of_uncovered
+        lost = self.number_of_triggered_mines > 0
+        return GameStatus(self.number_of_uncovered, self.number_of_flags, self.number_of_triggered_mines,
+                          remaining, remaining == 0 and not lost, lost)
+
+    @property
+    def game_over(self) -> bool:
+        return (self.number_of_triggered_mines > 0
+                or self.number_of_uncovered == self.width * self.height - self.number_of_mines - self.pending_mines)
+
+    def is_valid_row(self, y: int) -> bool:
+        return self.height > y >= 0
+
+    def is_valid_col(self, x: int) -> bool:
+        return 0 <= x < self.width
+
+    def neighbours(self, x: int, y: int) -> Sequence[Tuple[int, int]]:
+        """
+        Get coordinates of the cells adjacent to the given one.
+
+        :param x:
+        :param y:
+        :return:
+        """
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+        return rectangle_neighbours(x, y, self.width, self.height)
+
+    def __spread_counts(self) -> int:
+        """
+        Get the numbers of adjacent mines, spread to bytes (see `spread`); the counts of the mines are 0.
+
+        :return:
+        """
+        size, mines = self.width * self.height, self.mines
+        return sum(spread(bits & ~mines, size) << n for n, bits in enumerate(self.__counts))
+
+    def cell(self, x: int, y: int) -> Cell:
+        """
+        Get a copy of the cell state at given location.
+
+        :param x:
+        :param y:
+        :return:
+        """
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+        return self.__cell(y * self.width + x)
+
+    def __cell(self, i: int) -> Cell:
+        """
+        Get a copy of the cell state (the index is not validated).
+
+        :param i: flat index of the cell
+        :return:
+        """
+        if self.__count_bytes is None:
+            self.__count_bytes = self.__spread_counts().to_bytes(self.width * self.height, "little")
+        bit = 1 << i
+        cell = Cell(self.mines & bit != 0, self.__count_bytes[i])
+        cell.uncovered = self.uncovered & bit != 0
+        cell.flagged = self.flags & bit != 0
+        return cell
+
+    def is_mine_at(self, x: int, y: int) -> bool:
+        """
+        Check if there is a mine at given location.
+
+        :param x:
+        :param y:
+        :return:
+        """
+        # the bit index of coordinates out of the board would be negative or point at another row
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+        return bool(self.mines >> (y * self.width + x) & 1)
+
+    def __dilate(self, bits: int) -> int:
+        """
+        Get the cells of the layer together with all their neighbours.
+
+        :param bits:
+        :return:
+        """
+        width = self.width
+        bits |= (bits & self.__not_last_column) << 1 | (bits & self.__not_first_column) >> 1
+        return (bits | bits << width | bits >> width) & self.__full
+
+    def __count_mines(self) -> None:
+        """
+        Compute the numbers of adjacent mines of all the cells, bit-sliced.
+        The row sums (the mine layer and its shifts by a column) are 2-bit numbers; the counts are the sums
+        of the row sums of the row above, the row itself and the row below. The mine itself is counted in its
+        own row sum, which doesn't matter: the counts of the mines are not used.
+
+        :return:
+        """
+        width, full, mines = self.width, self.__full, self.mines
+        # row sums: mine + left neighbour + right neighbour
+        r0, r1 = full_adder(mines, (mines & self.__not_last_column) << 1, (mines & self.__not_first_column) >> 1)
+        # the same row sums, of the row above and of the row below
+        a0, a1 = r0 << width & full, r1 << width & full
+        b0, b1 = r0 >> width, r1 >> width
+        s0, c0 = full_adder(r0, a0, b0)
+        # bit 1: r1 + a1 + b1 + c0 (up to 4), carried to bits 2 and 3
+        t1, c1 = full_adder(r1, a1, b1)
+        s1, c2 = t1 ^ c0, t1 & c0
+        s2, s3 = c1 ^ c2, c1 & c2
+        self.__counts = (s0, s1, s2, s3)
+        self.__count_bytes = None
+        self.__empty = full & ~(mines | s0 | s1 | s2 | s3)
+
+    def __forget_state(self, bits: int) -> None:
+        """
+        Update the layers and the status counters when the cells are about to become covered mines.
+
+        :param bits:
+        :return:
+        """
+        self.number_of_uncovered -= (self.uncovered & bits).bit_count()
+        self.number_of_flags -= (self.flags & bits).bit_count()
+        self.uncovered &= ~bits
+        self.flags &= ~bits
+
+    def plant_mine(self, x: int, y: int):
+        """
+        Place a mine at given location (see `MineBoard.plant_mine`).
+
+        :param x:
+        :param y:
+        :return:
+        """
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+        if self.is_mine_at(x, y):
+            raise RuntimeError(f"There is a mine already placed at ({x}, {y}).")
+
+        bit = 1 << y * self.width + x
+        self.__forget_state(bit)
+        self.mines |= bit
+        self.number_of_mines += 1
+        self.__count_mines()
+
+    def plant_mines(self, mines: Iterable[Tuple[int, int]]):
+        """
+        Place many mines at once (the counts are computed once).
+
+        :param mines: coordinates (x, y) of the mines
+        :return:
+        """
+        bits = 0
+        for x, y in mines:
+            if not (self.is_valid_col(x) and self.is_valid_row(y)):
+                raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+            bit = 1 << y * self.width + x
+            if (bits | self.mines) & bit:
+                raise RuntimeError(f"There is a mine already placed at ({x}, {y}).")
+            bits |= bit
+
+        self.__forget_state(bits)
+        self.mines |= bits
+        self.number_of_mines += bits.bit_count()
+        self.__count_mines()
+
+    def __flood(self, origin: int) -> int:
+        """
+        Reveal the neighbourhood of the origin cell: the newly revealed cells without adjacent mines get their
+        neighbourhoods revealed as well (the same cells as `MineBoard` flood fill reveals). A covered origin is
+        revealed only if an empty neighbour expands back to it.
+
+        :param origin: the bit of the origin cell
+        :return: the revealed cells
+        """
+        covered = self.__full & ~self.uncovered
+        # the cells the fill continues from (the mines have no adjacent mines counted, as in MineBoard)
+        expandable = self.__empty | self.mines
+        front = origin
+        revealed = 0
+        steps = 0
+        while front:
+            steps += 1
+            # the dilation holds the front itself, which is not its own neighbourhood
+            front = self.__dilate(front) & ~front & covered
+            covered ^= front
+            revealed |= front
+            front &= expandable
+
+        self.uncovered |= revealed
+        cleared = self.flags & revealed
+        if cleared:
+            self.flags ^= cleared
+            self.number_of_flags -= cleared.bit_count()
+        mines_revealed = (revealed & self.mines).bit_count()
+        self.number_of_triggered_mines += mines_revealed
+        self.number_of_uncovered += revealed.bit_count() - mines_revealed
+
+        stats = instrumentation.STATS
+        if stats is not None:
+            stats.count("bitboard_floods")
+            stats.count("bitboard_flood_steps", steps)
+        return revealed
+
+    def expand(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """
+        Reveal the neighbourhood of the given cell (flood fill, see `MineBoard.expand`).
+
+        :param x:
+        :param y:
+        :return: list of coordinates of the cells revealed by the expansion (row after row)
+        """
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+        if self.pending_mines:
+            self.__generate_pending_mines(x, y, clear_neighbourhood=True)
+        return bit_coords(self.__flood(1 << y * self.width + x), self.width)
+
+    def uncover(self, x: int, y: int) -> Cell:
+        """
+        Uncover the cell at given location (see `MineBoard.uncover`).
+
+        :param x:
+        :param y:
+        :return: a copy of the uncovered cell
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+
+        if self.pending_mines:
+            self.__generate_pending_mines(x, y)
+
+        bit = 1 << y * self.width + x
+        if not self.uncovered & bit:
+            if self.flags & bit:
+                self.flags ^= bit
+                self.number_of_flags -= 1
+            self.uncovered |= bit
+            if self.mines & bit:
+                self.number_of_triggered_mines += 1
+            else:
+                self.number_of_uncovered += 1
+
+        if self.__empty & bit:
+            self.__flood(bit)
+        return self.__cell(y * self.width + x)
+
+    def flag(self, x: int, y: int, on_off: bool = True) -> Cell:
+        """
+        Set (or clear) the flag on the cell at given location.
+
+        :param x:
+        :param y:
+        :param on_off:
+        :return: a copy of the flagged cell
+        """
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+
+        bit = 1 << y * self.width + x
+        if self.uncovered & bit:
+            raise RuntimeError("Uncovered field cannot be flagged")
+        if bool(self.flags & bit) != on_off:
+            self.flags ^= bit
+            self.number_of_flags += 1 if on_off else -1
+        return self.cell(x, y)
+
+    def __generate_mines(self, expected_number_of_mines: int, excluded: Iterable[int] = ()):
+        """
+        Place given number of mines in random places (the same way as MineBoard does).
+
+        :param expected_number_of_mines:
+        :param excluded: flat indices of the cells that must stay free of mines
+        :return:
+        """
+        shots = sample_positions(self.rng or random, self.width * self.height, expected_number_of_mines, excluded)
+        self.plant_mines((shot % self.width, shot // self.width) for shot in shots)
+
+    def __generate_pending_mines(self, x: int, y: int, clear_neighbourhood: bool = False):
+        """
+        Place the mines of a lazy board (see `MineBoard`).
+
+        :param x:
+        :param y:
+        :param clear_neighbourhood:
+        :return:
+        """
+        width = self.width
+        excluded = {row * width + col for col, row in bit_coords(self.mines, width)}
+        excluded.add(y * width + x)
+        if self.safe_neighbourhood or clear_neighbourhood:
+            neighbourhood = excluded.union(row * width + col for col, row in self.neighbours(x, y))
+            if clear_neighbourhood or self.pending_mines <= width * self.height - len(neighbourhood):
+                excluded = neighbourhood
+
+        self.__generate_mines(self.pending_mines, excluded)
+        self.pending_mines = 0
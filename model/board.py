@@ -1,15 +1,129 @@
 import random
-from typing import Tuple, List
+import struct
+from itertools import product
+from typing import Tuple, List, Iterable, Sequence, Set, Dict, NamedTuple, Callable, Union, Optional
 
-from model import REVEAL_HIDDEN_MINE, DEBUG_INFO
-from model.cell import Cell
+from model import REVEAL_HIDDEN_MINE, instrumentation
+from model.cell import Cell, CellRow, SharedCell, UNTOUCHED_CELL, UNTOUCHED_CELLS, UNTOUCHED_MINE, REVEALED_CELLS
+from model.movelog import MoveLog, MOVE_UNCOVER, MOVE_FLAG, MOVE_UNFLAG, MOVE_CHORD, MOVE_UNCOVER_MANY, MOVE_MINE, \
+    MOVE_GENERATE, MOVE_EXPAND, OUTCOME_MINE_HIT, OUTCOME_GAME_OVER, OUTCOME_BATCH_END
+from model.neighbours import Topology, RectangleTopology, RECTANGLE, get_topology, topology_from_flags, box_ranges
+from model.openings import Openings, board_openings
+from model.packed import PackedCells, MINE_BIT, FLAG_BIT, UNCOVERED_BIT, COUNT_SHIFT, pack_cell, unpack_cell
+
+# binary board format: the header followed by `width * height` bytes of cells (row after row),
+# every cell encoded as in the packed storage (see `model.packed`)
+BOARD_MAGIC = b"MSWB"
+BOARD_FORMAT_VERSION = 1
+BOARD_HEADER = struct.Struct("<4sBBIIQQQQQQ")
+# header flags (the topology is encoded in the flags as well, see `Topology.flag`)
+BOARD_FLAG_SAFE_NEIGHBOURHOOD = 0x01
+
+# the shared cells (see `model.cell.CellRow`) by their encoding, for restoring the boards in the object storage
+SHARED_CELLS_BY_VALUE: Dict[int, Cell] = {pack_cell(c): c for c in UNTOUCHED_CELLS + REVEALED_CELLS + (UNTOUCHED_MINE,)}
+
+
+class BoardHeader(NamedTuple):
+    """
+    Header of the binary board format.
+    """
+    magic: bytes
+    version: int
+    flags: int
+    width: int
+    height: int
+    number_of_mines: int
+    expected_number_of_mines: int
+    pending_mines: int
+    number_of_uncovered: int
+    number_of_flags: int
+    number_of_triggered_mines: int
+
+
+class MovesResult(NamedTuple):
+    """
+    Aggregated result of a batch of moves.
+    """
+    # coordinates of all the cells revealed by the moves (including the expansions)
+    revealed: List[Tuple[int, int]]
+    # coordinates of the uncovered mines
+    mines_hit: List[Tuple[int, int]]
+    # is the game over (a mine was uncovered or the game is won)
+    game_over: bool
+
+
+class GameStatus(NamedTuple):
+    """
+    Summary of the game state.
+    """
+    # number of uncovered cells without mines
+    uncovered: int
+    # number of flagged cells
+    flags: int
+    # number of uncovered mines
+    mines_triggered: int
+    # number of cells without mines that are still hidden
+    remaining: int
+    # all the cells without mines are uncovered (and no mine was)
+    won: bool
+    # a mine was uncovered
+    lost: bool
+
+
+def sample_positions(rng: random.Random, size: int, number: int, excluded: Iterable[int] = ()) -> List[int]:
+    """
+    Pick distinct random board positions (flat indices), without retries: the positions are drawn from a range
+    shortened by the number of the excluded ones, and then shifted past them.
+
+    :param rng:
+    :param size: number of cells of the board
+    :param number: number of positions
+    :param excluded: flat indices of the cells that must not be picked
+    :return: the positions, in the order they were drawn
+    """
+    excluded = sorted(set(excluded))
+
+    # check if the number of positions is realistic for this board
+    field_cnt = size - len(excluded)
+    if not 0 <= number <= field_cnt:
+        raise RuntimeError(f"Invalid mine count ({number}) for the board ({field_cnt} cells).")
+
+    shots = rng.sample(range(field_cnt), number)
+
+    # skip the excluded positions (in the ascending order of the shots, so every excluded one is passed once)
+    if excluded:
+        passed = 0
+        for i in sorted(range(number), key=shots.__getitem__):
+            shot = shots[i] + passed
+            while passed < len(excluded) and excluded[passed] <= shot:
+                passed += 1
+                shot += 1
+            shots[i] = shot
+    return shots
 
 
 class MineBoard:
-    def __init__(self, width: int = 8, height: int = 8, expected_number_of_mines: int = 0):
+    # `uncover` collects the coordinates of the cells revealed by the flood fill, to mark just them as changed
+    # (see `changes`); without it (and without observers) the revealed cells are only counted
+    collect_revealed: bool = True
+
+    def __init__(self, width: int = 8, height: int = 8, expected_number_of_mines: int = 0, packed: bool = False,
+                 rng: random.Random = None, lazy: bool = False, safe_neighbourhood: bool = False, cells_data=None,
+                 topology: Union[str, Topology] = RECTANGLE, index_openings: bool = False):
         self.width: int = width
         self.height: int = height
 
+        # which cells are adjacent (see `model.neighbours`): "rectangle", "torus" or "hex"
+        self.topology: Topology = get_topology(topology)
+
+        # source of randomness for mine generation (pass a seeded `random.Random` to get reproducible boards)
+        # (None: the global `random` generator; the module is not stored, so the board can be pickled)
+        self.rng = rng
+
+        # use the packed storage (one byte per cell) instead of a Cell instance per square
+        # (`cells_data` is an existing buffer with packed cells to be used, i.e. a memory mapping)
+        self.packed: bool = packed or cells_data is not None
+
         # this is a nominal/declared/given number of mines on the board (not calculated based on the actual board data)
         # in the future, it will be probably gone (used only as a constructor parameter)
         self.expected_number_of_mines = expected_number_of_mines
@@ -17,11 +131,58 @@ class MineBoard:
         # actual number of mines (derived from the board data)
         self.number_of_mines = 0
 
+        # game status counters (maintained by the board methods, see `status`)
+        self.number_of_uncovered = 0
+        self.number_of_flags = 0
+        self.number_of_triggered_mines = 0
+
+        # lazy mode: the mines are placed on the first `uncover`, never under the uncovered cell
+        # (and, if `safe_neighbourhood` is set, never around it)
+        self.safe_neighbourhood: bool = safe_neighbourhood
+        self.pending_mines: int = 0
+        # flat indices of the mines planted before the pending ones get placed, so the placement does not have
+        # to look them up in the whole board (None when not known, i.e. for a restored board)
+        self.__planted: Optional[Set[int]] = set()
+
+        # index of the openings (see `model.openings`), built on the first use after the mines are placed
+        # and dropped when they change; when the index is there, uncovering an empty cell reveals its opening
+        # from the index instead of a flood fill (`index_openings` builds it for the first uncover already)
+        self.index_openings: bool = index_openings
+        self.__openings: Openings = None
+
+        # change tracking: cells changed since the last `changes()`/`render()` call
+        # (`all_dirty` means the whole board has to be rendered again); the rendered cells and lines of the rows
+        # and the whole rendered board are cached
+        self.__dirty: Set[Tuple[int, int]] = set()
+        self.__all_dirty: bool = True
+        self.__rendered_rows: List[List[str]] = None
+        self.__rendered_lines: List[str] = None
+        self.__rendered: str = None
+
+        # callbacks notified about revealed cells (see `subscribe`)
+        self.__observers: List[Callable[[List[Tuple[int, int]]], None]] = []
+
+        # log the moves are recorded in (see `record_moves`)
+        self.move_log: MoveLog = None
+
         # board content, holds `height` rows of `width` of Cell instances
-        self.cells: List[List[Cell]] = None
-        self.fill()
+        # (or PackedCells, which gives the same `cells[y][x]` access, for the packed storage)
+        self.cells: List[CellRow] = None
+        # the rows as they are stored: lists of cells, where the cells in common states share immutable instances
+        # until they are modified through `cells[y][x]` (see `CellRow`); the same as `cells` for the packed storage
+        self.__rows: List[List[Cell]] = None
+        if cells_data is None:
+            self.fill()
+        else:
+            self.__set_rows(PackedCells(width, height, cells_data))
         # generate the mines, if needed
-        if expected_number_of_mines > 0:
+        if lazy:
+            field_cnt: int = width * height
+            if not 0 <= expected_number_of_mines <= field_cnt - 1:
+                raise RuntimeError(
+                    f"Invalid mine count ({expected_number_of_mines}) for the lazy board ({field_cnt} cells).")
+            self.pending_mines = expected_number_of_mines
+        elif expected_number_of_mines > 0:
             self.__generate_mines(expected_number_of_mines)
 
         # self.cells = [[None for x in range(width)] for y in range(height)]
@@ -29,13 +190,13 @@ class MineBoard:
     def __str__(self):
         return '\n'.join(
             ''.join(c.get_representation(reveal_hidden_mine=REVEAL_HIDDEN_MINE) if c else "?" for c in row) for row in
-            self.cells
-        ) + '\n' if not DEBUG_INFO else self.__repr__()
+            self.__rows
+        ) + '\n'
 
     def __repr__(self):
         cells_str = '\n'.join(
             ''.join(c.get_debug_representation() if c else "[????]" for c in row) for row in
-            self.cells
+            self.__rows
         ) + '\n'
         return f"no_of_mines: {self.number_of_mines}\n" + cells_str
 
@@ -44,7 +205,334 @@ class MineBoard:
         Fills the board with "clear" cells (cells that don't contain mines)
         :return:
         """
-        self.cells = [[Cell() for y in range(self.width)] for x in range(self.height)]
+        if self.packed:
+            self.__set_rows(PackedCells(self.width, self.height))
+        else:
+            self.__set_rows([[UNTOUCHED_CELL] * self.width for _ in range(self.height)])
+        self.number_of_mines = 0
+        self.number_of_uncovered = self.number_of_flags = self.number_of_triggered_mines = 0
+        self.__planted = set()
+        self.__all_dirty = True
+
+    def __set_rows(self, rows) -> None:
+        """
+        Set the board content.
+
+        :param rows: lists of cells (or PackedCells)
+        :return:
+        """
+        self.__rows = rows
+        self.__openings = None
+        self.cells = rows if isinstance(rows, PackedCells) else [CellRow(row) for row in rows]
+
+    def header(self) -> BoardHeader:
+        """
+        Get the header of the binary board format describing this board.
+
+        :return:
+        """
+        return BoardHeader(BOARD_MAGIC, BOARD_FORMAT_VERSION,
+                           (BOARD_FLAG_SAFE_NEIGHBOURHOOD if self.safe_neighbourhood else 0) | self.topology.flag,
+                           self.width, self.height,
+                           self.number_of_mines, self.expected_number_of_mines, self.pending_mines,
+                           self.number_of_uncovered, self.number_of_flags, self.number_of_triggered_mines)
+
+    @staticmethod
+    def read_header(data) -> BoardHeader:
+        """
+        Read and validate the header of the binary board format.
+
+        :param data: serialized board (or at least its beginning)
+        :return:
+        """
+        if len(data) < BOARD_HEADER.size:
+            raise RuntimeError("Invalid board data (too short).")
+        header = BoardHeader(*BOARD_HEADER.unpack_from(data))
+        if header.magic != BOARD_MAGIC:
+            raise RuntimeError("Invalid board data (unknown format).")
+        if header.version != BOARD_FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported board format version ({header.version}).")
+        return header
+
+    def restore_state(self, header: BoardHeader) -> None:
+        """
+        Restore the mine counts, the status counters and the topology stored in the header.
+
+        :param header:
+        :return:
+        """
+        self.number_of_mines = header.number_of_mines
+        self.expected_number_of_mines = header.expected_number_of_mines
+        self.pending_mines = header.pending_mines
+        self.__planted = None if self.number_of_mines else set()
+        self.number_of_uncovered = header.number_of_uncovered
+        self.number_of_flags = header.number_of_flags
+        self.number_of_triggered_mines = header.number_of_triggered_mines
+        self.safe_neighbourhood = bool(header.flags & BOARD_FLAG_SAFE_NEIGHBOURHOOD)
+        self.topology = topology_from_flags(header.flags)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the board (the header followed by the packed cells, see BOARD_HEADER).
+
+        :return:
+        """
+        header = BOARD_HEADER.pack(*self.header())
+        if self.packed:
+            return header + bytes(self.cells.data)
+        return header + bytes(pack_cell(c) for row in self.__rows for c in row)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, packed: bool = True) -> 'MineBoard':
+        """
+        Restore a board serialized with `to_bytes`.
+        For the packed storage the cell data is copied as a whole, no Cell instances are created.
+
+        :param data:
+        :param packed: should the restored board use the packed storage
+        :return:
+        """
+        header = cls.read_header(data)
+        width, height = header.width, header.height
+        if len(data) != BOARD_HEADER.size + width * height:
+            raise RuntimeError(f"Invalid board data (expected {width * height} cells).")
+
+        cells = memoryview(data)[BOARD_HEADER.size:]
+        if packed:
+            board = cls(width, height, cells_data=bytearray(cells))
+        else:
+            board = cls(width, height)
+            # the cells in common states are restored as the shared instances
+            shared = SHARED_CELLS_BY_VALUE
+            board.__set_rows([[shared[value] if value in shared else unpack_cell(value)
+                               for value in cells[y * width:(y + 1) * width]] for y in range(height)])
+
+        board.restore_state(header)
+        return board
+
+    @property
+    def status(self) -> GameStatus:
+        """
+        Get the game status. It is based on counters maintained by the board methods (no board scan is needed),
+        so changes made directly to the cells (i.e. `cells[y][x].reveal()`) are not accounted for.
+
+        :return:
+        """
+        remaining = self.width * self.height - self.number_of_mines - self.pending_mines - self.number_of_uncovered
+        lost = self.number_of_triggered_mines > 0
+        return GameStatus(self.number_of_uncovered, self.number_of_flags, self.number_of_triggered_mines,
+                          remaining, remaining == 0 and not lost, lost)
+
+    @property
+    def game_over(self) -> bool:
+        """
+        Is the game over: was a mine uncovered, or are all the cells without mines uncovered
+        (the same as `status.won or status.lost`, without building the status).
+
+        :return:
+        """
+        return (self.number_of_triggered_mines > 0
+                or self.number_of_uncovered == self.width * self.height - self.number_of_mines - self.pending_mines)
+
+    @property
+    def openings(self) -> Openings:
+        """
+        Get the index of the openings: the regions of cells without adjacent mines and their borders.
+        It is built on the first call (a labelling pass over the board, see `model.openings`) and kept
+        until the mines change. Changes made directly to the cells are not tracked.
+
+        :return:
+        """
+        if self.pending_mines:
+            raise RuntimeError("The mines are not placed yet.")
+        if self.__openings is None:
+            self.__openings = board_openings(self)
+        return self.__openings
+
+    @property
+    def three_bv(self) -> int:
+        """
+        Get the 3BV of the board: the minimum number of clicks needed to clear it (see `model.openings`).
+
+        :return:
+        """
+        return self.openings.three_bv
+
+    def __reveal(self, x: int, y: int) -> None:
+        """
+        Reveal a single cell, keeping the status counters up to date.
+        A shared cell without a mine is replaced with the shared revealed one (see `CellRow`).
+
+        :param x:
+        :param y:
+        :return:
+        """
+        row = self.__rows[y]
+        cell = row[x]
+        if cell.uncovered:
+            return
+        if type(cell) is SharedCell:  # the shared cells are never flagged
+            if not cell.has_mine:
+                row[x] = REVEALED_CELLS[cell.no_adjacent_mines]
+                self.number_of_uncovered += 1
+                return
+            cell = row[x] = cell.copy()
+        if cell.flagged:
+            self.number_of_flags -= 1
+        cell.reveal()
+        if cell.has_mine:
+            self.number_of_triggered_mines += 1
+        else:
+            self.number_of_uncovered += 1
+
+    def changes(self) -> Dict[Tuple[int, int], str]:
+        """
+        Get the representation of the cells changed (by `uncover`, `expand`, `flag` or planting mines)
+        since the last call of `changes` or `render`.
+        Changes made directly to the cells (i.e. `cells[y][x].reveal()`) are not tracked.
+
+        :return: mapping of (x, y) coordinates to the new representation of the cell
+        """
+        result = self.__take_changes()
+        # keep the cached rendering (if any) up to date, as the changes are not tracked anymore
+        self.__update_rendered(result)
+        return result
+
+    def render(self) -> str:
+        """
+        Get the board representation (the same as `str(board)` gives, without debug info).
+        The rendered cells and rows are cached: only the cells changed since the last call (see `changes`) are rendered
+        again, and only the rows holding them are joined again.
+
+        :return:
+        """
+        if self.__rendered_rows is None:
+            # nothing rendered yet (the changes may have been taken already)
+            self.__rendered_rows = [[""] * self.width for _ in range(self.height)]
+            self.__rendered_lines = [""] * self.height
+            self.__all_dirty = True
+        self.__update_rendered(self.__take_changes())
+        if self.__rendered is None:
+            self.__rendered = '\n'.join(self.__rendered_lines) + '\n'
+        return self.__rendered
+
+    def __take_changes(self) -> Dict[Tuple[int, int], str]:
+        """
+        Get the representation of the changed cells and stop tracking them.
+
+        :return: mapping of (x, y) coordinates to the new representation of the cell
+        """
+        if self.__all_dirty:
+            dirty = ((x, y) for y in range(self.height) for x in range(self.width))
+        else:
+            dirty = self.__dirty
+        rows = self.__rows
+        result = {(x, y): rows[y][x].get_representation(reveal_hidden_mine=REVEAL_HIDDEN_MINE) for x, y in dirty}
+
+        self.__dirty = set()
+        self.__all_dirty = False
+        return result
+
+    def __update_rendered(self, changes: Dict[Tuple[int, int], str]) -> None:
+        """
+        Apply the changed cells to the cached rendering: join the rows holding them again
+        and drop the rendered board, so that `render` joins it again.
+
+        :param changes: mapping of (x, y) coordinates to the new representation of the cell
+        :return:
+        """
+        if self.__rendered_rows is None or not changes:
+            return
+        rows, lines = self.__rendered_rows, self.__rendered_lines
+        dirty_rows = set()
+        for (x, y), value in changes.items():
+            rows[y][x] = value
+            dirty_rows.add(y)
+        for y in dirty_rows:
+            lines[y] = ''.join(rows[y])
+        self.__rendered = None
+
+    def subscribe(self, callback: Callable[[List[Tuple[int, int]]], None]) -> None:
+        """
+        Register a callback to be notified about the cells revealed by the board methods
+        (`uncover`, `expand`, `chord`, ...). It is called with a list of coordinates of the revealed cells.
+
+        :param callback:
+        :return:
+        """
+        self.__observers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[Tuple[int, int]]], None]) -> None:
+        """
+        Remove a callback registered with `subscribe`.
+
+        :param callback:
+        :return:
+        """
+        self.__observers.remove(callback)
+
+    def record_moves(self, file) -> MoveLog:
+        """
+        Start recording the moves (and the mines planted from now on) in an append-only binary log
+        (see `model.movelog`). The log starts with the snapshot of the board. Set `move_log` to None to stop.
+
+        :param file: binary file opened for writing (or appending)
+        :return: the log
+        """
+        self.move_log = MoveLog(file, self)
+        return self.move_log
+
+    def __log_move(self, kind: int, x: int, y: int, before: Tuple[int, int], outcome: int = 0) -> None:
+        """
+        Append the record of a move (with its outcome) to the log.
+
+        :param kind:
+        :param x:
+        :param y:
+        :param before: number of uncovered cells and number of triggered mines before the move
+        :param outcome: additional outcome bits
+        :return:
+        """
+        uncovered, triggered = before
+        if self.number_of_triggered_mines > triggered:
+            outcome |= OUTCOME_MINE_HIT
+        if self.game_over:
+            outcome |= OUTCOME_GAME_OVER
+        revealed = self.number_of_uncovered + self.number_of_triggered_mines - uncovered - triggered
+        self.move_log.record(kind, x, y, revealed, outcome)
+        if self.game_over:
+            # the final state gets checked by the replayer
+            self.move_log.record_digest(self)
+
+    def __mark_dirty(self, coords: Iterable[Tuple[int, int]]) -> None:
+        """
+        Record the changed cells (for `changes` and `render`). Nothing is recorded while the whole board is to be
+        rendered anyway; once a quarter of the board is recorded, the whole board is marked instead (so a big flood
+        does not keep a tuple per revealed cell).
+
+        :param coords:
+        :return:
+        """
+        if self.__all_dirty:
+            return
+        dirty = self.__dirty
+        dirty.update(coords)
+        if len(dirty) > self.width * self.height // 4:
+            self.__all_dirty = True
+            self.__dirty = set()
+
+    def __revealed(self, coords: List[Tuple[int, int]]) -> None:
+        """
+        Record the cells revealed by a move (for rendering) and notify the observers.
+
+        :param coords:
+        :return:
+        """
+        if not coords:
+            return
+        self.__mark_dirty(coords)
+        for callback in self.__observers:
+            callback(coords)
 
     def is_valid_row(self, y: int) -> bool:
         """
@@ -81,8 +569,46 @@ class MineBoard:
         to_y = y + 1 if y < self.height - 1 else y
         return from_x, from_y, to_x, to_y
 
+    def neighbours(self, x: int, y: int) -> Sequence[Tuple[int, int]]:
+        """
+        Get coordinates of the cells adjacent to the given one.
+        They depend on the board topology and come from the neighbour table shared by the boards of the same shape
+        (see `model.neighbours`).
+
+        :param x:
+        :param y:
+        :return:
+        """
+        # check if the coords are valid
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+
+        return self.topology.neighbours(x, y, self.width, self.height)
+
     def is_mine_at(self, x: int, y: int) -> bool:
-        return self.cells[y][x].has_mine
+        # the stored cell is read, so the shared cells don't get copied (see `CellRow`)
+        return self.__rows[y][x].has_mine
+
+    def cell_at(self, x: int, y: int) -> Cell:
+        """
+        Get the cell at given location for reading (the coordinates are not validated).
+        The stored cell is returned, not a view of it (see `CellRow`): it must not be modified,
+        use `cells[y][x]` for that.
+
+        :param x:
+        :param y:
+        :return:
+        """
+        return self.__rows[y][x]
+
+    def read_rows(self) -> Sequence[Sequence[Cell]]:
+        """
+        Get the rows of the cells as they are stored, for the passes reading the whole board
+        (no views of the shared cells are made, see `CellRow`). The cells must not be modified.
+
+        :return:
+        """
+        return self.__rows
 
     def plant_mine(self, x: int, y: int):
         """
@@ -103,43 +629,242 @@ class MineBoard:
         if self.is_mine_at(x, y):
             raise RuntimeError(f"There is a mine already placed at ({x}, {y}).")
 
-        # create a cell with a mine
-        mine = Cell(has_mine=True)
+        stats = instrumentation.STATS
+        if stats is not None:
+            stats.count("plant_mine_calls")
+
+        # the old cell gets replaced, forget its state
+        self.__forget_state(self.__rows[y][x])
 
-        # place the mine on the board
-        self.cells[y][x] = mine
+        # place the mine on the board (a covered cell with a mine, shared until modified)
+        rows = self.__rows
+        rows[y][x] = UNTOUCHED_MINE
 
         # update no_adjacent_mines of all the neighbours (cells adjacent to the mine)
-        from_x, from_y, to_x, to_y = self.__get_neighbours_range(x, y)
-        for row in range(from_y, to_y + 1):
-            for col in range(from_x, to_x + 1):
-                if (col, row) != (x, y):  # do not update the mine cell itself
-                    if not self.is_mine_at(col, row):  # do not update adjacent mines
-                        self.cells[row][col].no_adjacent_mines += 1
+        changed = [(x, y)]
+        for col, row in self.neighbours(x, y):
+            c = rows[row][col]
+            if not c.has_mine:  # do not update adjacent mines
+                if type(c) is SharedCell and not c.uncovered and c.no_adjacent_mines + 1 < len(UNTOUCHED_CELLS):
+                    rows[row][col] = UNTOUCHED_CELLS[c.no_adjacent_mines + 1]
+                else:
+                    self.cells[row][col].no_adjacent_mines += 1
+                changed.append((col, row))
+        self.__mark_dirty(changed)
 
         # increase number of mines on the board
         self.number_of_mines += 1
+        if self.pending_mines and self.__planted is not None:
+            self.__planted.add(y * self.width + x)
+        # the openings change (the index is rebuilt on the next use)
+        self.__openings = None
 
-    def expand(self, x: int, y: int):
+        if self.move_log is not None:
+            self.move_log.record(MOVE_MINE, x, y)
+
+    def __forget_state(self, cell: Cell) -> None:
+        """
+        Update the status counters when a cell is about to be replaced with a mine.
+
+        :param cell:
+        :return:
         """
-        TODO add description
+        if cell.uncovered:
+            self.number_of_uncovered -= 1
+        if cell.flagged:
+            self.number_of_flags -= 1
+
+    def plant_mines(self, mines: Iterable[Tuple[int, int]]):
+        """
+        Place many mines at once.
+        The result is the same as calling `plant_mine` for every location, but the adjacency counts are
+        computed for the whole board in a single pass (for the rectangular boards with `adjacent_mine_counts`),
+        instead of updating the board for every mine separately.
+
+        :param mines: coordinates (x, y) of the mines
+        :return:
+        """
+        width = self.width
+        mask = bytearray(width * self.height)
+        for x, y in mines:
+            # check if the coords are valid
+            if not (self.is_valid_col(x) and self.is_valid_row(y)):
+                raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+
+            # check if there is already a mine placed there
+            if mask[y * width + x] or self.is_mine_at(x, y):
+                raise RuntimeError(f"There is a mine already placed at ({x}, {y}).")
+            mask[y * width + x] = 1
+
+        # the old cells get replaced, forget their state
+        log = self.move_log
+        planted = self.__planted if self.pending_mines else None
+        for i in range(len(mask)):
+            if mask[i]:
+                self.__forget_state(self.__rows[i // width][i % width])
+                if log is not None:
+                    log.record(MOVE_MINE, i % width, i // width)
+                if planted is not None:
+                    planted.add(i)
+
+        counts = self.topology.adjacent_mine_counts(mask, width, self.height)
+
+        if self.packed:
+            # packed storage: rebuild the whole buffer at once
+            def update(data: int, count: int, mine: int) -> int:
+                if mine:
+                    return MINE_BIT
+                return data if data & MINE_BIT else data + (count << COUNT_SHIFT)
+
+            data = self.cells.data
+            data[:] = bytes(map(update, data, counts, mask))
+        else:
+            for y, row in enumerate(self.__rows):
+                offset = y * width
+                for x, c in enumerate(row):
+                    if mask[offset + x]:
+                        row[x] = UNTOUCHED_MINE
+                    elif counts[offset + x] and not c.has_mine:
+                        count = c.no_adjacent_mines + counts[offset + x]
+                        if type(c) is SharedCell and not c.uncovered and count < len(UNTOUCHED_CELLS):
+                            row[x] = UNTOUCHED_CELLS[count]
+                        else:
+                            self.cells[y][x].no_adjacent_mines = count
+
+        self.number_of_mines += mask.count(1)
+        self.__openings = None
+        self.__all_dirty = True
+
+    def expand(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """
+        Reveal the neighbourhood of the given cell (flood fill).
+        Every revealed neighbour without adjacent mines gets its own neighbourhood revealed as well.
+
+        The fill is iterative (uses an explicit work stack instead of recursion), so it is not limited
+        by the interpreter recursion depth, and every cell is pushed at most once (it gets revealed before
+        being pushed), which keeps it linear in the size of the revealed area.
+
         :param x:
         :param y:
+        :return: list of coordinates of the cells revealed by the expansion
+        """
+        # check if the coords are valid
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+
+        before = (self.number_of_uncovered, self.number_of_triggered_mines)
+
+        # lazy board: the expansion is the first move, the revealed neighbourhood must be free of mines
+        if self.pending_mines:
+            self.__generate_pending_mines(x, y, clear_neighbourhood=True)
+
+        # the neighbourhoods never list the cell itself, but a covered origin gets revealed by an empty neighbour
+        # expanding back to it (as in the recursive version)
+        revealed: List[Tuple[int, int]] = []
+        self.__flood([(x, y)], revealed)
+        if self.move_log is not None:
+            self.__log_move(MOVE_EXPAND, x, y, before)
+        return revealed
+
+    def __flood(self, stack: List[Tuple[int, int]], revealed: Optional[List[Tuple[int, int]]]) -> None:
+        """
+        Flood fill engine: reveal the neighbourhoods of the cells on the work stack.
+        Revealed empty cells (without adjacent mines) are pushed on the stack to be expanded as well.
+
+        :param stack: cells to be expanded (the stack is consumed)
+        :param revealed: list the coordinates of revealed cells are appended to; if None, the revealed cells are
+            only counted (the whole board is marked as changed then, see `collect_revealed`)
         :return:
         """
-        from_x, from_y, to_x, to_y = self.__get_neighbours_range(x, y)
-        for row in range(from_y, to_y + 1):
-            for col in range(from_x, to_x + 1):
-                if (col, row) != (x, y):  # do not update the mine cell itself
-                    c = self.cells[row][col]
+        # the cells as they are stored (see `CellRow`): the shared cells get replaced when revealed;
+        # the packed storage is read and written as bytes
+        rows = self.__rows
+        data = self.cells.data if self.packed else None
+        width, height = self.width, self.height
+        topology = self.topology
+        table = topology.table(width, height)
+        # boards too big to have a table: the rectangle neighbourhoods are clamped 3x3 boxes made of the ranges
+        # of the columns and rows (much faster than calling the topology for every expanded cell)
+        clamped = table is None and type(topology) is RectangleTopology
+        if clamped:
+            box_cols, box_rows = box_ranges(width), box_ranges(height)
+        collect = revealed is not None
+        first_revealed = len(revealed) if collect else 0
+        revealed_count = flags_cleared = mines_revealed = 0
 
-                    # Only unrevealed cells need to be revealed.  <-- XXX TODO: assumption copied mindlessly from other solution; validate.
-                    if not c.uncovered:
+        # instrumentation: number of expanded cells and the maximum size of the work stack
+        stats = instrumentation.STATS
+        expanded = depth = 0
+
+        while stack:
+            if stats is not None and len(stack) > depth:
+                depth = len(stack)
+            expanded += 1
+            cx, cy = stack.pop()
+            if table is not None:
+                neighbours = table[cy * width + cx]
+            elif clamped:
+                neighbours = product(box_cols[cx], box_rows[cy])
+            else:
+                neighbours = topology.compute_neighbours(cx, cy, width, height)
+            for col, row in neighbours:
+                if col == cx and row == cy:  # the boxes include the expanded cell itself
+                    continue
+                if data is not None:
+                    i = row * width + col
+                    value = data[i]
+                    if not value & UNCOVERED_BIT:
+                        if value & FLAG_BIT:
+                            flags_cleared += 1
+                        data[i] = (value | UNCOVERED_BIT) & ~FLAG_BIT
+                        revealed_count += 1
+                        if collect:
+                            revealed.append((col, row))
+                        if not value >> COUNT_SHIFT:
+                            stack.append((col, row))
+                            if value & MINE_BIT:
+                                mines_revealed += 1
+                    continue
+                cells_row = rows[row]
+                c = cells_row[col]
+
+                # only unrevealed cells need to be revealed
+                if not c.uncovered:
+                    if type(c) is SharedCell:  # the shared cells are never flagged
+                        if c.has_mine:
+                            c = cells_row[col] = c.copy()
+                            c.reveal()
+                        else:
+                            c = cells_row[col] = REVEALED_CELLS[c.no_adjacent_mines]
+                    else:
+                        if c.flagged:
+                            flags_cleared += 1
                         c.reveal()
-                        if c.no_adjacent_mines > 0:
-                            pass
-                        else:  # it is an empty cell, expand neighbours
-                            self.expand(col, row)
+                    revealed_count += 1
+                    if collect:
+                        revealed.append((col, row))
+                    if c.no_adjacent_mines == 0:  # it is an empty cell, expand neighbours
+                        stack.append((col, row))
+                        # mines never have adjacent mines counted, so they can only show up here
+                        # (when a cell next to a mine gets expanded)
+                        if c.has_mine:
+                            mines_revealed += 1
+
+        if collect:
+            self.__revealed(revealed[first_revealed:])
+        elif revealed_count:
+            self.__all_dirty = True
+            self.__dirty = set()
+        self.number_of_flags -= flags_cleared
+        self.number_of_triggered_mines += mines_revealed
+        self.number_of_uncovered += revealed_count - mines_revealed
+
+        if stats is not None:
+            stats.count("flood_fills")
+            stats.count("flood_expanded_cells", expanded)
+            stats.count("flood_revealed_cells", revealed_count)
+            stats.maximum("flood_expanded_cells", expanded)
+            stats.maximum("flood_depth", depth)
 
     def uncover(self, x: int, y: int) -> Cell:
         """
@@ -152,34 +877,302 @@ class MineBoard:
         if not (self.is_valid_col(x) and self.is_valid_row(y)):
             raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
 
+        before = (self.number_of_uncovered, self.number_of_triggered_mines)
+
+        # lazy board: the first move decides where the mines can't be
+        if self.pending_mines:
+            self.__generate_pending_mines(x, y)
+
         cell = self.cells[y][x]
 
-        cell.reveal()
+        self.__reveal(x, y)
         if cell.has_mine:  # it's a mine, nothing to do more
             pass
         elif cell.no_adjacent_mines > 0:
             pass
         else:
             # no_adjacent_mines == 0, we need to expand the selection to all adjoining cells
-            # that also have no adjacent mines
-            self.expand(x, y)
+            # that also have no adjacent mines (the whole opening, if the openings are indexed)
+            if not ((self.index_openings or self.__openings is not None) and self.__reveal_opening(x, y)):
+                self.__flood([(x, y)], [] if self.collect_revealed or self.__observers else None)
+
+        self.__revealed([(x, y)])
+        if self.move_log is not None:
+            self.__log_move(MOVE_UNCOVER, x, y, before)
+        return cell
+
+    def __reveal_opening(self, x: int, y: int) -> bool:
+        """
+        Reveal the opening of the given empty cell, using the index of the openings (see `openings`).
 
+        :param x:
+        :param y:
+        :return: False if the cell is not in any of the indexed openings (the index is out of date)
+        """
+        openings = self.openings
+        width = self.width
+        label = openings.labels[y * width + x]
+        if label < 0:
+            return False
+
+        opening = openings.openings[label]
+        revealed: List[Tuple[int, int]] = []
+        flags_cleared = 0
+        if self.packed:
+            data = self.cells.data
+            for cells in (opening.zeros, opening.border):
+                for i in cells:
+                    value = data[i]
+                    if not value & UNCOVERED_BIT:
+                        if value & FLAG_BIT:
+                            flags_cleared += 1
+                        data[i] = (value | UNCOVERED_BIT) & ~FLAG_BIT
+                        cy, cx = divmod(i, width)
+                        revealed.append((cx, cy))
+        else:
+            # the stored cells are read (see `CellRow`); there are no mines in an opening
+            rows = self.__rows
+            for cells in (opening.zeros, opening.border):
+                for i in cells:
+                    cy, cx = divmod(i, width)
+                    row = rows[cy]
+                    c = row[cx]
+                    if not c.uncovered:
+                        if type(c) is SharedCell:
+                            row[cx] = REVEALED_CELLS[c.no_adjacent_mines]
+                        else:
+                            if c.flagged:
+                                flags_cleared += 1
+                            c.reveal()
+                        revealed.append((cx, cy))
+
+        self.__revealed(revealed)
+        self.number_of_flags -= flags_cleared
+        self.number_of_uncovered += len(revealed)
+
+        stats = instrumentation.STATS
+        if stats is not None:
+            stats.count("opening_reveals")
+            stats.count("opening_revealed_cells", len(revealed))
+        return True
+
+    def chord(self, x: int, y: int) -> MovesResult:
+        """
+        Chord on an uncovered number cell: if it has as many flagged neighbours as adjacent mines,
+        reveal all its other (not flagged) hidden neighbours. Empty cells revealed this way get expanded
+        with one, shared flood fill.
+        Nothing happens if the cell is hidden, empty, or the number of flags doesn't match.
+
+        :param x:
+        :param y:
+        :return: aggregated result of the reveals
+        """
+        neighbours = self.neighbours(x, y)
+        before = (self.number_of_uncovered, self.number_of_triggered_mines)
+
+        # the stored cells are read (see `CellRow`), only the revealed ones get copies of their own
+        rows = self.__rows
+        cells = self.cells
+        revealed: List[Tuple[int, int]] = []
+        mines_hit: List[Tuple[int, int]] = []
+
+        cell = rows[y][x]
+        if cell.uncovered and cell.no_adjacent_mines > 0 and not cell.has_mine:
+            hidden: List[Tuple[int, int]] = []
+            flags = 0
+            for col, row in neighbours:
+                c = rows[row][col]
+                if c.flagged:
+                    flags += 1
+                elif not c.uncovered:
+                    hidden.append((col, row))
+
+            if flags == cell.no_adjacent_mines:
+                stack: List[Tuple[int, int]] = []
+                for col, row in hidden:
+                    c = cells[row][col]
+                    self.__reveal(col, row)
+                    revealed.append((col, row))
+                    if c.has_mine:
+                        mines_hit.append((col, row))
+                    elif c.no_adjacent_mines == 0:
+                        stack.append((col, row))
+
+                self.__revealed(revealed)
+                self.__flood(stack, revealed)
+
+        if self.move_log is not None:
+            self.__log_move(MOVE_CHORD, x, y, before)
+        return MovesResult(revealed, mines_hit, self.game_over)
+
+    def __validate_moves(self, moves: Iterable[Sequence[int]]) -> List[Tuple[int, int]]:
+        """
+        Check all the coordinates of the moves before any of them is applied.
+
+        :param moves: (x, y) pairs; any sequence of pairs will do (i.e. an N x 2 NumPy array)
+        :return: list of (x, y) tuples
+        """
+        coords = [(int(x), int(y)) for x, y in moves]
+        for x, y in coords:
+            if not (self.is_valid_col(x) and self.is_valid_row(y)):
+                raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+        return coords
+
+    def uncover_many(self, moves: Iterable[Sequence[int]]) -> MovesResult:
+        """
+        Uncover many cells in one call.
+        All the coordinates are validated up front; then the moves are applied in order, until a mine is hit
+        (the rest of the moves is ignored then). The expansions of all the moves share one flood fill.
+
+        :param moves: (x, y) pairs
+        :return: aggregated result of the moves
+        """
+        coords = self.__validate_moves(moves)
+        before = (self.number_of_uncovered, self.number_of_triggered_mines)
+
+        cells = self.cells
+        revealed: List[Tuple[int, int]] = []
+        mines_hit: List[Tuple[int, int]] = []
+        stack: List[Tuple[int, int]] = []
+        for x, y in coords:
+            # lazy board: the first move decides where the mines can't be
+            if self.pending_mines:
+                self.__generate_pending_mines(x, y)
+
+            cell = cells[y][x]
+            if cell.uncovered:
+                continue
+
+            self.__reveal(x, y)
+            revealed.append((x, y))
+            if cell.has_mine:
+                mines_hit.append((x, y))
+                break
+            if cell.no_adjacent_mines == 0:
+                stack.append((x, y))
+
+        self.__revealed(revealed)
+        self.__flood(stack, revealed)
+
+        if self.move_log is not None and coords:
+            # all the requested moves are logged (the outcome with the last one), so the batch replays the same way
+            for x, y in coords[:-1]:
+                self.move_log.record(MOVE_UNCOVER_MANY, x, y)
+            self.__log_move(MOVE_UNCOVER_MANY, *coords[-1], before, OUTCOME_BATCH_END)
+        return MovesResult(revealed, mines_hit, self.game_over)
+
+    def flag_many(self, moves: Iterable[Sequence[int]], on_off: bool = True) -> None:
+        """
+        Set (or clear) flags on many cells in one call.
+        All the moves are validated (coordinates, no uncovered cells) before any flag is set.
+
+        :param moves: (x, y) pairs
+        :param on_off:
+        :return:
+        """
+        coords = self.__validate_moves(moves)
+
+        cells = self.cells
+        for x, y in coords:
+            if cells[y][x].uncovered:
+                raise RuntimeError(f"Uncovered field ({x}, {y}) cannot be flagged")
+
+        for x, y in coords:
+            cell = cells[y][x]
+            if cell.flagged != on_off:
+                self.number_of_flags += 1 if on_off else -1
+            cell.flag(on_off)
+        self.__mark_dirty(coords)
+
+        if self.move_log is not None:
+            for x, y in coords:
+                self.move_log.record(MOVE_FLAG if on_off else MOVE_UNFLAG, x, y)
+
+    def flag(self, x: int, y: int, on_off: bool = True) -> Cell:
+        """
+        Set (or clear) the flag on the cell at given location.
+
+        :param x:
+        :param y:
+        :param on_off:
+        :return: the flagged cell
+        """
+        # check if the coords are valid
+        if not (self.is_valid_col(x) and self.is_valid_row(y)):
+            raise RuntimeError(f"Invalid coordinates ({x}, {y}).")
+
+        cell = self.cells[y][x]
+        was_flagged = cell.flagged
+        cell.flag(on_off)
+        if was_flagged != on_off:
+            self.number_of_flags += 1 if on_off else -1
+        self.__mark_dirty(((x, y),))
+
+        if self.move_log is not None:
+            self.move_log.record(MOVE_FLAG if on_off else MOVE_UNFLAG, x, y)
         return cell
 
-    def __generate_mines(self, expected_number_of_mines: int):
-        # check if expected number of mines is realistic for this board
-        field_cnt: int = self.width * self.height
-        if not 0 <= expected_number_of_mines <= field_cnt:
-            raise RuntimeError(f"Invalid mine count ({expected_number_of_mines}) for the board ({field_cnt} cells).")
-        # track of number of mines already set up
-        while self.number_of_mines < expected_number_of_mines:
+    def __generate_mines(self, expected_number_of_mines: int, excluded: Iterable[int] = ()):
+        """
+        Place given number of mines in random places.
+
+        :param expected_number_of_mines:
+        :param excluded: flat indices of the cells that must stay free of mines
+        :return:
+        """
+        shots = sample_positions(self.rng or random, self.width * self.height, expected_number_of_mines, excluded)
+
+        # get column and row from the number
+        mines = [(shot % self.width, shot // self.width) for shot in shots]
 
-            # get random board position
-            shot = random.randint(0, self.width * self.height - 1)
+        stats = instrumentation.STATS
+        if stats is not None:
+            stats.count("generated_boards")
+            stats.count("generated_mines", len(mines))
 
-            # get column and from the number
-            x, y = shot % self.width, shot // self.height
+        # place all the mines at once
+        self.plant_mines(mines)
 
-            # Place the mine, if it doesn't already have one
-            if not self.is_mine_at(x, y):
-                self.plant_mine(x, y)
+    def __generate_pending_mines(self, x: int, y: int, clear_neighbourhood: bool = False):
+        """
+        Place the mines of a lazy board, keeping the first uncovered cell (and optionally its neighbours) clear.
+        If there is not enough room to keep the neighbourhood clear, only the cell itself is spared
+        (unless `clear_neighbourhood` is set, then it is an error).
+        The mines planted before are kept, the pending ones are placed in the other cells.
+
+        :param x:
+        :param y:
+        :param clear_neighbourhood: the neighbours must be kept clear (the first move reveals them)
+        :return:
+        """
+        width = self.width
+        excluded = self.__planted
+        if excluded is None:
+            excluded = set(self.__mine_positions()) if self.number_of_mines else set()
+        # the generated mines are not tracked
+        self.__planted = None
+        excluded.add(y * width + x)
+        if self.safe_neighbourhood or clear_neighbourhood:
+            neighbourhood = excluded.union(row * width + col for col, row in self.neighbours(x, y))
+            if clear_neighbourhood or self.pending_mines <= width * self.height - len(neighbourhood):
+                excluded = neighbourhood
+        if self.pending_mines > width * self.height - len(excluded):
+            raise RuntimeError(f"Invalid mine count ({self.pending_mines}) for the board "
+                               f"({width * self.height - len(excluded)} cells).")
+
+        # the mines follow as MOVE_MINE records
+        if self.move_log is not None:
+            self.move_log.record(MOVE_GENERATE, x, y, self.pending_mines)
+        self.__generate_mines(self.pending_mines, excluded)
+        self.pending_mines = 0
+
+    def __mine_positions(self) -> List[int]:
+        """
+        Get flat indices of the cells with a mine.
+
+        :return:
+        """
+        if self.packed:
+            return [i for i, data in enumerate(self.cells.data) if data & MINE_BIT]
+        width = self.width
+        return [y * width + x for y, row in enumerate(self.__rows) for x, c in enumerate(row) if c.has_mine]
@@ -0,0 +1,227 @@
+"""
+Monte Carlo statistics of the generated boards: distributions of the 3BV (minimum number of clicks needed
+to clear a board), of the number of openings and of the largest flood (the number of cells revealed by
+the biggest opening), by board size and number of mines.
+
+The boards are generated with the MineBoard generator in a pool of worker processes. The work is split
+into chunks of boards; every chunk gets its own seed (derived from the seed of the run), so the results
+depend only on the parameters, not on the number of workers or the order the chunks complete in.
+The metrics are computed with the labelling pass of `model.openings`; the workers send back histograms
+only, and the aggregated statistics are yielded after every completed chunk.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from model.board import MineBoard
+
+
+class BoardConfig(NamedTuple):
+    """
+    Parameters of the generated boards.
+    """
+    width: int
+    height: int
+    mines: int
+    topology: str = "rectangle"
+
+    @classmethod
+    def with_density(cls, width: int, height: int, density: float, topology: str = "rectangle") -> 'BoardConfig':
+        """
+        Get the configuration with the number of mines given by their density (the fraction of cells with a mine).
+
+        :param width:
+        :param height:
+        :param density:
+        :param topology:
+        :return:
+        """
+        return cls(width, height, round(width * height * density), topology)
+
+
+class BoardMetrics(NamedTuple):
+    """
+    Metrics of a single board.
+    """
+    three_bv: int
+    openings: int
+    largest_flood: int
+
+
+class Histogram:
+    """
+    Histogram of integer values: value -> number of occurrences.
+    """
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts) if counts else {}
+
+    def __repr__(self):
+        return f"Histogram({self.counts!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Histogram) and self.counts == other.counts
+
+    def add(self, value: int, times: int = 1) -> None:
+        self.counts[value] = self.counts.get(value, 0) + times
+
+    def update(self, other: 'Histogram') -> None:
+        for value, times in other.counts.items():
+            self.add(value, times)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def mean(self) -> float:
+        total = self.total
+        if not total:
+            raise RuntimeError("Empty histogram.")
+        return sum(value * times for value, times in self.counts.items()) / total
+
+    def percentile(self, q: float) -> int:
+        """
+        Get the smallest value such that at least `q` percent of the values are not greater.
+
+        :param q: 0..100
+        :return:
+        """
+        total = self.total
+        if not total:
+            raise RuntimeError("Empty histogram.")
+        rank = q / 100 * total
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+        return max(self.counts)
+
+    def items(self) -> List[Tuple[int, int]]:
+        """
+        Get the (value, number of occurrences) pairs, ordered by the value.
+
+        :return:
+        """
+        return sorted(self.counts.items())
+
+
+class BoardStatistics(NamedTuple):
+    """
+    Aggregated metrics of the boards generated for a configuration (so far).
+    """
+    config: BoardConfig
+    boards: int
+    three_bv: Histogram
+    openings: Histogram
+    largest_flood: Histogram
+
+
+def empty_statistics(config: BoardConfig) -> BoardStatistics:
+    """
+    Get the statistics with no boards.
+
+    :param config:
+    :return:
+    """
+    return BoardStatistics(config, 0, Histogram(), Histogram(), Histogram())
+
+
+def merge_statistics(statistics: BoardStatistics, other: BoardStatistics) -> BoardStatistics:
+    """
+    Add the histograms of `other` to the ones of `statistics` (in place).
+
+    :param statistics:
+    :param other: statistics of the same configuration
+    :return: the updated statistics
+    """
+    statistics.three_bv.update(other.three_bv)
+    statistics.openings.update(other.openings)
+    statistics.largest_flood.update(other.largest_flood)
+    return statistics._replace(boards=statistics.boards + other.boards)
+
+
+def board_metrics(board: MineBoard) -> BoardMetrics:
+    """
+    Compute the metrics of a board with the mines placed.
+
+    :param board:
+    :return:
+    """
+    openings = board.openings
+    return BoardMetrics(openings.three_bv, len(openings.openings), openings.largest)
+
+
+def sample_statistics(config: BoardConfig, count: int, seed: int) -> BoardStatistics:
+    """
+    Generate boards and collect their metrics (a single chunk of work, run by a worker process).
+    The result depends only on the parameters.
+
+    :param config:
+    :param count: number of boards
+    :param seed: seed of the chunk
+    :return:
+    """
+    rng = random.Random(seed)
+    statistics = empty_statistics(config)
+    for _ in range(count):
+        board = MineBoard(config.width, config.height, config.mines, packed=True,
+                          rng=random.Random(rng.getrandbits(64)), topology=config.topology)
+        metrics = board_metrics(board)
+        statistics.three_bv.add(metrics.three_bv)
+        statistics.openings.add(metrics.openings)
+        statistics.largest_flood.add(metrics.largest_flood)
+    return statistics._replace(boards=count)
+
+
+def collect_statistics(configs: Sequence[BoardConfig], count: int, seed: Optional[int] = None,
+                       workers: Optional[int] = None, chunk_size: int = 500) -> Iterator[BoardStatistics]:
+    """
+    Generate boards for every configuration using a pool of worker processes and collect their metrics.
+    The statistics of a configuration are yielded (aggregated so far) every time a chunk of its boards is done;
+    the last statistics yielded for a configuration are the complete ones (the histograms are shared between
+    the statistics yielded for a configuration, they are updated in place).
+
+    :param configs: board configurations
+    :param count: number of boards for every configuration
+    :param seed: seed of the run (a random one is used if not given)
+    :param workers: number of worker processes (defaults to the number of CPUs)
+    :param chunk_size: number of boards generated by a worker at a time
+    :return: generator of the statistics
+    """
+    if count < 0 or chunk_size <= 0:
+        raise RuntimeError(f"Invalid number of boards ({count}) or chunk size ({chunk_size}).")
+    if seed is None:
+        seed = random.getrandbits(64)
+    rng = random.Random(seed)
+
+    totals = {config: empty_statistics(config) for config in configs}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(sample_statistics, config, min(chunk_size, count - start), rng.getrandbits(64))
+                   for config in totals for start in range(0, count, chunk_size)]
+        try:
+            for future in as_completed(futures):
+                chunk = future.result()
+                totals[chunk.config] = merge_statistics(totals[chunk.config], chunk)
+                yield totals[chunk.config]
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def format_statistics(statistics: BoardStatistics) -> str:
+    """
+    Render the summary of the statistics (a line per metric).
+
+    :param statistics:
+    :return:
+    """
+    config = statistics.config
+    lines = [f"{config.width}x{config.height}, {config.mines} mines ({config.topology}), {statistics.boards} boards"]
+    for name, histogram in (("3BV", statistics.three_bv), ("openings", statistics.openings),
+                            ("largest flood", statistics.largest_flood)):
+        if histogram.total:
+            lines.append(f"  {name:>13}: mean {histogram.mean():8.2f}, min {histogram.percentile(0):5}, "
+                         f"median {histogram.percentile(50):5}, p95 {histogram.percentile(95):5}, "
+                         f"max {histogram.percentile(100):5}")
+    return "\n".join(lines)
@@ -1,3 +1,5 @@
+from typing import Iterator, List
+
 from model import REVEAL_HIDDEN_MINE
 
 # Some Unicode characters that may be useful for showing/debugging the board
@@ -12,12 +14,14 @@ HIDDEN_MINE = "\u25A3"
 
 
 class Cell:
-    def __init__(self, has_mine: bool = False):
+    __slots__ = ('has_mine', 'no_adjacent_mines', 'flagged', 'uncovered')
+
+    def __init__(self, has_mine: bool = False, no_adjacent_mines: int = 0):
         # do the cell hold the mine
         self.has_mine = has_mine
 
         # how many mines are neighbouring a given cell
-        self.no_adjacent_mines: int = 0
+        self.no_adjacent_mines: int = no_adjacent_mines
 
         # has the user marked the field as flagged
         self.flagged: bool = False
@@ -80,3 +84,157 @@ class Cell:
 
     def __repr__(self):
         return self.get_debug_representation()
+
+
+class SharedCell(Cell):
+    """
+    Immutable cell, shared by all the squares of the board in the same state (see `CellRow`):
+        * UNTOUCHED_MINE - a covered mine,
+        * UNTOUCHED_CELLS - covered cells without a mine (by the number of adjacent mines),
+        * REVEALED_CELLS - uncovered cells without a mine (by the number of adjacent mines).
+    None of them is flagged.
+    """
+    __slots__ = ()
+
+    # noinspection PyMissingConstructor
+    def __init__(self, has_mine: bool = False, no_adjacent_mines: int = 0, uncovered: bool = False):
+        object.__setattr__(self, 'has_mine', has_mine)
+        object.__setattr__(self, 'no_adjacent_mines', no_adjacent_mines)
+        object.__setattr__(self, 'flagged', False)
+        object.__setattr__(self, 'uncovered', uncovered)
+
+    def __setattr__(self, name, value):
+        raise RuntimeError("The shared cell cannot be modified (modify the cell through `cells[y][x]`).")
+
+    def __reduce__(self):
+        # the shared cells are unpickled (and copied) as the same instances
+        return shared_cell, (self.has_mine, self.no_adjacent_mines, self.uncovered)
+
+    def copy(self) -> Cell:
+        """
+        Get a (modifiable) cell in the same state.
+        :return:
+        """
+        c = Cell(self.has_mine, self.no_adjacent_mines)
+        c.uncovered = self.uncovered
+        return c
+
+
+UNTOUCHED_MINE = SharedCell(has_mine=True)
+UNTOUCHED_CELLS = tuple(SharedCell(no_adjacent_mines=n) for n in range(9))
+UNTOUCHED_CELL = UNTOUCHED_CELLS[0]
+REVEALED_CELLS = tuple(SharedCell(no_adjacent_mines=n, uncovered=True) for n in range(9))
+
+
+def shared_cell(has_mine: bool, no_adjacent_mines: int, uncovered: bool) -> SharedCell:
+    """
+    Get the shared cell in the given state.
+
+    :param has_mine:
+    :param no_adjacent_mines:
+    :param uncovered:
+    :return:
+    """
+    if has_mine:
+        return UNTOUCHED_MINE
+    return (REVEALED_CELLS if uncovered else UNTOUCHED_CELLS)[no_adjacent_mines]
+
+
+class CellView(Cell):
+    """
+    View of a square of the object storage holding a shared cell (see `CellRow`).
+    The reads go to the cell stored in the row; the first modification replaces the shared cell with a copy
+    of its own (which the view, and everybody else, reads from then on).
+    """
+    __slots__ = ('_cells', '_x')
+
+    # noinspection PyMissingConstructor
+    def __init__(self, cells: List[Cell], x: int):
+        self._cells = cells
+        self._x = x
+
+    def __own(self) -> Cell:
+        cells, x = self._cells, self._x
+        c = cells[x]
+        if type(c) is SharedCell:
+            c = cells[x] = c.copy()
+        return c
+
+    @property
+    def has_mine(self) -> bool:
+        return self._cells[self._x].has_mine
+
+    @has_mine.setter
+    def has_mine(self, on_off: bool) -> None:
+        self.__own().has_mine = on_off
+
+    @property
+    def no_adjacent_mines(self) -> int:
+        return self._cells[self._x].no_adjacent_mines
+
+    @no_adjacent_mines.setter
+    def no_adjacent_mines(self, value: int) -> None:
+        self.__own().no_adjacent_mines = value
+
+    @property
+    def flagged(self) -> bool:
+        return self._cells[self._x].flagged
+
+    @flagged.setter
+    def flagged(self, on_off: bool) -> None:
+        self.__own().flagged = on_off
+
+    @property
+    def uncovered(self) -> bool:
+        return self._cells[self._x].uncovered
+
+    @uncovered.setter
+    def uncovered(self, on_off: bool) -> None:
+        self.__own().uncovered = on_off
+
+    def __reduce__(self):
+        # pickled (and copied) as the cell it shows
+        return self._cells[self._x].__reduce_ex__(2)
+
+
+class CellRow:
+    """
+    A row of the board cells (the object storage) as seen from the outside of the board.
+    The squares that were not modified individually share the SharedCell instances (copy-on-write).
+
+    Indexing and iterating the row give the same: the cells of their own as they are, and a CellView for the squares
+    holding a shared cell. Reading a view copies nothing, modifying it gives the square a cell of its own.
+    `MineBoard.cell_at` and `MineBoard.read_rows` give the cells as they are stored (for reading only).
+    """
+    __slots__ = ('cells',)
+
+    def __init__(self, cells: List[Cell]):
+        # the cells of the row, as they are stored by the board
+        self.cells = cells
+
+    def __getitem__(self, x: int) -> Cell:
+        cells = self.cells
+        c = cells[x]
+        if type(c) is SharedCell:
+            return CellView(cells, x)
+        return c
+
+    def __setitem__(self, x: int, cell: Cell) -> None:
+        self.cells[x] = cell
+
+    def __iter__(self) -> Iterator[Cell]:
+        cells = self.cells
+        return (CellView(cells, x) if type(c) is SharedCell else c for x, c in enumerate(cells))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    # concatenation gives plain lists (of the cells as iterating gives them), as it did when the rows were lists
+    def __add__(self, other) -> List[Cell]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[Cell]:
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(self.cells)
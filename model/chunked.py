@@ -0,0 +1,383 @@
+import random
+import tempfile
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from model import REVEAL_HIDDEN_MINE
+from model.cell import Cell
+from model.neighbours import adjacent_mine_counts
+from model.packed import PackedCell, MINE_BIT, UNCOVERED_BIT, COUNT_SHIFT, unpack_cell
+
+
+class ChunkedMineBoard:
+    """
+    An infinite board, split into square chunks.
+
+    The mines of every chunk come deterministically from (seed, chunk coordinates), so a chunk can be recreated
+    any time. A chunk is materialized (its cells get the packed storage, see `model.packed`) only when a move
+    reaches it. Adjacency counts on the chunk borders are computed from the mine layout of the neighbouring
+    chunks, which is generated from their seeds without materializing them.
+
+    At most `max_chunks` chunks are kept materialized: the least recently used ones are evicted after every move,
+    and during a flood fill (or rendering) as soon as it materializes a chunk over the limit. Evicted chunks without any changes
+    (no cell uncovered or flagged) are simply dropped; the others are kept compressed until they are needed again.
+    At most `max_compressed` bytes of the compressed chunks are kept in memory, the least recently evicted ones
+    are spilled to a temporary file (the file only grows, the space of the chunks read back is not reused).
+
+    So the memory held by the board is bounded by:
+        * `max_chunks` materialized chunks (`chunk_size ** 2` bytes each),
+        * `max_compressed` bytes of compressed chunks,
+        * the cache of the mine layouts (`4 * max_chunks + 9` chunks, `chunk_size ** 2` bytes each),
+        * an index entry (a few dozen bytes) for every spilled chunk - the only part growing with the number of
+          changed chunks, however far the flood fill or the player goes,
+        * the cells left to expand by a flood fill cut off at `max_reveal` cells (see `unexpanded`).
+    """
+
+    def __init__(self, seed: int = 0, density: float = 0.15, chunk_size: int = 32, max_chunks: int = 256,
+                 max_reveal: int = 1_000_000, max_compressed: int = 64 * 2 ** 20):
+        if not 0 <= density < 1:
+            raise RuntimeError(f"Invalid mine density ({density}).")
+        if chunk_size < 1:
+            raise RuntimeError(f"Invalid chunk size ({chunk_size}).")
+        if max_chunks < 1:
+            raise RuntimeError(f"Invalid limit of materialized chunks ({max_chunks}).")
+
+        self.seed: int = seed
+        self.density: float = density
+        self.chunk_size: int = chunk_size
+
+        # number of mines in every chunk
+        self.mines_per_chunk: int = round(density * chunk_size * chunk_size)
+
+        # limit of materialized chunks
+        self.max_chunks: int = max_chunks
+
+        # limit of cells revealed by a single flood fill (on a sparse board an opening can be really big)
+        self.max_reveal: int = max_reveal
+
+        # limit of the compressed chunks kept in memory (bytes)
+        self.max_compressed: int = max_compressed
+
+        # revealed empty cells whose neighbourhoods are not revealed yet, because a flood fill got cut off
+        # at `max_reveal` cells (see `resume`)
+        self.unexpanded: List[Tuple[int, int]] = []
+
+        # materialized chunks (packed cells), in the least recently used order
+        self.chunks: 'OrderedDict[Tuple[int, int], bytearray]' = OrderedDict()
+
+        # materialized chunks changed by the player, and compressed cells of such chunks that were evicted
+        # (in the order of eviction)
+        self.__touched: Set[Tuple[int, int]] = set()
+        self.__evicted: 'OrderedDict[Tuple[int, int], bytes]' = OrderedDict()
+        self.__evicted_bytes = 0
+
+        # compressed chunks spilled to the temporary file: chunk -> (offset, length)
+        self.__spilled: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.__spill_file = None
+
+        # cache of the recently generated mine layouts
+        self.__mine_layers: 'OrderedDict[Tuple[int, int], bytearray]' = OrderedDict()
+
+    def __mine_layer(self, cx: int, cy: int) -> bytearray:
+        """
+        Get the mine layout of a chunk (generated from the seed and the chunk coordinates).
+
+        :param cx:
+        :param cy:
+        :return: flat mine mask of the chunk, 1 for a mine, 0 otherwise
+        """
+        key = (cx, cy)
+        layer = self.__mine_layers.get(key)
+        if layer is not None:
+            self.__mine_layers.move_to_end(key)
+            return layer
+
+        field_cnt = self.chunk_size * self.chunk_size
+        layer = bytearray(field_cnt)
+        for shot in random.Random(f"{self.seed}:{cx}:{cy}").sample(range(field_cnt), self.mines_per_chunk):
+            layer[shot] = 1
+
+        self.__mine_layers[key] = layer
+        if len(self.__mine_layers) > 4 * self.max_chunks + 9:
+            self.__mine_layers.popitem(last=False)
+        return layer
+
+    def __materialize(self, cx: int, cy: int) -> bytearray:
+        """
+        Create the cells of a chunk.
+
+        :param cx:
+        :param cy:
+        :return: packed cells of the chunk
+        """
+        evicted = self.__restore((cx, cy))
+        if evicted is not None:
+            self.__touched.add((cx, cy))
+            return bytearray(zlib.decompress(evicted))
+
+        # the mines of the chunk with a one cell wide frame of the mines from the neighbouring chunks
+        size = self.chunk_size
+        ext = size + 2
+        mask = bytearray(ext * ext)
+        # for every direction: source range (in the neighbouring chunk) and the start in the extended mask
+        parts = {-1: (size - 1, size, 0), 0: (0, size, 1), 1: (0, 1, size + 1)}
+        for dy, (from_y, to_y, ext_y) in parts.items():
+            for dx, (from_x, to_x, ext_x) in parts.items():
+                layer = self.__mine_layer(cx + dx, cy + dy)
+                for y in range(from_y, to_y):
+                    start = (ext_y + y - from_y) * ext + ext_x
+                    mask[start:start + to_x - from_x] = layer[y * size + from_x:y * size + to_x]
+
+        counts = adjacent_mine_counts(mask, ext, ext)
+        data = bytearray(size * size)
+        for y in range(size):
+            for x in range(size):
+                e = (y + 1) * ext + x + 1
+                data[y * size + x] = MINE_BIT if mask[e] else counts[e] << COUNT_SHIFT
+        return data
+
+    def __chunk(self, cx: int, cy: int) -> bytearray:
+        """
+        Get the cells of a chunk, materializing it if needed.
+
+        :param cx:
+        :param cy:
+        :return:
+        """
+        key = (cx, cy)
+        data = self.chunks.get(key)
+        if data is None:
+            data = self.chunks[key] = self.__materialize(cx, cy)
+        else:
+            self.chunks.move_to_end(key)
+        return data
+
+    def __evict(self, limit: int = None) -> None:
+        """
+        Evict the least recently used chunks over the limit.
+        The evicted chunks must not be changed through the references held by the caller any more
+        (the flood fill drops its references first).
+
+        :param limit: number of chunks to be kept (`max_chunks` by default)
+        :return:
+        """
+        limit = self.max_chunks if limit is None else limit
+        while len(self.chunks) > limit:
+            key, data = self.chunks.popitem(last=False)
+            if key in self.__touched:
+                self.__touched.discard(key)
+                self.__store(key, zlib.compress(bytes(data)))
+
+    def __store(self, key: Tuple[int, int], compressed: bytes) -> None:
+        """
+        Keep the compressed cells of an evicted chunk, spilling the least recently evicted ones to the temporary
+        file when there are more than `max_compressed` bytes of them.
+
+        :param key:
+        :param compressed:
+        :return:
+        """
+        self.__evicted[key] = compressed
+        self.__evicted_bytes += len(compressed)
+        while self.__evicted_bytes > self.max_compressed:
+            old_key, old = self.__evicted.popitem(last=False)
+            self.__evicted_bytes -= len(old)
+            if self.__spill_file is None:
+                self.__spill_file = tempfile.TemporaryFile()
+            offset = self.__spill_file.seek(0, 2)
+            self.__spill_file.write(old)
+            self.__spilled[old_key] = (offset, len(old))
+
+    def __restore(self, key: Tuple[int, int]) -> Optional[bytes]:
+        """
+        Take the compressed cells of an evicted chunk (from the memory or the temporary file).
+
+        :param key:
+        :return: the compressed cells, or None if the chunk has no changes stored
+        """
+        compressed = self.__evicted.pop(key, None)
+        if compressed is not None:
+            self.__evicted_bytes -= len(compressed)
+            return compressed
+        spilled = self.__spilled.pop(key, None)
+        if spilled is None:
+            return None
+        offset, length = spilled
+        self.__spill_file.seek(offset)
+        return self.__spill_file.read(length)
+
+    def __locate(self, x: int, y: int) -> Tuple[bytearray, int]:
+        """
+        Find the cell in the chunks.
+
+        :param x:
+        :param y:
+        :return: the chunk cells and the index of the cell in it
+        """
+        cx, local_x = divmod(x, self.chunk_size)
+        cy, local_y = divmod(y, self.chunk_size)
+        return self.__chunk(cx, cy), local_y * self.chunk_size + local_x
+
+    def is_mine_at(self, x: int, y: int) -> bool:
+        cx, local_x = divmod(x, self.chunk_size)
+        cy, local_y = divmod(y, self.chunk_size)
+        return bool(self.__mine_layer(cx, cy)[local_y * self.chunk_size + local_x])
+
+    def cell_at(self, x: int, y: int) -> Cell:
+        """
+        Get (a copy of) the cell at given location.
+
+        :param x:
+        :param y:
+        :return:
+        """
+        data, i = self.__locate(x, y)
+        cell = unpack_cell(data[i])
+        self.__evict()
+        return cell
+
+    def flag(self, x: int, y: int, on_off: bool = True) -> Cell:
+        """
+        Set (or clear) the flag on the cell at given location.
+
+        :param x:
+        :param y:
+        :param on_off:
+        :return: (a copy of) the flagged cell
+        """
+        data, i = self.__locate(x, y)
+        PackedCell(data, i).flag(on_off)
+        self.__touched.add((x // self.chunk_size, y // self.chunk_size))
+        cell = unpack_cell(data[i])
+        self.__evict()
+        return cell
+
+    def uncover(self, x: int, y: int) -> Cell:
+        """
+        Uncover the cell at given location (expanding it, if it has no adjacent mines).
+
+        :param x:
+        :param y:
+        :return: (a copy of) the uncovered cell
+        """
+        data, i = self.__locate(x, y)
+        PackedCell(data, i).reveal()
+        self.__touched.add((x // self.chunk_size, y // self.chunk_size))
+        # the flood fill may evict the chunk, the cell is read before
+        cell = unpack_cell(data[i])
+        if not cell.has_mine and cell.no_adjacent_mines == 0:
+            self.__flood([(x, y)], [])
+
+        self.__evict()
+        return cell
+
+    def expand(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """
+        Reveal the neighbourhood of the given cell (flood fill), as `MineBoard.expand` does.
+
+        :param x:
+        :param y:
+        :return: list of coordinates of the cells revealed by the expansion
+        """
+        revealed: List[Tuple[int, int]] = []
+        self.__flood([(x, y)], revealed)
+
+        self.__evict()
+        return revealed
+
+    def resume(self) -> List[Tuple[int, int]]:
+        """
+        Continue the flood fills cut off at `max_reveal` cells: expand the `unexpanded` cells
+        (again up to `max_reveal` cells).
+
+        :return: list of coordinates of the revealed cells
+        """
+        stack, self.unexpanded = self.unexpanded, []
+        revealed: List[Tuple[int, int]] = []
+        self.__flood(stack, revealed)
+
+        self.__evict()
+        return revealed
+
+    def __flood(self, stack: List[Tuple[int, int]], revealed: List[Tuple[int, int]]) -> None:
+        """
+        Flood fill engine: reveal the neighbourhoods of the cells on the work stack.
+        It stops after revealing `max_reveal` cells; the cells left on the stack (revealed empty cells, not expanded
+        yet) are added to `unexpanded`, so every revealed empty cell is either expanded or listed there.
+
+        :param stack: cells to be expanded (the stack is consumed)
+        :param revealed: list the coordinates of revealed cells are appended to
+        :return:
+        """
+        size = self.chunk_size
+        # the chunks used by the flood (the references are dropped before any chunk gets evicted)
+        chunks: Dict[Tuple[int, int], bytearray] = {}
+        limit = len(revealed) + self.max_reveal
+
+        while stack and len(revealed) < limit:
+            cx, cy = stack.pop()
+            for row in range(cy - 1, cy + 2):
+                chunk_y, local_y = divmod(row, size)
+                for col in range(cx - 1, cx + 2):
+                    if col == cx and row == cy:  # the expanded cell is not its own neighbour
+                        continue
+                    chunk_x, local_x = divmod(col, size)
+                    key = (chunk_x, chunk_y)
+                    data = chunks.get(key)
+                    if data is None:
+                        if len(self.chunks) >= self.max_chunks and key not in self.chunks:
+                            # a chunk is going to be materialized over the limit: make room for it, keeping
+                            # the chunks of the flood as the most recently used ones
+                            for used in chunks:
+                                self.chunks.move_to_end(used)
+                            chunks.clear()
+                            self.__evict(self.max_chunks - 1)
+                        data = self.__chunk(chunk_x, chunk_y)
+                        chunks[key] = data
+
+                    i = local_y * size + local_x
+                    # only unrevealed cells need to be revealed
+                    if not data[i] & UNCOVERED_BIT:
+                        PackedCell(data, i).reveal()
+                        self.__touched.add(key)
+                        revealed.append((col, row))
+                        if data[i] >> COUNT_SHIFT == 0:  # it is an empty cell, expand neighbours
+                            stack.append((col, row))
+
+        self.unexpanded.extend(stack)
+
+    def render(self, x: int, y: int, width: int, height: int) -> str:
+        """
+        Get the representation of a rectangular part of the board.
+
+        :param x: left column
+        :param y: top row
+        :param width:
+        :param height:
+        :return:
+        """
+        # the window is rendered chunk by chunk, in bands of the rows of the chunks, evicting the chunks as it goes
+        # (so no more than `max_chunks` of them are materialized at once)
+        size = self.chunk_size
+        lines = []
+        band_y = y
+        while band_y < y + height:
+            cy = band_y // size
+            band_end = min((cy + 1) * size, y + height)
+            band = [[] for _ in range(band_y, band_end)]
+            part_x = x
+            while part_x < x + width:
+                cx = part_x // size
+                part_end = min((cx + 1) * size, x + width)
+                if (cx, cy) not in self.chunks and len(self.chunks) >= self.max_chunks:
+                    self.__evict(self.max_chunks - 1)
+                data = self.__chunk(cx, cy)
+                for line, row in zip(band, range(band_y, band_end)):
+                    offset = (row - cy * size) * size - cx * size
+                    line.append(''.join(PackedCell(data, offset + col).get_representation(
+                        reveal_hidden_mine=REVEAL_HIDDEN_MINE) for col in range(part_x, part_end)))
+                part_x = part_end
+            lines.extend(''.join(line) for line in band)
+            band_y = band_end
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,100 @@
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from model.board import MineBoard
+from model.solver import Solver
+
+
+class GeneratedBoard(NamedTuple):
+    """
+    A board that can be solved without guessing.
+    """
+    # seed the board was generated from
+    seed: int
+    # the cell to be uncovered first (never a mine; it has no adjacent mines unless the board is too dense
+    # to keep its neighbourhood clear); the board is solvable from there
+    start: Tuple[int, int]
+    # the board, with the mines placed and all the cells covered
+    board: MineBoard
+
+
+def is_solvable(board: MineBoard, x: int, y: int) -> bool:
+    """
+    Check if the board can be solved without guessing, starting with uncovering the given cell.
+    The board gets played (cells get uncovered) on the way.
+
+    :param board:
+    :param x:
+    :param y:
+    :return:
+    """
+    board.uncover(x, y)
+    solver = Solver(board)
+    while not (board.status.won or board.status.lost):
+        moves = solver.next_safe_moves()
+        if not moves:
+            break
+        board.uncover_many(moves)
+    return board.status.won
+
+
+def generate_no_guess_board(width: int, height: int, expected_number_of_mines: int, seed: int,
+                            max_attempts: int = 1000) -> Tuple[int, Tuple[int, int], bytes]:
+    """
+    Generate a board that can be solved without guessing (candidates are generated until one passes the check).
+    The result depends only on the parameters (the seed in particular).
+
+    :param width:
+    :param height:
+    :param expected_number_of_mines:
+    :param seed:
+    :param max_attempts: number of candidates to check before giving up
+    :return: seed, start cell, the board serialized with `MineBoard.to_bytes`
+    """
+    rng = random.Random(seed)
+    start = (width // 2, height // 2)
+    for _ in range(max_attempts):
+        # the mines are placed on the first move, keeping the start cell clear (and its neighbours, if there is room)
+        candidate = MineBoard(width, height, expected_number_of_mines, packed=True,
+                              rng=random.Random(rng.getrandbits(64)), lazy=True, safe_neighbourhood=True)
+        if is_solvable(candidate, *start):
+            board = MineBoard(width, height, packed=True)
+            board.plant_mines((x, y) for y in range(height) for x in range(width) if candidate.is_mine_at(x, y))
+            board.expected_number_of_mines = expected_number_of_mines
+            return seed, start, board.to_bytes()
+
+    raise RuntimeError(f"No board solvable without guessing found in {max_attempts} attempts.")
+
+
+def generate_no_guess_boards(width: int, height: int, expected_number_of_mines: int, count: int,
+                             seeds: Optional[Sequence[int]] = None, workers: Optional[int] = None,
+                             max_attempts: int = 1000) -> Iterator[GeneratedBoard]:
+    """
+    Generate boards that can be solved without guessing, using a pool of worker processes.
+    The boards are yielded as soon as they are ready (not necessarily in the order of the seeds).
+
+    :param width:
+    :param height:
+    :param expected_number_of_mines:
+    :param count: number of boards
+    :param seeds: seed for every board (random ones are used if not given)
+    :param workers: number of worker processes (defaults to the number of CPUs)
+    :param max_attempts: number of candidates checked for a single board before giving up
+    :return: generator of the boards
+    """
+    if seeds is None:
+        seeds = [random.getrandbits(64) for _ in range(count)]
+    if len(seeds) != count:
+        raise RuntimeError(f"Invalid number of seeds ({len(seeds)}) for {count} boards.")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_no_guess_board, width, height, expected_number_of_mines, seed, max_attempts)
+                   for seed in seeds]
+        try:
+            for future in as_completed(futures):
+                seed, start, data = future.result()
+                yield GeneratedBoard(seed, start, MineBoard.from_bytes(data))
+        finally:
+            for future in futures:
+                future.cancel()
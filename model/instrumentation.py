@@ -0,0 +1,149 @@
+"""
+Optional instrumentation of the board hot paths: counters and timing of the public methods.
+
+It is disabled by default. When disabled, the board methods only check whether `STATS` is set (once per call),
+and the methods are not wrapped at all. `enable()` installs timing wrappers on the public MineBoard methods
+(and on their overrides in the MineBoard subclasses defined by then), `disable()` removes them.
+"""
+import functools
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+# MineBoard methods timed when the instrumentation is enabled
+TIMED_METHODS = (
+    "uncover", "uncover_many", "expand", "chord", "flag", "flag_many", "plant_mine", "plant_mines",
+    "changes", "render", "to_bytes", "__str__",
+)
+
+
+class Stats:
+    """
+    Collected statistics: counters, maximums and method timings.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.maximums: Dict[str, int] = {}
+        # method -> [number of calls, total seconds]
+        self.timings: Dict[str, list] = {}
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def maximum(self, name: str, value: int) -> None:
+        if value > self.maximums.get(name, 0):
+            self.maximums[name] = value
+
+    def timing(self, method: str, seconds: float) -> None:
+        timing = self.timings.setdefault(method, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.maximums.clear()
+        self.timings.clear()
+
+    def as_dict(self) -> dict:
+        """
+        Export the statistics as a dict.
+
+        :return:
+        """
+        return {
+            "counters": dict(self.counters),
+            "maximums": dict(self.maximums),
+            "timings": {method: {"calls": calls, "seconds": seconds}
+                        for method, (calls, seconds) in self.timings.items()},
+        }
+
+    def to_prometheus(self, prefix: str = "minesweeper") -> str:
+        """
+        Export the statistics in the Prometheus text format.
+
+        :param prefix: prefix of the metric names
+        :return:
+        """
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, value in sorted(self.maximums.items()):
+            lines.append(f"# TYPE {prefix}_{name}_max gauge")
+            lines.append(f"{prefix}_{name}_max {value}")
+        if self.timings:
+            lines.append(f"# TYPE {prefix}_method_calls_total counter")
+            for method, (calls, _) in sorted(self.timings.items()):
+                lines.append(f'{prefix}_method_calls_total{{method="{method}"}} {calls}')
+            lines.append(f"# TYPE {prefix}_method_seconds_total counter")
+            for method, (_, seconds) in sorted(self.timings.items()):
+                lines.append(f'{prefix}_method_seconds_total{{method="{method}"}} {seconds:.9f}')
+        return '\n'.join(lines) + '\n'
+
+
+# the collected statistics; None when the instrumentation is disabled
+STATS: Optional[Stats] = None
+
+# original (not wrapped) methods: (class, method name) -> method
+__originals: Dict[Tuple[type, str], object] = {}
+
+
+def __timed(name: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats = STATS
+            if stats is not None:
+                stats.timing(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def __board_classes() -> Iterator[type]:
+    """
+    Get MineBoard and all its subclasses (the subclasses may override the timed methods).
+    """
+    from model.board import MineBoard
+
+    classes = [MineBoard]
+    while classes:
+        cls = classes.pop()
+        yield cls
+        classes.extend(cls.__subclasses__())
+
+
+def enable() -> Stats:
+    """
+    Enable the instrumentation (if it is not enabled yet).
+
+    :return: the statistics being collected
+    """
+    global STATS
+
+    if STATS is None:
+        STATS = Stats()
+        for cls in __board_classes():
+            for name in TIMED_METHODS:
+                method = cls.__dict__.get(name)
+                if method is not None:
+                    __originals[cls, name] = method
+                    setattr(cls, name, __timed(name, method))
+    return STATS
+
+
+def disable() -> Optional[Stats]:
+    """
+    Disable the instrumentation.
+
+    :return: the statistics collected so far
+    """
+    global STATS
+
+    for (cls, name), method in __originals.items():
+        setattr(cls, name, method)
+    __originals.clear()
+    stats, STATS = STATS, None
+    return stats
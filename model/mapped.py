@@ -0,0 +1,116 @@
+import mmap
+import random
+from typing import Iterable, Tuple
+
+from model.board import MineBoard, BOARD_HEADER
+
+
+class MappedMineBoard(MineBoard):
+    """
+    A board kept in a memory-mapped file, in the binary board format (see `MineBoard.to_bytes`).
+    The cells are accessed directly in the mapping (packed storage), so only the pages of the regions being
+    touched are loaded into memory, and the board can be bigger than the available RAM.
+
+    The header (mine counts and the status counters) is written back on `flush` and `close`.
+
+    The flood fill of `uncover` writes the revealed cells straight into the mapping and only counts them,
+    so a huge opening needs no memory of its own (the whole board counts as changed afterwards).
+    """
+    collect_revealed = False
+
+    def __init__(self, file, mapping: mmap.mmap, width: int, height: int, expected_number_of_mines: int = 0,
+                 rng: random.Random = None, lazy: bool = False, safe_neighbourhood: bool = False):
+        self.file = file
+        self.mapping = mapping
+        super().__init__(width, height, expected_number_of_mines, rng=rng, lazy=lazy,
+                         safe_neighbourhood=safe_neighbourhood,
+                         cells_data=memoryview(mapping)[BOARD_HEADER.size:])
+
+    @classmethod
+    def create(cls, path: str, width: int, height: int, expected_number_of_mines: int = 0,
+               rng: random.Random = None, lazy: bool = False, safe_neighbourhood: bool = False) -> 'MappedMineBoard':
+        """
+        Create a new board file (an existing file gets overwritten).
+        The file is extended (not written), so on most file systems a fresh board takes no disk space
+        except for the pages holding the mines.
+
+        :param path:
+        :param width:
+        :param height:
+        :param expected_number_of_mines:
+        :param rng:
+        :param lazy:
+        :param safe_neighbourhood:
+        :return:
+        """
+        file = open(path, "w+b")
+        file.truncate(BOARD_HEADER.size + width * height)
+        mapping = mmap.mmap(file.fileno(), 0)
+        board = cls(file, mapping, width, height, expected_number_of_mines, rng=rng, lazy=lazy,
+                    safe_neighbourhood=safe_neighbourhood)
+        board.flush()
+        return board
+
+    @classmethod
+    def open(cls, path: str) -> 'MappedMineBoard':
+        """
+        Open an existing board file. Only the header is read, the cells are mapped.
+
+        :param path:
+        :return:
+        """
+        file = open(path, "r+b")
+        mapping = mmap.mmap(file.fileno(), 0)
+        try:
+            header = cls.read_header(mapping)
+            if len(mapping) != BOARD_HEADER.size + header.width * header.height:
+                raise RuntimeError(f"Invalid board file (expected {header.width * header.height} cells).")
+        except RuntimeError:
+            mapping.close()
+            file.close()
+            raise
+
+        board = cls(file, mapping, header.width, header.height)
+        board.restore_state(header)
+        return board
+
+    def plant_mines(self, mines: Iterable[Tuple[int, int]]):
+        """
+        Place many mines at once.
+        Unlike the in-memory board, the mines are planted one by one, so only the pages around them are touched
+        (the bulk computation would go through the whole file).
+
+        :param mines: coordinates (x, y) of the mines
+        :return:
+        """
+        for x, y in mines:
+            self.plant_mine(x, y)
+
+    def flush(self) -> None:
+        """
+        Write the header and flush the changes to the file.
+
+        :return:
+        """
+        self.mapping[:BOARD_HEADER.size] = BOARD_HEADER.pack(*self.header())
+        self.mapping.flush()
+
+    def close(self) -> None:
+        """
+        Flush the changes and close the file.
+
+        :return:
+        """
+        if self.mapping.closed:
+            return
+        self.flush()
+        # the cells view has to be released before the mapping can be closed
+        self.cells.data.release()
+        self.mapping.close()
+        self.file.close()
+
+    def __enter__(self) -> 'MappedMineBoard':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
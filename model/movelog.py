@@ -0,0 +1,213 @@
+"""
+Append-only binary log of the moves made on a board, and the replayer checking the logged games.
+
+A log consists of game sessions. Every session starts with the header (LOG_HEADER) and the snapshot of the board
+at the moment the recording started (in the binary board format, see `MineBoard.to_bytes`), so the mine layout
+is recorded once. Then the moves follow as fixed-width records (MOVE_RECORD): the kind of the move, its
+coordinates and the outcome (number of revealed cells, was a mine hit, is the game over).
+The mines planted later (i.e. on the first move of a lazy board) are logged as records, too.
+When a game gets over, the digest of the board follows (see `board_digest`), so the replayer checks
+the whole final state, not only the outcomes of the moves.
+
+Sessions can be concatenated (i.e. many games appended to one file); a header is told apart from a record
+by its first byte.
+"""
+import hashlib
+import struct
+from typing import BinaryIO, Iterator, List, NamedTuple, Tuple
+
+LOG_MAGIC = b"MSWL"
+LOG_FORMAT_VERSION = 2
+# magic, version, length of the board snapshot following the header
+LOG_HEADER = struct.Struct("<4sBI")
+# kind, outcome, x, y, number of revealed cells
+MOVE_RECORD = struct.Struct("<BBIII")
+
+# kinds of the records
+MOVE_UNCOVER = 1
+MOVE_FLAG = 2
+MOVE_UNFLAG = 3
+MOVE_CHORD = 4
+# one of the moves of `uncover_many` (the outcome is recorded with the last one, marked with OUTCOME_BATCH_END)
+MOVE_UNCOVER_MANY = 5
+# a mine planted on the board
+MOVE_MINE = 6
+# the pending mines of a lazy board got placed (the mines follow as MOVE_MINE records); `revealed` holds their number
+MOVE_GENERATE = 7
+# the neighbourhood of a cell expanded (`expand`)
+MOVE_EXPAND = 8
+# digest of the board (see `board_digest`): x, y and `revealed` hold its three parts (version 2)
+MOVE_DIGEST = 9
+
+# outcome bits
+OUTCOME_MINE_HIT = 0x01
+OUTCOME_GAME_OVER = 0x02
+OUTCOME_BATCH_END = 0x04
+
+
+class MoveRecord(NamedTuple):
+    """
+    A single record of the log.
+    """
+    kind: int
+    outcome: int
+    x: int
+    y: int
+    revealed: int
+
+
+def board_digest(board) -> Tuple[int, int, int]:
+    """
+    Compute the digest of the board state (the 12-byte BLAKE2 hash of `MineBoard.to_bytes`, as three numbers).
+
+    :param board: MineBoard
+    :return:
+    """
+    return struct.unpack("<III", hashlib.blake2b(board.to_bytes(), digest_size=12).digest())
+
+
+class MoveLog:
+    """
+    Writer of a single session of the log. The records are appended to the file as the moves are made;
+    the file is never read or rewritten.
+    """
+
+    def __init__(self, file: BinaryIO, board):
+        """
+        Start the session: write the header and the snapshot of the board.
+
+        :param file: binary file opened for writing (or appending)
+        :param board: MineBoard
+        """
+        self.file = file
+        snapshot = board.to_bytes()
+        file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_FORMAT_VERSION, len(snapshot)))
+        file.write(snapshot)
+
+    def record(self, kind: int, x: int, y: int, revealed: int = 0, outcome: int = 0) -> None:
+        self.file.write(MOVE_RECORD.pack(kind, outcome, x, y, revealed))
+
+    def record_digest(self, board) -> None:
+        """
+        Append the digest of the board state (see `board_digest`); the replayer checks the replayed board against it.
+
+        :param board: MineBoard
+        :return:
+        """
+        self.record(MOVE_DIGEST, *board_digest(board))
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+def read_records(file: BinaryIO) -> Iterator[Tuple[bytes, MoveRecord]]:
+    """
+    Stream the log: yield the board snapshot at the beginning of every session, then its records.
+    Only a record (or a snapshot) at a time is held in memory.
+
+    :param file: binary file opened for reading
+    :return: (snapshot, None) for the beginning of every session, (None, record) for the records
+    """
+    read = file.read
+    size = MOVE_RECORD.size
+    unpack = MOVE_RECORD.unpack
+    magic = LOG_MAGIC[0]
+    session = False
+    while True:
+        data = read(size)
+        if not data:
+            return
+
+        if data[0] == magic:
+            # the beginning of a session (the header is shorter than a record)
+            data += read(max(0, LOG_HEADER.size - len(data)))
+            magic_bytes, version, length = LOG_HEADER.unpack_from(data)
+            if magic_bytes != LOG_MAGIC:
+                raise RuntimeError("Invalid move log (unknown format).")
+            if not 1 <= version <= LOG_FORMAT_VERSION:
+                raise RuntimeError(f"Unsupported move log format version ({version}).")
+            snapshot = data[LOG_HEADER.size:] + read(length - (len(data) - LOG_HEADER.size))
+            if len(snapshot) != length:
+                raise RuntimeError("Invalid move log (truncated board snapshot).")
+            session = True
+            yield snapshot, None
+            continue
+
+        if not session:
+            raise RuntimeError("Invalid move log (a record before the header).")
+        if len(data) != size:
+            raise RuntimeError("Invalid move log (truncated record).")
+        yield None, MoveRecord._make(unpack(data))
+
+
+def replay(file: BinaryIO, packed: bool = False, check: bool = True) -> Iterator[Tuple[object, MoveRecord]]:
+    """
+    Replay the logged games: rebuild the board of every session from the snapshot and apply the moves,
+    checking their outcomes (and the logged digests of the board) against the log. The log is streamed
+    (see `read_records`).
+
+    :param file: binary file opened for reading
+    :param packed: should the rebuilt boards use the packed storage
+    :param check: check the outcomes of the moves (a RuntimeError is raised on a mismatch)
+    :return: (board, record) for every record, after the record got applied to the board
+    """
+    from model.board import MineBoard
+
+    board = None
+    batch: List[Tuple[int, int]] = []
+    number = 0
+    for snapshot, record in read_records(file):
+        if snapshot is not None:
+            board = MineBoard.from_bytes(snapshot, packed=packed)
+            batch = []
+            number = 0
+            continue
+
+        number += 1
+        kind, outcome, x, y, revealed = record
+        before = board.number_of_uncovered + board.number_of_triggered_mines
+        triggered = board.number_of_triggered_mines
+        checked = True
+        if kind == MOVE_UNCOVER:
+            board.uncover(x, y)
+        elif kind == MOVE_FLAG:
+            board.flag(x, y, True)
+            checked = False
+        elif kind == MOVE_UNFLAG:
+            board.flag(x, y, False)
+            checked = False
+        elif kind == MOVE_CHORD:
+            board.chord(x, y)
+        elif kind == MOVE_EXPAND:
+            board.expand(x, y)
+        elif kind == MOVE_UNCOVER_MANY:
+            batch.append((x, y))
+            checked = bool(outcome & OUTCOME_BATCH_END)
+            if checked:
+                board.uncover_many(batch)
+                batch = []
+        elif kind == MOVE_MINE:
+            board.plant_mine(x, y)
+            checked = False
+        elif kind == MOVE_GENERATE:
+            if board.pending_mines != revealed:
+                raise RuntimeError(f"Replay mismatch at record {number}: {board.pending_mines} pending mines, "
+                                   f"{revealed} logged.")
+            board.pending_mines = 0
+            checked = False
+        elif kind == MOVE_DIGEST:
+            if check and board_digest(board) != (x, y, revealed):
+                raise RuntimeError(f"Replay mismatch at record {number}: the board differs from the logged one.")
+            checked = False
+        else:
+            raise RuntimeError(f"Invalid move log (unknown record kind {kind}).")
+
+        if check and checked:
+            actual = ((OUTCOME_MINE_HIT if board.number_of_triggered_mines > triggered else 0)
+                      | (OUTCOME_GAME_OVER if board.game_over else 0)
+                      | (outcome & OUTCOME_BATCH_END))
+            actual_revealed = board.number_of_uncovered + board.number_of_triggered_mines - before
+            if actual != outcome or actual_revealed != revealed:
+                raise RuntimeError(f"Replay mismatch at record {number} ({record}): "
+                                   f"revealed {actual_revealed}, outcome {actual:#x}.")
+        yield board, record
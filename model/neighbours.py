@@ -0,0 +1,337 @@
+"""
+Board topologies and neighbour tables.
+
+A topology decides which cells are adjacent: the classic rectangle (8 neighbours, clamped at the edges),
+the torus (8 neighbours, wrapping around the edges) or the hex grid (6 neighbours).
+
+The neighbours are precomputed once per topology and board shape, and shared by all the boards of the same
+dimensions. The table is indexed with the flat cell index (`y * width + x`); every entry is a tuple of (x, y)
+coordinates of the neighbours (without the cell itself). The coordinate tuples (and the flat indices of the index
+tables) are shared between the entries, still a table costs much more than the board it serves: about 170 bytes
+per cell for the coordinates and 140 bytes per cell for the indices (a packed board takes a byte per cell).
+So only the small boards (up to MAX_TABLE_CELLS cells, i.e. 100x100: about 1.7 MB and 1.4 MB) get the tables;
+the bigger ones get the neighbourhoods computed on demand (the flood fill gets the rectangle ones from
+`box_ranges`, which take a range per column and row).
+The tables of the recently used shapes are kept, up to MAX_CACHED_CELLS cells of every kind of the table.
+"""
+import functools
+from collections import OrderedDict
+from operator import add
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Coords = Tuple[int, int]
+NeighbourTable = Tuple[Tuple[Coords, ...], ...]
+# the same, with flat indices of the neighbours instead of the coordinates
+IndexTable = Tuple[Tuple[int, ...], ...]
+
+# boards with more cells don't get a table (it would take too much memory)
+MAX_TABLE_CELLS = 10_000
+# total number of cells of the cached tables (of a kind); the least recently used ones are dropped first
+MAX_CACHED_CELLS = 20_000
+
+
+def rectangle_neighbours(x: int, y: int, width: int, height: int) -> Tuple[Coords, ...]:
+    """
+    Compute coordinates of the cells adjacent to the given one (the coordinates are not validated).
+
+    :param x:
+    :param y:
+    :param width:
+    :param height:
+    :return:
+    """
+    cols = range(x - 1 if x > 0 else x, (x + 1 if x < width - 1 else x) + 1)
+    return tuple((col, row) for row in range(y - 1 if y > 0 else y, (y + 1 if y < height - 1 else y) + 1)
+                 for col in cols if col != x or row != y)
+
+
+@functools.lru_cache(maxsize=16)
+def box_ranges(size: int) -> Tuple[range, ...]:
+    """
+    Get the ranges of the columns (or rows) of the rectangle neighbourhoods, clamped at the edges: the neighbourhood
+    of (x, y) is the product of the x-th range of the columns and the y-th range of the rows (the cell itself
+    included). It takes a range per column and row, instead of a table entry per cell.
+
+    :param size: width (or height) of the board
+    :return:
+    """
+    return tuple(range(i - 1 if i > 0 else i, i + 2 if i < size - 1 else i + 1) for i in range(size))
+
+
+def adjacent_mine_counts(mask: Sequence[int], width: int, height: int) -> List[int]:
+    """
+    Compute number of adjacent mines for every cell of the (rectangular) board in one pass.
+    The counts are sums of the mine mask shifted in all the directions (a 3x3 box filter, done row by row):
+    first every row is summed with its left and right shifts, then every row of the sums is summed with
+    the rows above and below it. The mine itself is not excluded from its own count.
+
+    :param mask: flat (row after row) mine mask, 1 for a mine, 0 otherwise
+    :param width:
+    :param height:
+    :return: flat list of counts
+    """
+    zeros = [0] * width
+    horizontal = []
+    for y in range(height):
+        row = list(mask[y * width:(y + 1) * width])
+        horizontal.append(list(map(add, map(add, [0] + row[:-1], row), row[1:] + [0])))
+
+    counts: List[int] = []
+    for y in range(height):
+        above = horizontal[y - 1] if y > 0 else zeros
+        below = horizontal[y + 1] if y < height - 1 else zeros
+        counts.extend(map(add, map(add, above, horizontal[y]), below))
+    return counts
+
+
+class Topology:
+    """
+    Base class of the board topologies. Subclasses implement `compute_neighbours`;
+    the tables and the adjacency counts are derived from it.
+    """
+    # topology name (used i.e. by the server protocol)
+    name: str = None
+    # topology bits of the binary board format flags (see `model.board.BOARD_HEADER`)
+    flag: int = 0
+
+    def compute_neighbours(self, x: int, y: int, width: int, height: int) -> Tuple[Coords, ...]:
+        """
+        Compute coordinates of the cells adjacent to the given one (the coordinates are not validated).
+        Every neighbour is listed once and the cell itself is never listed.
+
+        :param x:
+        :param y:
+        :param width:
+        :param height:
+        :return:
+        """
+        raise NotImplementedError()
+
+    def table(self, width: int, height: int) -> Optional[NeighbourTable]:
+        """
+        Get the neighbour table for the board shape (it is built on the first call for the shape).
+
+        :param width:
+        :param height:
+        :return: the table, or None if the board is too big to have one
+        """
+        return _table(self, width, height)
+
+    def index_table(self, width: int, height: int) -> Optional[IndexTable]:
+        """
+        Get the neighbour table with flat indices (`y * width + x`) of the neighbours, for the passes over
+        flat cell arrays (it is built on the first call for the shape).
+
+        :param width:
+        :param height:
+        :return: the table, or None if the board is too big to have one
+        """
+        return _index_table(self, width, height)
+
+    def neighbours(self, x: int, y: int, width: int, height: int) -> Sequence[Coords]:
+        """
+        Get coordinates of the cells adjacent to the given one, from the table if there is one.
+
+        :param x:
+        :param y:
+        :param width:
+        :param height:
+        :return:
+        """
+        table = _table(self, width, height)
+        if table is None:
+            return self.compute_neighbours(x, y, width, height)
+        return table[y * width + x]
+
+    def adjacent_mine_counts(self, mask: Sequence[int], width: int, height: int) -> List[int]:
+        """
+        Compute number of adjacent mines for every cell of the board (by walking the neighbourhoods of the mines).
+
+        :param mask: flat (row after row) mine mask, 1 for a mine, 0 otherwise
+        :param width:
+        :param height:
+        :return: flat list of counts
+        """
+        counts = [0] * (width * height)
+        for i, mine in enumerate(mask):
+            if mine:
+                for col, row in self.neighbours(i % width, i // width, width, height):
+                    counts[row * width + col] += 1
+        return counts
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class RectangleTopology(Topology):
+    """
+    The classic board: 8 neighbours, the edges are not crossed.
+    """
+    name = "rectangle"
+    flag = 0
+
+    def compute_neighbours(self, x: int, y: int, width: int, height: int) -> Tuple[Coords, ...]:
+        return rectangle_neighbours(x, y, width, height)
+
+    def adjacent_mine_counts(self, mask: Sequence[int], width: int, height: int) -> List[int]:
+        # the box filter is much faster than walking the neighbourhoods
+        return adjacent_mine_counts(mask, width, height)
+
+
+class TorusTopology(Topology):
+    """
+    Wrap-around board: 8 neighbours, the left edge is adjacent to the right one and the top edge to the bottom one.
+    On boards narrower (or lower) than 3 cells some of the neighbours coincide; they are listed once.
+    """
+    name = "torus"
+    flag = 0x02
+
+    def compute_neighbours(self, x: int, y: int, width: int, height: int) -> Tuple[Coords, ...]:
+        coords = dict.fromkeys(((x + dx) % width, (y + dy) % height) for dy in (-1, 0, 1) for dx in (-1, 0, 1))
+        del coords[(x, y)]
+        return tuple(coords)
+
+
+class HexTopology(Topology):
+    """
+    Hexagonal board with 6 neighbours, stored in "odd rows shifted" layout: the cells of the odd rows are
+    shifted half a cell to the right, so their neighbours in the rows above and below are (x, y +- 1)
+    and (x + 1, y +- 1); for the even rows those are (x - 1, y +- 1) and (x, y +- 1).
+    The edges are not crossed.
+    """
+    name = "hex"
+    flag = 0x04
+
+    def compute_neighbours(self, x: int, y: int, width: int, height: int) -> Tuple[Coords, ...]:
+        shift = y & 1
+        candidates = ((x - 1, y), (x + 1, y),
+                      (x - 1 + shift, y - 1), (x + shift, y - 1),
+                      (x - 1 + shift, y + 1), (x + shift, y + 1))
+        return tuple((col, row) for col, row in candidates if 0 <= col < width and 0 <= row < height)
+
+
+RECTANGLE = RectangleTopology()
+TORUS = TorusTopology()
+HEX = HexTopology()
+
+# topologies by name
+TOPOLOGIES: Dict[str, Topology] = {t.name: t for t in (RECTANGLE, TORUS, HEX)}
+
+# mask of the topology bits in the binary board format flags
+TOPOLOGY_FLAGS_MASK = TORUS.flag | HEX.flag
+
+
+def get_topology(topology) -> Topology:
+    """
+    Get the topology given by its name (a Topology instance is returned as it is).
+
+    :param topology: name or a Topology instance
+    :return:
+    """
+    if isinstance(topology, Topology):
+        return topology
+    if topology not in TOPOLOGIES:
+        raise RuntimeError(f"Unknown topology ({topology}).")
+    return TOPOLOGIES[topology]
+
+
+def topology_from_flags(flags: int) -> Topology:
+    """
+    Get the topology encoded in the binary board format flags.
+
+    :param flags:
+    :return:
+    """
+    for topology in TOPOLOGIES.values():
+        if topology.flag == flags & TOPOLOGY_FLAGS_MASK:
+            return topology
+    raise RuntimeError(f"Unknown topology flags ({flags & TOPOLOGY_FLAGS_MASK:#x}).")
+
+
+class _TableCache:
+    """
+    Cache of the tables by topology and board shape, limited by the total number of cells of the tables
+    (the least recently used tables are dropped first).
+    """
+
+    def __init__(self, build: Callable[[Topology, int, int], tuple], max_cells: int):
+        self.build = build
+        self.max_cells = max_cells
+        self.__tables: 'OrderedDict[Tuple[Topology, int, int], tuple]' = OrderedDict()
+        self.__cells = 0
+
+    def __call__(self, topology: Topology, width: int, height: int) -> Optional[tuple]:
+        if width * height > MAX_TABLE_CELLS:
+            return None
+
+        key = (topology, width, height)
+        tables = self.__tables
+        table = tables.get(key)
+        if table is not None:
+            tables.move_to_end(key)
+            return table
+
+        table = tables[key] = self.build(topology, width, height)
+        self.__cells += width * height
+        while self.__cells > self.max_cells and len(tables) > 1:
+            (_, old_width, old_height), _ = tables.popitem(last=False)
+            self.__cells -= old_width * old_height
+        return table
+
+    @property
+    def cells(self) -> int:
+        return self.__cells
+
+
+def _rectangle_table(rows: Sequence[tuple], width: int) -> tuple:
+    """
+    Build the rectangle table from the rows of the cell identifiers (coordinates or flat indices):
+    every entry is made of slices of the row of the cell and the rows above and below it.
+
+    :param rows:
+    :param width:
+    :return:
+    """
+    table = []
+    for y, row in enumerate(rows):
+        above = rows[y - 1] if y > 0 else ()
+        below = rows[y + 1] if y < len(rows) - 1 else ()
+        for x in range(width):
+            from_x = x - 1 if x > 0 else x
+            table.append(above[from_x:x + 2] + row[from_x:x] + row[x + 1:x + 2] + below[from_x:x + 2])
+    return tuple(table)
+
+
+def _build_table(topology: Topology, width: int, height: int) -> NeighbourTable:
+    if type(topology) is RectangleTopology:
+        # the common case, built with slices of the rows
+        return _rectangle_table([tuple((x, y) for x in range(width)) for y in range(height)], width)
+
+    # share the coordinate tuples between the entries
+    coords = {(x, y): (x, y) for y in range(height) for x in range(width)}
+    return tuple(tuple(coords[c] for c in topology.compute_neighbours(x, y, width, height))
+                 for y in range(height) for x in range(width))
+
+
+def _build_index_table(topology: Topology, width: int, height: int) -> IndexTable:
+    if type(topology) is RectangleTopology:
+        return _rectangle_table([tuple(range(y * width, (y + 1) * width)) for y in range(height)], width)
+
+    # share the index objects between the entries
+    indices = list(range(width * height))
+    return tuple(tuple(indices[y * width + x] for x, y in entry) for entry in _table(topology, width, height))
+
+
+_table = _TableCache(_build_table, MAX_CACHED_CELLS)
+_index_table = _TableCache(_build_index_table, MAX_CACHED_CELLS)
+
+
+def neighbour_table(width: int, height: int) -> Optional[NeighbourTable]:
+    """
+    Get the neighbour table for the rectangular board shape (see `Topology.table`).
+
+    :param width:
+    :param height:
+    :return: the table, or None if the board is too big to have one
+    """
+    return _table(RECTANGLE, width, height)
@@ -0,0 +1,151 @@
+"""
+Openings of a board, found with a connected-component labelling pass.
+
+An opening is a connected region of cells with no adjacent mines (the "zero" cells). Uncovering any of its
+cells reveals the whole region and its border: the numbered cells adjacent to the region. A numbered cell
+may border several openings.
+
+The labelling works on the flat (row after row) mine mask and adjacency counts. Every region is labelled
+with a breadth-first walk over the neighbour index table (see `Topology.index_table`) started from its
+first unlabelled zero cell; every cell is visited a bounded number of times, so the pass is linear in the
+size of the board.
+
+The labelling also gives the 3BV of the board ("Bechtel's Board Benchmark Value"): the minimum number of
+clicks needed to clear it. That is a click per opening and a click per numbered cell not on any opening
+border.
+"""
+from typing import List, NamedTuple, Sequence, Tuple
+
+from model.neighbours import Topology, RECTANGLE
+from model.packed import MINE_BIT, COUNT_SHIFT
+
+
+class Opening(NamedTuple):
+    """
+    A single opening: flat indices of its cells.
+    """
+    # the zero cells of the region, in the order of the walk (the first one has the lowest index)
+    zeros: List[int]
+    # the numbered cells adjacent to the region
+    border: List[int]
+
+    def __len__(self) -> int:
+        # number of cells revealed by uncovering any cell of the opening
+        return len(self.zeros) + len(self.border)
+
+
+class Openings(NamedTuple):
+    """
+    Result of the labelling of a board.
+    """
+    # label of every cell (flat index): index of the opening for the zero cells, -1 for the other cells
+    labels: List[int]
+    # the openings, by label
+    openings: List[Opening]
+    # the minimum number of clicks needed to clear the board
+    three_bv: int
+
+    @property
+    def largest(self) -> int:
+        """
+        Number of cells revealed by the biggest opening (1 if there are no openings, but the board can be played).
+
+        :return:
+        """
+        if self.openings:
+            return max(len(opening) for opening in self.openings)
+        return 1 if self.three_bv else 0
+
+
+def board_layout(board) -> Tuple[List[int], List[int]]:
+    """
+    Get the flat mine mask and adjacency counts of a board (both the object and the packed storage).
+
+    :param board: MineBoard
+    :return: mine mask (1 for a mine, 0 otherwise), numbers of adjacent mines
+    """
+    if board.packed:
+        data = board.cells.data
+        return [b & MINE_BIT for b in data], [b >> COUNT_SHIFT for b in data]
+    cells = [c for row in board.read_rows() for c in row]
+    return [1 if c.has_mine else 0 for c in cells], [c.no_adjacent_mines for c in cells]
+
+
+class _ComputedNeighbours:
+    """
+    Stand-in for the neighbour index table of the boards too big to have one (the neighbourhoods are computed).
+    """
+
+    def __init__(self, topology: Topology, width: int, height: int):
+        self.topology = topology
+        self.width = width
+        self.height = height
+
+    def __getitem__(self, i: int) -> List[int]:
+        width = self.width
+        return [y * width + x for x, y in self.topology.compute_neighbours(i % width, i // width, width, self.height)]
+
+
+def label_openings(mines: Sequence[int], counts: Sequence[int], width: int, height: int,
+                   topology: Topology = RECTANGLE) -> Openings:
+    """
+    Label the openings of the board (see the module description).
+
+    :param mines: flat mine mask, 1 (or True) for a mine
+    :param counts: flat numbers of adjacent mines (the counts of the mines are not used)
+    :param width:
+    :param height:
+    :param topology:
+    :return:
+    """
+    size = width * height
+    table = topology.index_table(width, height)
+    if table is None:
+        table = _ComputedNeighbours(topology, width, height)
+
+    # -2 marks the zero cells not labelled yet, -1 the other cells (it stays so)
+    labels = [-1 if m or c else -2 for m, c in zip(mines, counts)]
+    # label of the (last) opening bordered by the cell, -1 for the cells not on any border (yet)
+    bordered = [-1] * size
+    openings: List[Opening] = []
+    number_of_zeros = number_of_bordered = 0
+    start = 0
+    while True:
+        try:
+            start = labels.index(-2, start)
+        except ValueError:
+            break
+
+        label = len(openings)
+        labels[start] = label
+        zeros = [start]
+        border = []
+        # the list grows while it is walked (breadth-first)
+        for i in zeros:
+            for j in table[i]:
+                value = labels[j]
+                if value == -2:
+                    labels[j] = label
+                    zeros.append(j)
+                elif value == -1 and bordered[j] != label:
+                    if bordered[j] < 0:
+                        number_of_bordered += 1
+                    bordered[j] = label
+                    border.append(j)
+        openings.append(Opening(zeros, border))
+        number_of_zeros += len(zeros)
+
+    # a click for every opening, and for every numbered cell not revealed by any of them
+    isolated = size - sum(map(bool, mines)) - number_of_zeros - number_of_bordered
+    return Openings(labels, openings, len(openings) + isolated)
+
+
+def board_openings(board) -> Openings:
+    """
+    Label the openings of a board with the mines placed.
+
+    :param board: MineBoard
+    :return:
+    """
+    mines, counts = board_layout(board)
+    return label_openings(mines, counts, board.width, board.height, board.topology)
@@ -0,0 +1,149 @@
+from typing import Iterator
+
+from model.cell import Cell
+
+# Packed cell layout (one byte per cell):
+#   bit 0     - the cell holds a mine
+#   bit 1     - the cell is flagged
+#   bit 2     - the cell is uncovered
+#   bits 4..7 - number of adjacent mines (0..8)
+MINE_BIT = 0x01
+FLAG_BIT = 0x02
+UNCOVERED_BIT = 0x04
+COUNT_SHIFT = 4
+COUNT_MASK = 0xF0
+
+
+def pack_cell(cell: Cell) -> int:
+    """
+    Encode the state of a cell as a single byte.
+    :param cell:
+    :return:
+    """
+    return ((MINE_BIT if cell.has_mine else 0)
+            | (FLAG_BIT if cell.flagged else 0)
+            | (UNCOVERED_BIT if cell.uncovered else 0)
+            | (cell.no_adjacent_mines << COUNT_SHIFT))
+
+
+def unpack_cell(value: int) -> Cell:
+    """
+    Create a cell from its single byte encoding.
+    :param value:
+    :return:
+    """
+    cell = Cell(has_mine=bool(value & MINE_BIT))
+    cell.flagged = bool(value & FLAG_BIT)
+    cell.uncovered = bool(value & UNCOVERED_BIT)
+    cell.no_adjacent_mines = value >> COUNT_SHIFT
+    return cell
+
+
+class PackedCell(Cell):
+    """
+    Lightweight view of a single cell stored in a packed buffer.
+    It behaves like a regular Cell, but all the reads and writes go to the underlying buffer.
+    """
+    __slots__ = ('_data', '_index')
+
+    # noinspection PyMissingConstructor
+    def __init__(self, data, index: int):
+        self._data = data
+        self._index = index
+
+    def __get_bit(self, bit: int) -> bool:
+        return bool(self._data[self._index] & bit)
+
+    def __set_bit(self, bit: int, on_off: bool) -> None:
+        if on_off:
+            self._data[self._index] |= bit
+        else:
+            self._data[self._index] &= ~bit & 0xFF
+
+    @property
+    def has_mine(self) -> bool:
+        return self.__get_bit(MINE_BIT)
+
+    @has_mine.setter
+    def has_mine(self, on_off: bool) -> None:
+        self.__set_bit(MINE_BIT, on_off)
+
+    @property
+    def flagged(self) -> bool:
+        return self.__get_bit(FLAG_BIT)
+
+    @flagged.setter
+    def flagged(self, on_off: bool) -> None:
+        self.__set_bit(FLAG_BIT, on_off)
+
+    @property
+    def uncovered(self) -> bool:
+        return self.__get_bit(UNCOVERED_BIT)
+
+    @uncovered.setter
+    def uncovered(self, on_off: bool) -> None:
+        self.__set_bit(UNCOVERED_BIT, on_off)
+
+    @property
+    def no_adjacent_mines(self) -> int:
+        return self._data[self._index] >> COUNT_SHIFT
+
+    @no_adjacent_mines.setter
+    def no_adjacent_mines(self, value: int) -> None:
+        self._data[self._index] = (self._data[self._index] & ~COUNT_MASK & 0xFF) | (value << COUNT_SHIFT)
+
+
+class PackedRow:
+    """
+    A row of a packed board. Supports `row[x]` reads (returning a PackedCell view) and `row[x] = cell` writes
+    (copying the state of the given cell into the buffer).
+    """
+    __slots__ = ('_data', '_offset', '_width')
+
+    def __init__(self, data, offset: int, width: int):
+        self._data = data
+        self._offset = offset
+        self._width = width
+
+    def __index(self, x: int) -> int:
+        if not 0 <= x < self._width:
+            raise IndexError(f"Column index out of range ({x}).")
+        return self._offset + x
+
+    def __getitem__(self, x: int) -> PackedCell:
+        return PackedCell(self._data, self.__index(x))
+
+    def __setitem__(self, x: int, cell: Cell) -> None:
+        self._data[self.__index(x)] = pack_cell(cell)
+
+    def __len__(self) -> int:
+        return self._width
+
+    def __iter__(self) -> Iterator[PackedCell]:
+        data = self._data
+        return (PackedCell(data, i) for i in range(self._offset, self._offset + self._width))
+
+
+class PackedCells:
+    """
+    Packed board storage: `width * height` bytes, one per cell (see the layout above).
+    Mimics the `List[List[Cell]]` access pattern, so `cells[y][x]` works as for the object model.
+    """
+    __slots__ = ('data', 'width', 'height')
+
+    def __init__(self, width: int, height: int, data=None):
+        self.width = width
+        self.height = height
+        # any mutable buffer of bytes will do (bytearray, mmap, ...)
+        self.data = bytearray(width * height) if data is None else data
+
+    def __getitem__(self, y: int) -> PackedRow:
+        if not 0 <= y < self.height:
+            raise IndexError(f"Row index out of range ({y}).")
+        return PackedRow(self.data, y * self.width, self.width)
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __iter__(self) -> Iterator[PackedRow]:
+        return (PackedRow(self.data, y * self.width, self.width) for y in range(self.height))
@@ -0,0 +1,316 @@
+import random
+import time
+from math import comb
+from operator import add
+from typing import Dict, Generator, List, Optional, Set, Tuple
+
+from model.board import MineBoard
+from model.solver import Constraint, Coords, split_components
+
+# number of solutions of a group of constraints, for every number of mines:
+#   mines -> (number of solutions, number of solutions with a mine in the cell, for every cell)
+SolutionTable = Dict[int, Tuple[int, List[int]]]
+
+
+def board_constraints(board: MineBoard) -> Tuple[List[Constraint], Set[Coords], int]:
+    """
+    Collect what the player knows about the board: constraints given by the uncovered cells on their hidden
+    neighbours. Flags are ignored (they may be wrong).
+
+    :param board:
+    :return: constraints, all the hidden cells, number of uncovered mines
+    """
+    # the cells are only read, as they are stored (see `MineBoard.read_rows`)
+    cell_at = board.cell_at
+    constraints: List[Constraint] = []
+    hidden: Set[Coords] = set()
+    uncovered_mines = 0
+    for y, row in enumerate(board.read_rows()):
+        for x, c in enumerate(row):
+            if not c.uncovered:
+                hidden.add((x, y))
+                continue
+            if c.has_mine:
+                uncovered_mines += 1
+                continue
+
+            need = c.no_adjacent_mines
+            neighbours = []
+            for nx, ny in board.neighbours(x, y):
+                n = cell_at(nx, ny)
+                if not n.uncovered:
+                    neighbours.append((nx, ny))
+                elif n.has_mine:
+                    need -= 1
+            if neighbours:
+                constraints.append((frozenset(neighbours), need))
+    return constraints, hidden, uncovered_mines
+
+
+def ordered_cells(constraints: List[Constraint]) -> List[Coords]:
+    """
+    Order the cells of a group of constraints, so that the cells sharing constraints are close to each other
+    (breadth-first walk over the constraints). It keeps the number of "open" constraints low while enumerating.
+
+    :param constraints:
+    :return:
+    """
+    by_cell: Dict[Coords, List[Constraint]] = {}
+    for constraint in constraints:
+        for c in constraint[0]:
+            by_cell.setdefault(c, []).append(constraint)
+
+    order: List[Coords] = []
+    seen: Set[Coords] = set()
+    for start in sorted(by_cell):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        while queue:
+            c = queue.pop(0)
+            order.append(c)
+            for cs, _ in by_cell[c]:
+                for n in sorted(cs - seen):
+                    seen.add(n)
+                    queue.append(n)
+    return order
+
+
+class _Enumeration:
+    """
+    Helper holding the bookkeeping of a group of constraints for the exact and the randomized enumeration.
+    """
+
+    def __init__(self, constraints: List[Constraint]):
+        self.order = ordered_cells(constraints)
+        index = {c: i for i, c in enumerate(self.order)}
+        self.cell_constraints: List[List[int]] = [[] for _ in self.order]
+        self.last: List[int] = []
+        for ci, (cs, _) in enumerate(constraints):
+            indices = [index[c] for c in cs]
+            for i in indices:
+                self.cell_constraints[i].append(ci)
+            self.last.append(max(indices))
+        self.need = [n for _, n in constraints]
+        self.undecided = [len(cs) for cs, _ in constraints]
+
+        # constraints with cells on both sides of the position (before and at/after it)
+        first = [min(index[c] for c in cs) for cs, _ in constraints]
+        self.open: List[List[int]] = [[ci for ci in range(len(constraints)) if first[ci] < i <= self.last[ci]]
+                                      for i in range(len(self.order) + 1)]
+
+    def apply(self, i: int, value: int) -> bool:
+        """
+        Assign the value to the i-th cell; the assignment is applied even if it breaks a constraint.
+        :return: are the constraints still satisfiable
+        """
+        ok = True
+        for ci in self.cell_constraints[i]:
+            self.need[ci] -= value
+            self.undecided[ci] -= 1
+            if self.need[ci] < 0 or self.need[ci] > self.undecided[ci]:
+                ok = False
+        return ok
+
+    def revert(self, i: int, value: int) -> None:
+        for ci in self.cell_constraints[i]:
+            self.need[ci] += value
+            self.undecided[ci] += 1
+
+    @property
+    def width(self) -> int:
+        """
+        Maximum number of open constraints over the positions: the memo of `count` has a state for every
+        combination of their needs, so the exact count is only affordable for narrow groups (whatever their size).
+        """
+        return max(map(len, self.open))
+
+    def count(self) -> SolutionTable:
+        """
+        Count the solutions (exactly). The partial results are memoized on the position and the needs of
+        the open constraints (the rest of the enumeration depends on nothing else).
+        The enumeration is depth-first, with an explicit stack (of generators), so it is not limited by the
+        interpreter recursion depth.
+        """
+        memo: Dict[Tuple[int, Tuple[int, ...]], SolutionTable] = {}
+        size = len(self.order)
+        need, open_constraints = self.need, self.open
+
+        def key(i: int) -> Tuple[int, Tuple[int, ...]]:
+            return i, tuple(need[ci] for ci in open_constraints[i])
+
+        def solve(i: int) -> Generator[int, SolutionTable, SolutionTable]:
+            # yields the next position to get its solution table sent back
+            result = {}
+            if i == size:
+                result[0] = (1, [])
+                return result
+            for value in (0, 1):
+                if self.apply(i, value):
+                    rest = yield i + 1
+                    for mines, (cnt, marginals) in rest.items():
+                        entry = result.get(mines + value)
+                        head = cnt if value else 0
+                        if entry is None:
+                            result[mines + value] = (cnt, [head] + marginals)
+                        else:
+                            result[mines + value] = (entry[0] + cnt,
+                                                     [entry[1][0] + head] + list(map(add, entry[1][1:], marginals)))
+                self.revert(i, value)
+            return result
+
+        root = key(0)
+        stack = [(root, solve(0))]
+        sent = None
+        while stack:
+            current, solving = stack[-1]
+            try:
+                i = solving.send(sent)
+            except StopIteration as done:
+                memo[current] = sent = done.value
+                stack.pop()
+                continue
+            child = key(i)
+            sent = memo.get(child)
+            if sent is None:
+                stack.append((child, solve(i)))
+        return memo[root]
+
+    def sample(self, rng: random.Random) -> Optional[Tuple[List[int], int]]:
+        """
+        Draw a random solution: cell by cell, one of the values keeping the constraints satisfiable is chosen
+        with equal chances (no backtracking). The solutions are not drawn uniformly, so every one comes with
+        its weight - the inverse of the probability of drawing it (2 to the number of real choices).
+        Weighted this way, the counts of the samples are unbiased estimates of the solution counts.
+        :return: values of the cells and the weight, or None if the draw ran into a dead end
+        """
+        values: List[int] = []
+        weight = 1
+        try:
+            for i in range(len(self.order)):
+                feasible = []
+                for value in (0, 1):
+                    if self.apply(i, value):
+                        feasible.append(value)
+                    self.revert(i, value)
+                if not feasible:
+                    return None
+                if len(feasible) == 2:
+                    weight *= 2
+                value = feasible[0] if len(feasible) == 1 else feasible[rng.random() < 0.5]
+                self.apply(i, value)
+                values.append(value)
+            return values, weight
+        finally:
+            for j, value in enumerate(values):
+                self.revert(j, value)
+
+
+def _sampled_table(enumeration: _Enumeration, rng: random.Random, deadline: float,
+                   max_samples: int) -> SolutionTable:
+    """
+    Approximate the solution table of a group of constraints with random solutions, each counted with its
+    weight (see `_Enumeration.sample`). The counts are relative (only their ratios matter when the groups
+    get combined).
+    """
+    table: SolutionTable = {}
+    size = len(enumeration.order)
+    for _ in range(max_samples):
+        sample = enumeration.sample(rng)
+        if sample is not None:
+            values, weight = sample
+            mines = sum(values)
+            cnt, marginals = table.get(mines, (0, [0] * size))
+            table[mines] = (cnt + weight, [m + weight * v for m, v in zip(marginals, values)])
+        if time.perf_counter() > deadline:
+            break
+    return table
+
+
+def _convolve(a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    result: Dict[int, int] = {}
+    for i, x in a.items():
+        for j, y in b.items():
+            result[i + j] = result.get(i + j, 0) + x * y
+    return result
+
+
+def mine_probabilities(board: MineBoard, max_open_constraints: int = 24, time_budget: Optional[float] = None,
+                       max_samples: int = 10000, rng: random.Random = None) -> Dict[Coords, float]:
+    """
+    Compute the probability of holding a mine for every hidden cell, given the uncovered cells
+    and the number of mines on the board.
+
+    The constraints (given by the uncovered cells) are split into independent groups; the solutions of every group
+    are counted for every number of mines (exactly, with memoization). The groups are then combined, weighting
+    every combination with the number of ways to place the rest of the mines in the unconstrained cells.
+
+    The cost of the exact count depends on the number of constraints open at once while enumerating the cells
+    (see `_Enumeration.width`), not on the number of cells: the groups with more than `max_open_constraints` of them
+    are approximated with weighted random solutions (Monte Carlo), sampled until `time_budget` seconds (if given)
+    or `max_samples` samples are used up.
+
+    :param board:
+    :param max_open_constraints:
+    :param time_budget: time limit for the Monte Carlo part, in seconds
+    :param max_samples: number of samples for every group approximated with Monte Carlo
+    :param rng:
+    :return: mapping of (x, y) coordinates of hidden cells to the probability
+    """
+    rng = rng if rng is not None else random.Random()
+    deadline = time.perf_counter() + time_budget if time_budget is not None else float("inf")
+
+    constraints, hidden, uncovered_mines = board_constraints(board)
+    mines_left = board.number_of_mines + board.pending_mines - uncovered_mines
+
+    groups: List[Tuple[List[Coords], SolutionTable]] = []
+    unconstrained: Set[Coords] = set(hidden)
+    for component in split_components(constraints):
+        enumeration = _Enumeration(component)
+        if enumeration.width <= max_open_constraints:
+            table = enumeration.count()
+        else:
+            table = _sampled_table(enumeration, rng, deadline, max_samples)
+            if not table:
+                # nothing found in time, treat the cells as unconstrained
+                continue
+        groups.append((enumeration.order, table))
+        unconstrained.difference_update(enumeration.order)
+
+    free = len(unconstrained)
+
+    def weight(mines: int) -> int:
+        # ways of placing the remaining mines in the unconstrained cells
+        rest = mines_left - mines
+        return comb(free, rest) if 0 <= rest <= free else 0
+
+    distributions = [{mines: cnt for mines, (cnt, _) in table.items()} for _, table in groups]
+    total_distribution: Dict[int, int] = {0: 1}
+    for distribution in distributions:
+        total_distribution = _convolve(total_distribution, distribution)
+    total = sum(cnt * weight(mines) for mines, cnt in total_distribution.items())
+    if total == 0:
+        raise RuntimeError("The board state is inconsistent with the number of mines.")
+
+    result: Dict[Coords, float] = {}
+    for g, (order, table) in enumerate(groups):
+        others: Dict[int, int] = {0: 1}
+        for h, distribution in enumerate(distributions):
+            if h != g:
+                others = _convolve(others, distribution)
+
+        numerators = [0] * len(order)
+        for mines, (_, marginals) in table.items():
+            factor = sum(cnt * weight(mines + other) for other, cnt in others.items())
+            if factor:
+                numerators = [n + m * factor for n, m in zip(numerators, marginals)]
+        for c, n in zip(order, numerators):
+            result[c] = n / total
+
+    if free:
+        numerator = sum(cnt * weight(mines) * (mines_left - mines) for mines, cnt in total_distribution.items())
+        probability = numerator / (total * free)
+        for c in unconstrained:
+            result[c] = probability
+    return result
@@ -0,0 +1,260 @@
+from typing import Dict, FrozenSet, Iterator, List, Set, Tuple
+
+from model.board import MineBoard
+
+Coords = Tuple[int, int]
+
+# a constraint: the given (hidden, undecided) cells hold exactly the given number of mines
+Constraint = Tuple[FrozenSet[Coords], int]
+
+
+def split_components(constraints: List[Constraint]) -> List[List[Constraint]]:
+    """
+    Split the constraints into independent groups (constraints of different groups share no cells).
+
+    :param constraints:
+    :return:
+    """
+    # union-find over the cells
+    parent: Dict[Coords, Coords] = {}
+
+    def find(c: Coords) -> Coords:
+        root = c
+        while parent[root] != root:
+            root = parent[root]
+        while parent[c] != root:
+            parent[c], c = root, parent[c]
+        return root
+
+    for cells, _ in constraints:
+        first = None
+        for c in cells:
+            parent.setdefault(c, c)
+            if first is None:
+                first = find(c)
+            else:
+                parent[find(c)] = first
+
+    components: Dict[Coords, List[Constraint]] = {}
+    for constraint in constraints:
+        components.setdefault(find(next(iter(constraint[0]))), []).append(constraint)
+    return list(components.values())
+
+
+def component_solutions(constraints: List[Constraint]) -> Iterator[Tuple[List[Coords], List[int]]]:
+    """
+    Enumerate all the mine placements satisfying a group of constraints (backtracking).
+
+    :param constraints:
+    :return: generator of (cells, values) pairs, values are 1 for a mine, 0 for a safe cell
+             (the list of cells is the same object for all the solutions)
+    """
+    cells: List[Coords] = sorted({c for cs, _ in constraints for c in cs})
+    index = {c: i for i, c in enumerate(cells)}
+
+    # for every cell: the constraints it takes part in
+    cell_constraints: List[List[int]] = [[] for _ in cells]
+    for ci, (cs, _) in enumerate(constraints):
+        for c in cs:
+            cell_constraints[index[c]].append(ci)
+
+    # mines still needed and cells still undecided, for every constraint
+    need = [n for _, n in constraints]
+    undecided = [len(cs) for cs, _ in constraints]
+    values = [0] * len(cells)
+
+    def assign(i: int) -> Iterator[Tuple[List[Coords], List[int]]]:
+        if i == len(cells):
+            yield cells, values
+            return
+        for value in (0, 1):
+            ok = True
+            for ci in cell_constraints[i]:
+                need[ci] -= value
+                undecided[ci] -= 1
+                if need[ci] < 0 or need[ci] > undecided[ci]:
+                    ok = False
+            if ok:
+                values[i] = value
+                yield from assign(i + 1)
+            for ci in cell_constraints[i]:
+                need[ci] += value
+                undecided[ci] += 1
+
+    return assign(0)
+
+
+class Solver:
+    """
+    Logical solver (hint engine) working on top of a MineBoard.
+
+    It keeps the frontier (uncovered number cells that still have undecided hidden neighbours) up to date
+    as the board reveals cells (see `MineBoard.subscribe`), so it never has to rescan the whole board.
+    The deductions use the single-cell rule and the subset rule first, and fall back to enumerating the
+    placements of mines in the connected groups of the frontier (up to `max_component_size` cells).
+
+    The solver only uses the information visible to the player (the uncovered cells). Flags are ignored.
+    """
+
+    def __init__(self, board: MineBoard, max_component_size: int = 20):
+        self.board = board
+        self.max_component_size = max_component_size
+
+        # uncovered number cells with undecided hidden neighbours
+        self.frontier: Set[Coords] = set()
+        # hidden cells known to hold a mine / known to be safe
+        self.mines: Set[Coords] = set()
+        self.safe: Set[Coords] = set()
+
+        # do the deductions have to be run again
+        self.__outdated: bool = True
+
+        for y, row in enumerate(board.read_rows()):
+            for x, c in enumerate(row):
+                if c.uncovered:
+                    self.__add(x, y)
+        board.subscribe(self.on_reveal)
+
+    def close(self) -> None:
+        """
+        Stop following the board.
+
+        :return:
+        """
+        self.board.unsubscribe(self.on_reveal)
+
+    def __add(self, x: int, y: int) -> None:
+        cell = self.board.cell_at(x, y)
+        self.safe.discard((x, y))
+        if cell.has_mine:
+            self.mines.add((x, y))
+        elif cell.no_adjacent_mines > 0:
+            self.frontier.add((x, y))
+
+    def on_reveal(self, coords: List[Coords]) -> None:
+        """
+        Board callback: update the frontier with the revealed cells.
+
+        :param coords:
+        :return:
+        """
+        for x, y in coords:
+            self.__add(x, y)
+        self.__outdated = True
+
+    def constraints(self) -> List[Constraint]:
+        """
+        Get the constraints given by the frontier cells (on their undecided hidden neighbours).
+        Frontier cells without undecided neighbours are dropped from the frontier on the way.
+
+        :return:
+        """
+        cell_at = self.board.cell_at
+        mines, safe = self.mines, self.safe
+        result: List[Constraint] = []
+        for x, y in list(self.frontier):
+            need = cell_at(x, y).no_adjacent_mines
+            undecided = []
+            for col, row in self.board.neighbours(x, y):
+                if (col, row) in mines:
+                    need -= 1
+                elif (col, row) not in safe and not cell_at(col, row).uncovered:
+                    undecided.append((col, row))
+            if undecided:
+                result.append((frozenset(undecided), need))
+            else:
+                self.frontier.discard((x, y))
+        return result
+
+    def __simple_rules(self, constraints: List[Constraint], safe: Set[Coords], mines: Set[Coords]) -> None:
+        """
+        Single-cell rule (all or none of the cells are mines) and subset rule (if the cells of one constraint
+        are a subset of another's, the difference holds the difference of the mines).
+        """
+        by_cell: Dict[Coords, List[Constraint]] = {}
+        for constraint in constraints:
+            cs, need = constraint
+            if need == 0:
+                safe.update(cs)
+            elif need == len(cs):
+                mines.update(cs)
+            for c in cs:
+                by_cell.setdefault(c, []).append(constraint)
+        if safe or mines:
+            return
+
+        for a_cells, a_need in constraints:
+            for other in by_cell[next(iter(a_cells))]:
+                b_cells, b_need = other
+                if len(b_cells) > len(a_cells) and a_cells < b_cells:
+                    rest = b_cells - a_cells
+                    if b_need == a_need:
+                        safe.update(rest)
+                    elif b_need - a_need == len(rest):
+                        mines.update(rest)
+
+    def __enumerate(self, constraints: List[Constraint], safe: Set[Coords], mines: Set[Coords]) -> None:
+        """
+        Find the cells that are safe (or mines) in every placement of mines satisfying the constraints.
+        """
+        for component in split_components(constraints):
+            cells = {c for cs, _ in component for c in cs}
+            if len(cells) > self.max_component_size:
+                continue
+
+            solutions = 0
+            mine_counts: List[int] = []
+            order: List[Coords] = []
+            for order, values in component_solutions(component):
+                if not mine_counts:
+                    mine_counts = [0] * len(values)
+                mine_counts = [a + b for a, b in zip(mine_counts, values)]
+                solutions += 1
+            if not solutions:
+                continue
+
+            for c, count in zip(order, mine_counts):
+                if count == 0:
+                    safe.add(c)
+                elif count == solutions:
+                    mines.add(c)
+
+    def solve(self) -> None:
+        """
+        Run the deductions until nothing new can be found.
+
+        :return:
+        """
+        if not self.__outdated:
+            return
+        while True:
+            constraints = self.constraints()
+            safe: Set[Coords] = set()
+            mines: Set[Coords] = set()
+            self.__simple_rules(constraints, safe, mines)
+            if not (safe or mines):
+                self.__enumerate(constraints, safe, mines)
+            if not (safe or mines):
+                break
+            self.safe.update(safe)
+            self.mines.update(mines)
+        self.__outdated = False
+
+    def next_safe_moves(self) -> List[Coords]:
+        """
+        Get the hidden cells that are certainly safe.
+
+        :return:
+        """
+        self.solve()
+        return sorted(self.safe)
+
+    def next_certain_mines(self) -> List[Coords]:
+        """
+        Get the hidden cells that certainly hold mines.
+
+        :return:
+        """
+        self.solve()
+        cell_at = self.board.cell_at
+        return sorted((x, y) for x, y in self.mines if not cell_at(x, y).uncovered)
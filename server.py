@@ -0,0 +1,220 @@
+"""
+Game session server: hosts many concurrent boards in one process.
+
+The protocol is JSON lines: every request is a JSON object in a single line, every response as well.
+Requests:
+    {"id": 1, "cmd": "new", "width": 9, "height": 9, "mines": 10, "seed": 5, "topology": "torus"}
+    {"id": 2, "cmd": "uncover", "game": "g1", "x": 0, "y": 0}
+    {"id": 3, "cmd": "flag", "game": "g1", "x": 1, "y": 0, "on": true}
+    {"id": 4, "cmd": "chord", "game": "g1", "x": 0, "y": 0}
+    {"id": 5, "cmd": "close", "game": "g1"}
+Responses carry the request id, the game id, the cells changed by the move (`diff`, as [x, y, representation]
+triples; a new game has all the cells covered, so its diff is empty; the covered mines show up only once
+the game is lost) and the game status:
+    {"id": 2, "ok": true, "game": "g1", "diff": [[0, 0, "1"]], "status": {...}}
+Errors are reported with `"ok": false` and an `error` message.
+The boards are at most MAX_BOARD_SIZE cells wide and high.
+
+Usage:
+    python server.py [--host HOST] [--port PORT]
+    python server.py --stdio
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+from typing import Dict, List, Set, Tuple
+
+from model.board import MineBoard
+
+# maximum width and height of the hosted boards
+MAX_BOARD_SIZE = 256
+
+
+class Game:
+    """
+    A board hosted by the server, with the cells revealed since the last response (the diff sent to the client).
+    """
+
+    def __init__(self, board: MineBoard):
+        self.board = board
+        self.revealed: Set[Tuple[int, int]] = set()
+        # the mines are shown (once) when the game is lost
+        self.mines_shown: bool = False
+        board.subscribe(self.revealed.update)
+
+    def diff(self) -> List[list]:
+        """
+        Get the cells the client sees changed since the last call, as [x, y, representation] triples
+        (in the row order). Only the revealed cells change what the client sees (the flags are not shown),
+        the covered mines are shown only when the game is lost.
+
+        :return:
+        """
+        board = self.board
+        lost = board.status.lost
+        cells = self.revealed
+        if lost and not self.mines_shown:
+            self.mines_shown = True
+            cells.update((x, y) for y in range(board.height) for x in range(board.width) if board.is_mine_at(x, y))
+        diff = [[x, y, board.cell_at(x, y).get_representation(reveal_hidden_mine=lost)]
+                for x, y in sorted(cells, key=lambda c: c[::-1])]
+        cells.clear()
+        return diff
+
+
+class GameServer:
+    """
+    Keeps the games and executes the commands on them.
+    """
+
+    def __init__(self):
+        self.games: Dict[str, Game] = {}
+        self.__ids = itertools.count(1)
+
+    async def handle(self, request: dict) -> dict:
+        """
+        Execute a single command.
+
+        :param request:
+        :return: response
+        """
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": f"Invalid request (not an object: {request!r})."}
+        response = {"id": request.get("id")}
+        try:
+            response.update(await self.__execute(request))
+            response["ok"] = True
+        except (RuntimeError, KeyError, TypeError, ValueError, OverflowError) as e:
+            response["ok"] = False
+            response["error"] = str(e)
+        return response
+
+    async def __execute(self, request: dict) -> dict:
+        cmd = request.get("cmd")
+        if cmd == "new":
+            return self.__new_game(request)
+        if cmd not in ("uncover", "flag", "chord", "close"):
+            raise RuntimeError(f"Unknown command ({cmd}).")
+
+        game_id = request.get("game")
+        game = self.games.get(game_id)
+        if game is None:
+            raise RuntimeError(f"Unknown game ({game_id}).")
+
+        if cmd == "close":
+            del self.games[game_id]
+            return {"game": game_id}
+
+        # the moves run without awaiting, so the moves on a game never interleave
+        board = game.board
+        x, y = self.__int(request, "x"), self.__int(request, "y")
+        if cmd == "uncover":
+            board.uncover(x, y)
+        elif cmd == "flag":
+            board.flag(x, y, bool(request.get("on", True)))
+        else:
+            board.chord(x, y)
+        return self.__state(game_id, game)
+
+    def __new_game(self, request: dict) -> dict:
+        width, height = self.__int(request, "width", 9), self.__int(request, "height", 9)
+        if not (0 < width <= MAX_BOARD_SIZE and 0 < height <= MAX_BOARD_SIZE):
+            raise RuntimeError(f"Invalid board size ({width}x{height}), at most {MAX_BOARD_SIZE}x{MAX_BOARD_SIZE}.")
+        seed = request.get("seed")
+        board = MineBoard(width, height, self.__int(request, "mines", 10),
+                          rng=random.Random(seed) if seed is not None else None,
+                          lazy=True, safe_neighbourhood=True, topology=request.get("topology", "rectangle"))
+        game_id = f"g{next(self.__ids)}"
+        game = self.games[game_id] = Game(board)
+        return self.__state(game_id, game)
+
+    @staticmethod
+    def __int(request: dict, key: str, default: int = None) -> int:
+        """
+        Get an integer parameter of the request.
+
+        :param request:
+        :param key:
+        :param default: value of the missing parameter (it is required if there is none)
+        :return:
+        """
+        value = request.get(key, default)
+        if value is None:
+            raise RuntimeError(f"Missing parameter ({key}).")
+        try:
+            return int(value)
+        except (TypeError, ValueError, OverflowError):
+            raise RuntimeError(f"Invalid parameter ({key}: {value!r}).")
+
+    @staticmethod
+    def __state(game_id: str, game: Game) -> dict:
+        return {
+            "game": game_id,
+            "diff": game.diff(),
+            "status": game.board.status._asdict(),
+        }
+
+    async def serve_stream(self, reader: asyncio.StreamReader, writer) -> None:
+        """
+        Serve JSON-lines requests coming from the reader, writing the responses to the writer.
+
+        :param reader:
+        :param writer: anything with `write` (and optionally `drain`)
+        :return:
+        """
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "ok": False, "error": f"Invalid request ({e})."}
+            else:
+                response = await self.handle(request)
+            writer.write((json.dumps(response) + "\n").encode())
+            if hasattr(writer, "drain"):
+                await writer.drain()
+
+    async def serve_tcp(self, host: str, port: int) -> None:
+        async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                await self.serve_stream(reader, writer)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(client, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        class StdoutWriter:
+            @staticmethod
+            def write(data: bytes) -> None:
+                sys.stdout.buffer.write(data)
+                sys.stdout.flush()
+
+        await self.serve_stream(reader, StdoutWriter())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Minesweeper game session server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stdio", action="store_true", help="serve stdin/stdout instead of a socket")
+    args = parser.parse_args()
+
+    game_server = GameServer()
+    try:
+        asyncio.run(game_server.serve_stdio() if args.stdio else game_server.serve_tcp(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
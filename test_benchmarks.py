@@ -0,0 +1,24 @@
+import unittest
+from unittest import TestCase
+
+from benchmarks.suite import compare, measure
+
+
+class TestBenchmarkSuite(TestCase):
+
+    def test_compare(self):
+        baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+        results = {"a": 1.2, "b": 1.3, "d": 5.0}
+        regressions = compare(results, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b:"))
+
+    def test_measure(self):
+        calls = []
+        seconds = measure(lambda: len(calls), calls.append, repeat=3)
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertGreaterEqual(seconds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
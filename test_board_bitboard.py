@@ -0,0 +1,122 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.bitboard import BitBoard, MAX_SIZE, full_adder, spread
+from model.board import MineBoard
+
+
+class TestBitBoard(TestCase):
+
+    def test_same_as_mine_board(self):
+        for seed in range(40):
+            width, height, mines = random.Random(seed).choice([(9, 9, 10), (16, 16, 40), (30, 16, 99), (1, 5, 1)])
+            lazy, safe = seed % 2 == 0, seed % 3 == 0
+            mb = MineBoard(width, height, mines, rng=random.Random(seed), lazy=lazy, safe_neighbourhood=safe)
+            bb = BitBoard(width, height, mines, rng=random.Random(seed), lazy=lazy, safe_neighbourhood=safe)
+            rnd = random.Random(seed)
+            for _ in range(40):
+                x, y = rnd.randrange(width), rnd.randrange(height)
+                move = rnd.random()
+                if move < 0.6:
+                    self.assertEqual(repr(bb.uncover(x, y)), repr(mb.uncover(x, y)))
+                elif move < 0.75:
+                    if not mb.cells[y][x].uncovered:
+                        on_off = not mb.cells[y][x].flagged
+                        mb.flag(x, y, on_off)
+                        bb.flag(x, y, on_off)
+                elif move < 0.85:
+                    self.assertEqual(sorted(bb.expand(x, y)), sorted(mb.expand(x, y)))
+                elif not mb.pending_mines and not mb.is_mine_at(x, y):
+                    mb.plant_mine(x, y)
+                    bb.plant_mine(x, y)
+                self.assertEqual(bb.to_bytes(), mb.to_bytes())
+                self.assertEqual(bb.status, mb.status)
+            self.assertEqual(str(bb), str(mb))
+
+    def test_lazy_planted_mines(self):
+        for seed in range(20):
+            mb = MineBoard(9, 9, 40, rng=random.Random(seed), lazy=True, safe_neighbourhood=True)
+            bb = BitBoard(9, 9, 40, rng=random.Random(seed), lazy=True, safe_neighbourhood=True)
+            for x, y in ((8, 8), (5, 4), (0, 1)):
+                mb.plant_mine(x, y)
+                bb.plant_mine(x, y)
+            self.assertEqual(repr(bb.uncover(1, 1)), repr(mb.uncover(1, 1)))
+            self.assertEqual(bb.number_of_mines, 43)
+            self.assertEqual(bb.to_bytes(), mb.to_bytes())
+
+    def test_adjacent_mine_counts(self):
+        bb = BitBoard(5, 4)
+        bb.plant_mines([(0, 0), (1, 0), (2, 0), (0, 1), (2, 1), (0, 2), (1, 2), (2, 2)])
+        print(bb)
+        # surrounded by the mines on all sides
+        self.assertEqual(bb.cell(1, 1).no_adjacent_mines, 8)
+        # the mines wrap neither around the rows, nor around the board
+        self.assertEqual(bb.cell(4, 0).no_adjacent_mines, 0)
+        self.assertEqual(bb.cell(4, 3).no_adjacent_mines, 0)
+        self.assertEqual(bb.cell(3, 1).no_adjacent_mines, 3)
+        self.assertEqual(bb.cell(0, 0).no_adjacent_mines, 0)
+        self.assertEqual(bb.number_of_mines, 8)
+
+    def test_flood(self):
+        bb = BitBoard(6, 4)
+        bb.plant_mines([(2, 0), (2, 1), (2, 2), (2, 3)])
+        bb.flag(5, 3)
+        bb.uncover(4, 0)
+        self.assertEqual(bb.status.uncovered, 12)
+        self.assertEqual(bb.status.flags, 0)
+        self.assertFalse(bb.cell(0, 0).uncovered)
+
+        # the origin of the expansion is revealed by its empty neighbours (not by itself)
+        bb = BitBoard(3, 3)
+        self.assertEqual(len(bb.expand(1, 1)), 9)
+        self.assertTrue(bb.status.won)
+        bb, mb = BitBoard(4, 3), MineBoard(4, 3)
+        for board in (bb, mb):
+            board.plant_mines([(1, 0), (1, 2), (3, 1)])
+        self.assertEqual(sorted(bb.expand(2, 1)), sorted(mb.expand(2, 1)))
+        self.assertEqual(bb.to_bytes(), mb.to_bytes())
+
+    def test_flags(self):
+        bb = BitBoard(4, 4)
+        bb.plant_mine(3, 3)
+        bb.flag(3, 3)
+        self.assertTrue(bb.cell(3, 3).flagged)
+        self.assertEqual(bb.status.flags, 1)
+        bb.uncover(2, 2)
+        with self.assertRaises(RuntimeError):
+            bb.flag(2, 2)
+
+    def test_serialization(self):
+        mb = MineBoard(16, 16, 40, rng=random.Random(3), lazy=True)
+        mb.uncover(8, 8)
+        bb = BitBoard.from_bytes(mb.to_bytes())
+        self.assertEqual(bb.to_bytes(), mb.to_bytes())
+        self.assertEqual(MineBoard.from_bytes(bb.to_bytes()).to_bytes(), mb.to_bytes())
+
+        with self.assertRaises(RuntimeError):
+            BitBoard.from_bytes(MineBoard(4, 4, topology="torus").to_bytes())
+
+    def test_invalid(self):
+        with self.assertRaises(RuntimeError):
+            BitBoard(MAX_SIZE + 1, 8)
+        bb = BitBoard(4, 4)
+        with self.assertRaises(RuntimeError):
+            bb.uncover(4, 0)
+        bb.plant_mine(1, 1)
+        with self.assertRaises(RuntimeError):
+            bb.plant_mine(1, 1)
+        with self.assertRaises(RuntimeError):
+            bb.plant_mines([(0, 0), (0, 0)])
+        for x, y in ((-1, 0), (0, -1), (4, 0), (0, 4)):
+            with self.assertRaises(RuntimeError):
+                bb.is_mine_at(x, y)
+        self.assertTrue(bb.is_mine_at(1, 1))
+
+    def test_bit_helpers(self):
+        self.assertEqual(full_adder(0b0111, 0b0101, 0b0011), (0b0001, 0b0111))
+        self.assertEqual(spread(0b101, 3).to_bytes(3, "little"), b"\x01\x00\x01")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
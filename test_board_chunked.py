@@ -0,0 +1,148 @@
+import unittest
+from collections import OrderedDict
+from unittest import TestCase
+
+from model.chunked import ChunkedMineBoard
+
+
+class TestChunkedMineBoard(TestCase):
+
+    def test_deterministic(self):
+        mb1 = ChunkedMineBoard(seed=7, density=0.2, chunk_size=8)
+        mb2 = ChunkedMineBoard(seed=7, density=0.2, chunk_size=8)
+        mb3 = ChunkedMineBoard(seed=8, density=0.2, chunk_size=8)
+
+        # 5 x 5 whole chunks
+        area = [(x, y) for y in range(-24, 16) for x in range(-24, 16)]
+        mines = [mb1.is_mine_at(x, y) for x, y in area]
+        self.assertEqual(mines, [mb2.is_mine_at(x, y) for x, y in area])
+        self.assertNotEqual(mines, [mb3.is_mine_at(x, y) for x, y in area])
+        self.assertEqual(sum(mines), mb1.mines_per_chunk * 25)
+        print(mb1.render(-24, -24, 40, 40))
+
+    def test_adjacent_counts_across_chunks(self):
+        mb = ChunkedMineBoard(seed=1, density=0.25, chunk_size=5)
+        for y in range(-12, 12):
+            for x in range(-12, 12):
+                cell = mb.cell_at(x, y)
+                self.assertEqual(cell.has_mine, mb.is_mine_at(x, y))
+                if not cell.has_mine:
+                    expected = sum(mb.is_mine_at(x + dx, y + dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1))
+                    self.assertEqual(cell.no_adjacent_mines, expected, (x, y))
+
+    def test_flood_fill(self):
+        mb = ChunkedMineBoard(seed=3, density=0.1, chunk_size=8)
+        start = next((x, 0) for x in range(1000) if mb.cell_at(x, 0).no_adjacent_mines == 0
+                     and not mb.is_mine_at(x, 0))
+
+        cell = mb.uncover(*start)
+        self.assertTrue(cell.uncovered)
+
+        # all the revealed cells are safe, and all the neighbours of revealed empty cells are revealed
+        revealed = [(x, y) for y in range(-100, 100) for x in range(-100, 100) if mb.cell_at(x, y).uncovered]
+        print(f"revealed: {len(revealed)}")
+        for x, y in revealed:
+            cell = mb.cell_at(x, y)
+            self.assertFalse(cell.has_mine)
+            if cell.no_adjacent_mines == 0:
+                for dy in (-1, 0, 1):
+                    for dx in (-1, 0, 1):
+                        self.assertTrue(mb.cell_at(x + dx, y + dy).uncovered)
+
+    def test_expand_covered_origin(self):
+        mb = ChunkedMineBoard(seed=3, density=0.0, chunk_size=8, max_reveal=100)
+        self.assertIn((0, 0), mb.expand(0, 0))
+        self.assertTrue(mb.cell_at(0, 0).uncovered)
+
+    def test_max_reveal(self):
+        mb = ChunkedMineBoard(seed=3, density=0.0, chunk_size=8, max_reveal=1000)
+        self.assertLessEqual(len(mb.expand(0, 0)), 1008)
+
+    def test_truncated_flood(self):
+        mb = ChunkedMineBoard(seed=3, density=0.1, chunk_size=8, max_reveal=200)
+        start = next((x, 0) for x in range(1000) if mb.cell_at(x, 0).no_adjacent_mines == 0
+                     and not mb.is_mine_at(x, 0))
+        revealed = mb.expand(*start)
+        for _ in range(3):
+            # every revealed empty cell is either expanded or left to be expanded
+            unexpanded = set(mb.unexpanded)
+            for x, y in revealed:
+                cell = mb.cell_at(x, y)
+                if cell.no_adjacent_mines == 0 and (x, y) not in unexpanded:
+                    self.assertTrue(all(mb.cell_at(x + dx, y + dy).uncovered for dy in (-1, 0, 1) for dx in (-1, 0, 1)))
+            self.assertTrue(unexpanded <= set(revealed))
+            if not mb.unexpanded:
+                break
+            revealed += mb.resume()
+        self.assertGreater(len(revealed), 200)
+
+    def test_eviction(self):
+        mb = ChunkedMineBoard(seed=5, density=0.3, chunk_size=4, max_chunks=4)
+        mb.flag(0, 0)
+        self.assertTrue(mb.cell_at(0, 0).flagged)
+
+        # walk far away, so the chunk with the flag gets evicted
+        for x in range(0, 400, 4):
+            mb.cell_at(x, 100)
+            self.assertLessEqual(len(mb.chunks), 4)
+
+        self.assertNotIn((0, 0), mb.chunks)
+        self.assertTrue(mb.cell_at(0, 0).flagged)
+
+    def test_eviction_during_flood(self):
+        class Chunks(OrderedDict):
+            peak = 0
+
+            def __setitem__(self, key, value):
+                super().__setitem__(key, value)
+                Chunks.peak = max(Chunks.peak, len(self))
+
+        mb = ChunkedMineBoard(seed=5, density=0.0, chunk_size=4, max_chunks=6, max_reveal=3000)
+        mb.chunks = Chunks()
+        revealed = mb.expand(0, 0)
+        self.assertGreater(len(revealed), 2900)
+        self.assertLessEqual(Chunks.peak, 6)
+        # the evicted chunks keep the revealed cells
+        self.assertTrue(all(mb.cell_at(x, y).uncovered for x, y in revealed))
+
+    def test_eviction_during_render(self):
+        class Chunks(OrderedDict):
+            peak = 0
+
+            def __setitem__(self, key, value):
+                super().__setitem__(key, value)
+                Chunks.peak = max(Chunks.peak, len(self))
+
+        mb = ChunkedMineBoard(seed=5, density=0.1, chunk_size=8, max_chunks=4)
+        mb.chunks = Chunks()
+        mb.uncover(*next((x, 0) for x in range(1000) if not mb.is_mine_at(x, 0)))
+        # the window is not aligned with the chunks
+        rendered = mb.render(-37, -35, 80, 80)
+        self.assertLessEqual(Chunks.peak, 4)
+
+        lines = rendered.splitlines()
+        self.assertEqual(len(lines), 80)
+        self.assertTrue(all(len(line) == 80 for line in lines))
+        self.assertEqual(lines, [''.join(str(mb.cell_at(x, y)) for x in range(-37, 43)) for y in range(-35, 45)])
+
+    def test_spilled_chunks(self):
+        mb = ChunkedMineBoard(seed=5, density=0.3, chunk_size=4, max_chunks=2, max_compressed=1)
+        flags = [(x, 0) for x in range(0, 200, 4) if not mb.cell_at(x, 0).uncovered]
+        for x, y in flags:
+            mb.flag(x, y)
+        for x in range(0, 200, 4):
+            mb.cell_at(x, 100)
+        self.assertLessEqual(len(mb.chunks), 2)
+        self.assertTrue(all(mb.cell_at(x, y).flagged for x, y in flags))
+        # the chunks read back are spilled (and read) again
+        self.assertTrue(all(mb.cell_at(x, y).flagged for x, y in flags))
+
+    def test_invalid(self):
+        with self.assertRaises(RuntimeError):
+            ChunkedMineBoard(density=1.0)
+        with self.assertRaises(RuntimeError):
+            ChunkedMineBoard(max_chunks=0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,9 +1,25 @@
+import random
+import sys
 import unittest
 from unittest import TestCase
 
 from model.board import MineBoard
 
 
+def recursive_expand(mb: MineBoard, x: int, y: int) -> None:
+    """
+    The original, recursive expansion (the reference the flood fill has to match).
+    """
+    for row in range(max(y - 1, 0), min(y + 1, mb.height - 1) + 1):
+        for col in range(max(x - 1, 0), min(x + 1, mb.width - 1) + 1):
+            if (col, row) != (x, y):
+                c = mb.cells[row][col]
+                if not c.uncovered:
+                    c.reveal()
+                    if c.no_adjacent_mines == 0:
+                        recursive_expand(mb, col, row)
+
+
 class TestMineBoardExpand(TestCase):
 
     def test_expand_1(self):
@@ -145,6 +161,70 @@ class TestMineBoardExpand(TestCase):
         self.assertTrue(tmp.has_mine)
         self.assertEqual(tmp.no_adjacent_mines, 0)
 
+    def test_expand_returns_revealed(self):
+        """
+        Expansion returns coordinates of all the cells it revealed (but not the expanded cell itself).
+
+        ■■■■■■          □□□□□□
+        ■■■■■■   -->    □111□□
+        ■■▣■■■          □1▣1□□
+        ■■■■■■          □1■1□□
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+
+        mb.cells[0][0].reveal()
+        revealed = mb.expand(0, 0)
+        print(mb)
+
+        self.assertEqual(len(revealed), len(set(revealed)))
+        expected = {(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS)} - {(0, 0), (2, 2), (2, 3)}
+        self.assertEqual(set(revealed), expected)
+
+    def test_expand_covered_origin(self):
+        """
+        An empty neighbour expands back to the covered origin and reveals it (as the recursive version does).
+        """
+        mb = MineBoard(3, 3)
+        revealed = mb.expand(0, 0)
+        self.assertIn((0, 0), revealed)
+        self.assertEqual(len(revealed), 9)
+        self.assertTrue(mb.status.won)
+
+    def test_expand_same_as_recursive(self):
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 5000))
+        try:
+            for seed in range(30):
+                rnd = random.Random(seed)
+                mines = rnd.sample([(x, y) for y in range(8) for x in range(10)], rnd.randrange(12))
+                x, y = rnd.randrange(10), rnd.randrange(8)
+                flood, recursive = MineBoard(10, 8), MineBoard(10, 8)
+                flood.plant_mines(mines)
+                recursive.plant_mines(mines)
+
+                revealed = flood.expand(x, y)
+                recursive_expand(recursive, x, y)
+                self.assertEqual(len(revealed), len(set(revealed)))
+                self.assertEqual(set(revealed), {(col, row) for row in range(8) for col in range(10)
+                                                 if recursive.cells[row][col].uncovered})
+                self.assertEqual(str(flood), str(recursive))
+        finally:
+            sys.setrecursionlimit(limit)
+
+    def test_expand_large_board(self):
+        """
+        Flood fill of a big, (almost) empty board must not hit the recursion limit.
+        """
+        NO_OF_ROWS, NO_OF_COLS = 400, 500
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(NO_OF_COLS - 1, NO_OF_ROWS - 1)
+
+        tmp = mb.uncover(0, 0)
+        self.assertTrue(tmp.uncovered)
+        self.assertTrue(all(c.uncovered != c.has_mine for row in mb.cells for c in row))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -1,6 +1,10 @@
+import copy
+import pickle
+import random
 import unittest
 from unittest import TestCase
 
+from model.bitboard import BitBoard
 from model.board import MineBoard
 
 
@@ -85,6 +89,107 @@ class TestMineBoardGenerate(TestCase):
         print(find_mines(mb))
         self.assertEqual(mb.number_of_mines, expected_number_of_mines)
 
+    def test_generate_non_square(self):
+        for NO_OF_ROWS, NO_OF_COLS in ((2, 30), (30, 2), (1, 5), (5, 1)):
+            expected_number_of_mines: int = NO_OF_ROWS * NO_OF_COLS // 2
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines)
+            print(mb)
+            self.assertEqual(mb.number_of_mines, expected_number_of_mines)
+            self.assertEqual(sum(c.has_mine for row in mb.cells for c in row), expected_number_of_mines)
+
+    def test_generate_seeded(self):
+        NO_OF_ROWS, NO_OF_COLS = 9, 16
+        expected_number_of_mines: int = 40
+
+        mb1 = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines, rng=random.Random(42))
+        mb2 = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines, rng=random.Random(42))
+        mb3 = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines, rng=random.Random(43))
+        print(mb1)
+
+        self.assertEqual(repr(mb1), repr(mb2))
+        self.assertNotEqual(repr(mb1), repr(mb3))
+
+    def test_default_rng_pickle(self):
+        for mb in (MineBoard(6, 5, 8), MineBoard(6, 5, 8, lazy=True), BitBoard(6, 5, 8, lazy=True)):
+            for restored in (pickle.loads(pickle.dumps(mb)), copy.deepcopy(mb)):
+                self.assertEqual(restored.to_bytes(), mb.to_bytes())
+                restored.uncover(0, 0)
+                self.assertEqual(restored.number_of_mines, 8)
+
+    def test_generate_lazy(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 4
+        expected_number_of_mines: int = NO_OF_ROWS * NO_OF_COLS - 1
+
+        for i in range(50):
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines, lazy=True)
+            self.assertEqual(mb.number_of_mines, 0)
+
+            x, y = i % NO_OF_COLS, i // NO_OF_COLS % NO_OF_ROWS
+            tmp = mb.uncover(x, y)
+            print(mb)
+            self.assertFalse(tmp.has_mine)
+            self.assertEqual(mb.number_of_mines, expected_number_of_mines)
+
+    def test_generate_lazy_safe_neighbourhood(self):
+        NO_OF_ROWS, NO_OF_COLS = 9, 9
+        expected_number_of_mines: int = 72
+
+        for i in range(50):
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines, lazy=True, safe_neighbourhood=True)
+            x, y = i % NO_OF_COLS, i // NO_OF_COLS % NO_OF_ROWS
+            tmp = mb.uncover(x, y)
+            print(mb)
+            self.assertEqual(tmp.no_adjacent_mines, 0)
+            self.assertEqual(mb.number_of_mines, expected_number_of_mines)
+
+        # not enough room to keep the neighbourhood clear, only the cell itself is guaranteed to be safe
+        mb = MineBoard(3, 3, 8, lazy=True, safe_neighbourhood=True)
+        self.assertFalse(mb.uncover(1, 1).has_mine)
+        self.assertEqual(mb.number_of_mines, 8)
+
+    def test_generate_lazy_planted_mines(self):
+        for seed in range(200):
+            mb = MineBoard(4, 4, 10, rng=random.Random(seed), lazy=True, safe_neighbourhood=seed % 2 == 0)
+            mb.plant_mine(3, 3)
+            self.assertFalse(mb.uncover(0, 0).has_mine)
+            # the planted mine is kept, the pending ones are placed around it
+            self.assertTrue(mb.is_mine_at(3, 3))
+            self.assertEqual(mb.number_of_mines, 11)
+            self.assertEqual(mb.pending_mines, 0)
+
+        # no room left for the pending mines: the board stays as it was
+        mb = MineBoard(3, 3, 7, lazy=True)
+        mb.plant_mine(2, 2)
+        mb.plant_mine(2, 1)
+        with self.assertRaises(RuntimeError):
+            mb.uncover(0, 0)
+        self.assertEqual(mb.pending_mines, 7)
+        self.assertEqual(mb.number_of_mines, 2)
+        self.assertFalse(mb.cells[0][0].uncovered)
+
+    def test_generate_lazy_expand(self):
+        for seed in range(200):
+            for mb in (MineBoard(6, 5, 20, rng=random.Random(seed), lazy=True),
+                       BitBoard(6, 5, 20, rng=random.Random(seed), lazy=True)):
+                revealed = mb.expand(2, 2)
+                # the mines are placed before the expansion, none of them under a revealed cell
+                self.assertEqual(mb.pending_mines, 0)
+                self.assertEqual(mb.number_of_mines, 20)
+                self.assertTrue(revealed)
+                self.assertFalse(any(mb.is_mine_at(x, y) for x, y in revealed))
+
+        # no room to keep the expanded neighbourhood clear: the board stays as it was
+        for mb in (MineBoard(3, 3, 2, lazy=True), BitBoard(3, 3, 2, lazy=True)):
+            with self.assertRaises(RuntimeError):
+                mb.expand(1, 1)
+            self.assertEqual(mb.pending_mines, 2)
+            self.assertEqual(mb.number_of_mines, 0)
+
+    def test_generate_lazy_too_many_mines(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 4
+        with self.assertRaises(RuntimeError):
+            MineBoard(NO_OF_COLS, NO_OF_ROWS, NO_OF_ROWS * NO_OF_COLS, lazy=True)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
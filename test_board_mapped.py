@@ -0,0 +1,83 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.mapped import MappedMineBoard
+
+
+class TestMappedMineBoard(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "board.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_same_as_in_memory(self):
+        NO_OF_ROWS, NO_OF_COLS = 9, 16
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 20, rng=random.Random(3))
+        with MappedMineBoard.create(self.path, NO_OF_COLS, NO_OF_ROWS, 20, rng=random.Random(3)) as mapped:
+            self.assertEqual(repr(mapped), repr(mb))
+
+            for x, y in ((0, 0), (8, 4), (15, 8)):
+                mb.uncover(x, y)
+                mapped.uncover(x, y)
+            mb.flag(1, 1)
+            mapped.flag(1, 1)
+            print(mapped)
+            self.assertEqual(repr(mapped), repr(mb))
+
+        with MappedMineBoard.open(self.path) as mapped:
+            self.assertEqual(repr(mapped), repr(mb))
+            self.assertEqual(mapped.status, mb.status)
+
+        # the file is in the binary board format
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), mb.to_bytes())
+
+    def test_big_board(self):
+        NO_OF_ROWS, NO_OF_COLS = 3000, 4000
+        with MappedMineBoard.create(self.path, NO_OF_COLS, NO_OF_ROWS, 1000, rng=random.Random(1)) as mapped:
+            mapped.plant_mine(1, 1)
+            self.assertEqual(mapped.number_of_mines, 1001)
+            self.assertEqual(mapped.uncover(0, 0).no_adjacent_mines, 1)
+
+        with MappedMineBoard.open(self.path) as mapped:
+            self.assertEqual(mapped.number_of_mines, 1001)
+            self.assertTrue(mapped.is_mine_at(1, 1))
+            self.assertTrue(mapped.cells[0][0].uncovered)
+            self.assertEqual(mapped.status.uncovered, 1)
+
+    def test_flood_not_collected(self):
+        NO_OF_ROWS, NO_OF_COLS = 300, 400
+        with MappedMineBoard.create(self.path, NO_OF_COLS, NO_OF_ROWS, 30, rng=random.Random(2),
+                                    lazy=True) as mapped:
+            # the mines planted before the first move are tracked: no scan of the file to place the pending ones
+            mapped.plant_mine(399, 299)
+            mapped._MineBoard__mine_positions = None
+            reported = []
+            mapped._MineBoard__revealed = lambda coords: reported.append(len(coords))
+
+            mapped.uncover(0, 0)
+            self.assertEqual(mapped.number_of_mines, 31)
+            self.assertTrue(mapped.is_mine_at(399, 299))
+            # only the uncovered cell is reported, the flood fill just counts the revealed cells
+            self.assertEqual(reported, [1])
+            uncovered = sum(c.uncovered for row in mapped.cells for c in row)
+            self.assertGreater(uncovered, 1)
+            self.assertEqual(mapped.status.uncovered, uncovered)
+            self.assertEqual(len(mapped.changes()), NO_OF_ROWS * NO_OF_COLS)
+
+    def test_open_invalid(self):
+        with open(self.path, "wb") as f:
+            f.write(MineBoard(4, 4).to_bytes()[:-1])
+        with self.assertRaises(RuntimeError):
+            MappedMineBoard.open(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
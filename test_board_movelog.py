@@ -0,0 +1,167 @@
+import io
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.movelog import replay, read_records, board_digest, MOVE_RECORD, MOVE_UNCOVER, MOVE_MINE, MOVE_GENERATE, \
+    MOVE_EXPAND, MOVE_DIGEST, OUTCOME_GAME_OVER, LOG_HEADER
+
+
+def play(mb: MineBoard, rnd: random.Random, moves: int) -> None:
+    """
+    Make random moves (of all the kinds) until the game is over.
+    """
+    for _ in range(moves):
+        if mb.status.won or mb.status.lost:
+            break
+        x, y = rnd.randrange(mb.width), rnd.randrange(mb.height)
+        move = rnd.random()
+        if move < 0.5:
+            mb.uncover(x, y)
+        elif move < 0.7:
+            if not mb.cells[y][x].uncovered:
+                mb.flag(x, y, not mb.cells[y][x].flagged)
+        elif move < 0.8:
+            mb.chord(x, y)
+        elif move < 0.9:
+            mb.expand(x, y)
+        else:
+            mb.uncover_many([(x, y), (rnd.randrange(mb.width), rnd.randrange(mb.height))])
+
+
+class TestMoveLog(TestCase):
+
+    def test_replay(self):
+        log = io.BytesIO()
+        boards = []
+        for seed in range(5):
+            mb = MineBoard(9, 9, 10, rng=random.Random(seed), lazy=True, safe_neighbourhood=True)
+            mb.record_moves(log)
+            play(mb, random.Random(seed), 200)
+            boards.append(mb)
+        print(boards[0])
+
+        log.seek(0)
+        replayed = []
+        for board, record in replay(log):
+            if not replayed or replayed[-1] is not board:
+                replayed.append(board)
+        self.assertEqual(len(replayed), 5)
+        for mb, board in zip(boards, replayed):
+            self.assertEqual(board.to_bytes(), mb.to_bytes())
+            self.assertEqual(board.status, mb.status)
+
+    def test_replay_expand(self):
+        log = io.BytesIO()
+        mb = MineBoard(16, 16, 40, rng=random.Random(4), lazy=True, safe_neighbourhood=True)
+        mb.record_moves(log)
+        mb.expand(8, 8)
+        mb.flag(0, 0)
+        mb.expand(2, 3)
+        mb.move_log.record_digest(mb)
+
+        log.seek(0)
+        kinds = [record.kind for _, record in read_records(log) if record is not None]
+        self.assertEqual(kinds.count(MOVE_EXPAND), 2)
+        self.assertEqual(kinds[-1], MOVE_DIGEST)
+        log.seek(0)
+        board, _ = list(replay(log))[-1]
+        self.assertEqual(board.to_bytes(), mb.to_bytes())
+
+        # without the second expansion the replayed board differs, which the digest tells
+        log.seek(0)
+        second = [record for _, record in read_records(log) if record is not None and record.kind == MOVE_EXPAND][1]
+        data = log.getvalue().replace(MOVE_RECORD.pack(*second), b"")
+        with self.assertRaises(RuntimeError):
+            for _ in replay(io.BytesIO(data)):
+                pass
+
+    def test_records(self):
+        log = io.BytesIO()
+        mb = MineBoard(6, 5, 3, rng=random.Random(1), lazy=True)
+        mb.record_moves(log)
+        mb.uncover(0, 0)
+
+        log.seek(0)
+        records = list(read_records(log))
+        snapshot, _ = records[0]
+        self.assertEqual(MineBoard.from_bytes(snapshot).pending_mines, 3)
+        kinds = [record.kind for _, record in records[1:]]
+        self.assertEqual(kinds, [MOVE_GENERATE, MOVE_MINE, MOVE_MINE, MOVE_MINE, MOVE_UNCOVER])
+        self.assertEqual(records[1][1].revealed, 3)
+        uncover = records[5][1]
+        self.assertEqual((uncover.x, uncover.y), (0, 0))
+        self.assertEqual(uncover.revealed, mb.status.uncovered)
+        self.assertEqual(len(log.getvalue()),
+                         LOG_HEADER.size + len(snapshot) + MOVE_RECORD.size * (len(records) - 1))
+
+    def test_planted_before_generation(self):
+        log = io.BytesIO()
+        mb = MineBoard(3, 3, 7, rng=random.Random(1), lazy=True)
+        mb.record_moves(log)
+        mb.plant_mine(2, 2)
+        mb.plant_mine(2, 1)
+        # no room for the pending mines: nothing is logged
+        size = len(log.getvalue())
+        with self.assertRaises(RuntimeError):
+            mb.uncover(0, 0)
+        self.assertEqual(len(log.getvalue()), size)
+
+        mb = MineBoard(4, 4, 10, rng=random.Random(2), lazy=True)
+        mb.record_moves(log)
+        mb.plant_mine(3, 3)
+        mb.uncover(0, 0)
+        log.seek(0)
+        board, _ = list(replay(log))[-1]
+        self.assertEqual(board.to_bytes(), mb.to_bytes())
+
+    def test_game_over(self):
+        log = io.BytesIO()
+        mb = MineBoard(3, 3)
+        mb.plant_mine(2, 2)
+        mb.record_moves(log)
+        mb.uncover(2, 2)
+
+        log.seek(0)
+        (_, _), (_, record), (_, digest) = read_records(log)
+        self.assertEqual(record.revealed, 1)
+        self.assertTrue(record.outcome & OUTCOME_GAME_OVER)
+        # the final state follows the move that ended the game
+        self.assertEqual(digest.kind, MOVE_DIGEST)
+        self.assertEqual((digest.x, digest.y, digest.revealed), board_digest(mb))
+        log.seek(0)
+        board, _ = list(replay(log))[-1]
+        self.assertTrue(board.status.lost)
+
+    def test_mismatch(self):
+        log = io.BytesIO()
+        mb = MineBoard(9, 9, 10, rng=random.Random(3), lazy=True)
+        mb.record_moves(log)
+        mb.uncover(4, 4)
+
+        # change the number of revealed cells of the last record (the uncover)
+        data = bytearray(log.getvalue())
+        data[-4:] = (12345).to_bytes(4, "little")
+        with self.assertRaises(RuntimeError):
+            for _ in replay(io.BytesIO(bytes(data))):
+                pass
+
+        # the outcomes are not checked
+        self.assertTrue(list(replay(io.BytesIO(bytes(data)), check=False)))
+
+    def test_invalid_log(self):
+        for data in (b"MSWX\x01\x00\x00\x00\x00", b"\x01" * MOVE_RECORD.size):
+            with self.assertRaises(RuntimeError):
+                list(replay(io.BytesIO(data)))
+
+        log = io.BytesIO()
+        mb = MineBoard(4, 4, 2, rng=random.Random(1))
+        mb.record_moves(log)
+        mb.uncover(0, 0)
+        with self.assertRaises(RuntimeError):
+            list(replay(io.BytesIO(log.getvalue()[:-1])))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,131 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+
+
+class TestMineBoardMoves(TestCase):
+
+    def test_uncover_many_same_as_uncover(self):
+        NO_OF_ROWS, NO_OF_COLS = 12, 15
+        for seed in range(20):
+            moves = [(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS)]
+            random.Random(seed).shuffle(moves)
+            moves = moves[:10]
+
+            mb1 = MineBoard(NO_OF_COLS, NO_OF_ROWS, 15, rng=random.Random(seed))
+            mb2 = MineBoard(NO_OF_COLS, NO_OF_ROWS, 15, rng=random.Random(seed))
+
+            result = mb1.uncover_many(moves)
+            for x, y in moves:
+                if mb2.uncover(x, y).has_mine:
+                    break
+            print(mb1)
+
+            self.assertEqual(repr(mb1), repr(mb2))
+            self.assertEqual(len(result.revealed), len(set(result.revealed)))
+            self.assertEqual(set(result.revealed),
+                             {(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS)
+                              if mb2.cells[y][x].uncovered})
+            self.assertEqual(result.game_over, bool(result.mines_hit))
+
+    def test_uncover_many_mine_hit(self):
+        """
+        ■■■■■■
+        ■■■■■■
+        ■■▣■■■
+        ■■■■■■
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+
+        result = mb.uncover_many([(2, 3), (2, 2), (0, 0)])
+        print(mb)
+        self.assertEqual(result.revealed, [(2, 3), (2, 2)])
+        self.assertEqual(result.mines_hit, [(2, 2)])
+        self.assertTrue(result.game_over)
+        self.assertFalse(mb.cells[0][0].uncovered)
+
+    def test_uncover_many_invalid(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+
+        with self.assertRaises(RuntimeError):
+            mb.uncover_many([(0, 0), (NO_OF_COLS, 0)])
+
+        # nothing gets uncovered if any of the moves is invalid
+        self.assertFalse(any(c.uncovered for row in mb.cells for c in row))
+
+    def test_flag_many(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        mb.uncover(2, 3)
+
+        mb.flag_many([(0, 0), (2, 2)])
+        self.assertTrue(mb.cells[0][0].flagged)
+        self.assertTrue(mb.cells[2][2].flagged)
+
+        with self.assertRaises(RuntimeError):
+            mb.flag_many([(1, 1), (2, 3)])
+        self.assertFalse(mb.cells[1][1].flagged)
+
+        mb.flag_many([(0, 0)], on_off=False)
+        self.assertFalse(mb.cells[0][0].flagged)
+
+    def test_chord(self):
+        """
+        ■■■■■■         □□□□□□
+        ■■■■■■   -->   □1221□
+        ■■▣▣■■         □1▣▣1□
+        ■■■■■■         □1221□
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        mb.plant_mine(3, 2)
+        mb.uncover(2, 1)
+
+        # not enough flags, nothing happens
+        mb.flag(2, 2)
+        result = mb.chord(2, 1)
+        self.assertEqual(result.revealed, [])
+
+        mb.flag(3, 2)
+        result = mb.chord(2, 1)
+        print(mb)
+        self.assertFalse(result.game_over)
+        self.assertEqual(result.mines_hit, [])
+        # the neighbours of (2, 1) and the expansion of the empty cells among them
+        self.assertEqual(len(result.revealed), len(set(result.revealed)))
+        self.assertIn((0, 0), result.revealed)
+        self.assertIn((0, 3), result.revealed)
+        self.assertNotIn((2, 3), result.revealed)
+        self.assertEqual(mb.status.remaining, 2)
+
+        # chording a hidden cell does nothing
+        self.assertEqual(mb.chord(2, 3).revealed, [])
+
+    def test_chord_wrong_flag(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        mb.uncover(2, 1)
+
+        mb.flag(1, 1)
+        result = mb.chord(2, 1)
+        print(mb)
+        self.assertEqual(result.mines_hit, [(2, 2)])
+        self.assertTrue(result.game_over)
+        self.assertTrue(mb.status.lost)
+
+    def test_chord_invalid(self):
+        mb = MineBoard(4, 4)
+        with self.assertRaises(RuntimeError):
+            mb.chord(4, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
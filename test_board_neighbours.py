@@ -0,0 +1,101 @@
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.neighbours import neighbour_table, rectangle_neighbours, box_ranges, RECTANGLE, HEX, MAX_TABLE_CELLS, \
+    _table
+
+
+class TestNeighbourTable(TestCase):
+
+    def test_table_matches_the_neighbourhood(self):
+        for width, height in ((1, 1), (1, 5), (5, 1), (2, 2), (7, 4)):
+            table = neighbour_table(width, height)
+            self.assertEqual(len(table), width * height)
+            for y in range(height):
+                for x in range(width):
+                    expected = {(col, row) for row in range(y - 1, y + 2) for col in range(x - 1, x + 2)
+                                if 0 <= col < width and 0 <= row < height and (col, row) != (x, y)}
+                    self.assertEqual(set(table[y * width + x]), expected)
+                    self.assertEqual(len(table[y * width + x]), len(expected))
+                    self.assertEqual(rectangle_neighbours(x, y, width, height), table[y * width + x])
+
+    def test_table_is_shared(self):
+        mb1 = MineBoard(6, 5)
+        mb2 = MineBoard(6, 5, 3, packed=True)
+        self.assertIs(mb1.neighbours(2, 3), mb2.neighbours(2, 3))
+        self.assertIsNot(mb1.neighbours(2, 3), MineBoard(5, 6).neighbours(2, 3))
+
+    def test_big_board_without_table(self):
+        width, height = MAX_TABLE_CELLS // 100 + 1, 100
+        self.assertIsNone(neighbour_table(width, height))
+
+        mb = MineBoard(width, height, packed=True)
+        self.assertEqual(mb.neighbours(0, 0), ((1, 0), (0, 1), (1, 1)))
+        self.assertEqual(len(mb.neighbours(5, 5)), 8)
+
+        mb.plant_mine(1, 1)
+        mb.uncover(width - 1, height - 1)
+        # everything but the mine and the cells cut off by it in the corner: (0, 0), (1, 0) and (0, 1)
+        self.assertEqual(mb.status.remaining, 3)
+        self.assertFalse(mb.cells[0][0].uncovered)
+
+    def test_big_board_expand(self):
+        width, height = MAX_TABLE_CELLS // 100 + 1, 100
+        mb = MineBoard(width, height)
+        mb.plant_mine(2, 0)
+        mb.plant_mine(2, 1)
+        mb.plant_mine(1, 2)
+        mb.plant_mine(0, 2)
+        # the corner is closed off by the mines and its neighbours are not empty: it stays covered
+        self.assertEqual(sorted(mb.expand(0, 0)), [(0, 1), (1, 0), (1, 1)])
+        self.assertFalse(mb.cells[0][0].uncovered)
+
+        revealed = mb.expand(width - 1, height - 1)
+        self.assertEqual(len(revealed), len(set(revealed)))
+        # the expanded covered cell is revealed by its empty neighbours, too
+        self.assertIn((width - 1, height - 1), revealed)
+        self.assertEqual(mb.status.remaining, 1)
+
+    def test_box_ranges(self):
+        for width, height in ((1, 1), (1, 5), (5, 1), (2, 2), (7, 4)):
+            cols, rows = box_ranges(width), box_ranges(height)
+            for y in range(height):
+                for x in range(width):
+                    box = [(col, row) for row in rows[y] for col in cols[x] if (col, row) != (x, y)]
+                    self.assertEqual(box, list(rectangle_neighbours(x, y, width, height)))
+
+    def test_index_table(self):
+        for topology in (RECTANGLE, HEX):
+            for width, height in ((1, 1), (1, 5), (5, 1), (2, 2), (7, 4)):
+                table = topology.index_table(width, height)
+                for y in range(height):
+                    for x in range(width):
+                        coords = topology.table(width, height)[y * width + x]
+                        self.assertEqual(table[y * width + x], tuple(row * width + col for col, row in coords))
+
+    def test_cached_tables_are_limited(self):
+        max_cells = _table.max_cells
+        _table.max_cells = 200
+        try:
+            shapes = [(10, 10 + i) for i in range(5)]
+            for width, height in shapes:
+                RECTANGLE.table(width, height)
+                self.assertLessEqual(_table.cells, 200)
+            # the recently used tables are kept, the others are built again
+            self.assertIs(RECTANGLE.table(*shapes[-1]), RECTANGLE.table(*shapes[-1]))
+            table = RECTANGLE.table(*shapes[0])
+            self.assertEqual(table, neighbour_table(*shapes[0]))
+            self.assertLessEqual(_table.cells, 200)
+        finally:
+            _table.max_cells = max_cells
+
+    def test_invalid_coordinates(self):
+        mb = MineBoard(4, 3)
+        for x, y in ((-1, 0), (0, -1), (4, 0), (0, 3)):
+            with self.assertRaises(RuntimeError):
+                mb.neighbours(x, y)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model import instrumentation
+from model.board import MineBoard
+
+
+def play(mb: MineBoard, rnd: random.Random) -> list:
+    """
+    Uncover (and sometimes flag) random cells until the game is over; collect what the observers were told.
+    """
+    notified = []
+    mb.subscribe(lambda coords: notified.append(sorted(coords)))
+    while not mb.game_over:
+        x, y = rnd.randrange(mb.width), rnd.randrange(mb.height)
+        if rnd.random() < 0.2:
+            if not mb.cells[y][x].uncovered:
+                mb.flag(x, y, not mb.cells[y][x].flagged)
+        else:
+            mb.uncover(x, y)
+    return notified
+
+
+class TestOpeningIndex(TestCase):
+
+    def test_same_as_flood(self):
+        for seed in range(10):
+            for packed, topology in ((False, "rectangle"), (True, "rectangle"), (False, "torus"), (True, "hex")):
+                flood = MineBoard(16, 12, 25, rng=random.Random(seed), packed=packed, topology=topology, lazy=True)
+                indexed = MineBoard(16, 12, 25, rng=random.Random(seed), packed=packed, topology=topology, lazy=True,
+                                    index_openings=True)
+                self.assertEqual(play(indexed, random.Random(seed)), play(flood, random.Random(seed)))
+                self.assertEqual(indexed.to_bytes(), flood.to_bytes())
+                self.assertEqual(indexed.status, flood.status)
+
+    def test_reveal_opening(self):
+        mb = MineBoard(6, 4, index_openings=True)
+        mb.plant_mines([(2, 0), (2, 1), (2, 2), (2, 3)])
+        mb.flag(5, 3)
+        mb.uncover(4, 0)
+        print(mb)
+        self.assertEqual(mb.status.uncovered, 12)
+        # the flag inside the opening got cleared
+        self.assertEqual(mb.status.flags, 0)
+        self.assertFalse(mb.cells[0][0].uncovered)
+
+    def test_index_is_used(self):
+        mb = MineBoard(30, 16, 40, rng=random.Random(1), index_openings=True)
+        zero = next((x, y) for y in range(16) for x in range(30)
+                    if not mb.is_mine_at(x, y) and mb.cells[y][x].no_adjacent_mines == 0)
+        instrumentation.enable()
+        try:
+            mb.uncover(*zero)
+            stats = instrumentation.STATS
+        finally:
+            instrumentation.disable()
+        self.assertEqual(stats.counters["opening_reveals"], 1)
+        self.assertNotIn("flood_fills", stats.counters)
+        self.assertEqual(stats.counters["opening_revealed_cells"] + 1, mb.status.uncovered)
+
+    def test_three_bv(self):
+        mb = MineBoard(6, 4)
+        mb.plant_mines([(2, 0), (2, 1), (2, 2), (2, 3)])
+        self.assertEqual(mb.three_bv, 2)
+        self.assertEqual(len(mb.openings.openings), 2)
+
+        # planting a mine changes the openings (the right one shrinks to the top two cells)
+        mb.plant_mine(4, 2)
+        self.assertEqual(mb.three_bv, 7)
+        mb.uncover(5, 0)
+        self.assertEqual(mb.status.uncovered, 6)
+
+        with self.assertRaises(RuntimeError):
+            MineBoard(6, 4, 5, lazy=True).three_bv
+
+    def test_index_kept(self):
+        mb = MineBoard(9, 9, 10, rng=random.Random(2))
+        openings = mb.openings
+        mb.uncover(0, 0)
+        mb.flag(8, 8, not mb.cells[8][8].uncovered)
+        self.assertIs(mb.openings, openings)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
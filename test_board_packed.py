@@ -0,0 +1,85 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.cell import Cell
+from model.packed import PackedCells, pack_cell
+
+
+class TestPackedCells(TestCase):
+
+    def test_cell_view(self):
+        cells = PackedCells(3, 2)
+        c = cells[1][2]
+        self.assertEqual(c.get_debug_representation(), '[F0FF]')
+
+        c.no_adjacent_mines = 8
+        c.flag(True)
+        self.assertEqual(cells[1][2].get_debug_representation(), '[F8TF]')
+
+        c.reveal()
+        self.assertEqual(cells[1][2].get_debug_representation(), '[F8FT]')
+        self.assertEqual(cells[1][2].get_representation(), '8')
+
+        # the other cells stay untouched
+        self.assertEqual(sum(cells.data[:5]), 0)
+
+    def test_cell_assignment(self):
+        cells = PackedCells(3, 2)
+        cells[0][1].no_adjacent_mines = 2
+
+        cells[0][1] = Cell(has_mine=True)
+        self.assertEqual(cells[0][1].get_debug_representation(), '[T0FF]')
+        self.assertEqual(cells.data[1], pack_cell(Cell(has_mine=True)))
+
+    def test_invalid_index(self):
+        cells = PackedCells(3, 2)
+        with self.assertRaises(IndexError):
+            cells[2]
+        with self.assertRaises(IndexError):
+            cells[0][3]
+
+
+class TestPackedMineBoard(TestCase):
+
+    def test_same_as_objects(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        boards = [MineBoard(NO_OF_COLS, NO_OF_ROWS, packed=packed) for packed in (False, True)]
+        for mb in boards:
+            mb.plant_mine(2, 2)
+            mb.plant_mine(3, 2)
+            mb.uncover(0, 0)
+            print(mb)
+
+        self.assertEqual(str(boards[0]), str(boards[1]))
+        self.assertEqual(repr(boards[0]), repr(boards[1]))
+
+    def test_expand_same_as_objects(self):
+        boards = [MineBoard(30, 16, 60, packed=packed, rng=random.Random(5)) for packed in (False, True)]
+        rnd = random.Random(6)
+        for _ in range(40):
+            x, y = rnd.randrange(30), rnd.randrange(16)
+            if rnd.random() < 0.3:
+                if not boards[0].cells[y][x].uncovered:
+                    for mb in boards:
+                        mb.flag(x, y)
+            else:
+                self.assertEqual(boards[0].expand(x, y), boards[1].expand(x, y))
+            self.assertEqual(str(boards[0]), str(boards[1]))
+            self.assertEqual(boards[0].number_of_uncovered, boards[1].number_of_uncovered)
+            self.assertEqual(boards[0].number_of_flags, boards[1].number_of_flags)
+            self.assertEqual(boards[0].number_of_triggered_mines, boards[1].number_of_triggered_mines)
+
+    def test_generate(self):
+        NO_OF_ROWS, NO_OF_COLS = 8, 8
+        expected_number_of_mines: int = 10
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, expected_number_of_mines, packed=True)
+        print(mb)
+        self.assertEqual(mb.number_of_mines, expected_number_of_mines)
+        self.assertEqual(sum(mb.is_mine_at(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS)),
+                         expected_number_of_mines)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.cell import HIDDEN_CELL, EMPTY_CELL
+
+
+class TestMineBoardRender(TestCase):
+
+    def test_render_same_as_str(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        for packed in (False, True):
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, packed=packed)
+            self.assertEqual(mb.render(), str(mb))
+
+            mb.plant_mine(2, 2)
+            self.assertEqual(mb.render(), str(mb))
+
+            mb.flag(2, 3)
+            mb.uncover(2, 1)
+            self.assertEqual(mb.render(), str(mb))
+
+            mb.uncover(0, 0)
+            print(mb.render())
+            self.assertEqual(mb.render(), str(mb))
+
+            mb.plant_mines([(5, 0)])
+            self.assertEqual(mb.render(), str(mb))
+
+    def test_render_random_moves(self):
+        for packed in (False, True):
+            mb = MineBoard(30, 16, 60, packed=packed, rng=random.Random(2))
+            rnd = random.Random(3)
+            for _ in range(60):
+                x, y = rnd.randrange(30), rnd.randrange(16)
+                if mb.cells[y][x].uncovered:
+                    mb.chord(x, y)
+                elif rnd.random() < 0.3:
+                    mb.flag(x, y, not mb.cells[y][x].flagged)
+                elif not mb.is_mine_at(x, y):
+                    mb.uncover(x, y)
+                self.assertEqual(mb.render(), str(mb))
+            # nothing changed: the same (cached) rendering
+            self.assertIs(mb.render(), mb.render())
+
+    def test_changes(self):
+        """
+        ■■■■■■         ■■■■■■         □□□□□□
+        ■■■■■■   -->   ■■1■■■   -->   □111□□
+        ■■▣■■■         ■■▣■■■         □1▣1□□
+        ■■■■■■         ■■■■■■         □1■1□□
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+
+        # the first call reports the whole board
+        self.assertEqual(len(mb.changes()), NO_OF_ROWS * NO_OF_COLS)
+        self.assertEqual(mb.changes(), {})
+
+        mb.uncover(2, 1)
+        self.assertEqual(mb.changes(), {(2, 1): '1'})
+
+        mb.flag(2, 3)
+        self.assertEqual(mb.changes(), {(2, 3): HIDDEN_CELL})
+
+        # the flood changes more than a quarter of the board, so the whole board is reported
+        mb.uncover(0, 0)
+        changes = mb.changes()
+        print(mb)
+        self.assertEqual(len(changes), NO_OF_ROWS * NO_OF_COLS)
+        self.assertEqual(changes[(0, 0)], EMPTY_CELL)
+        self.assertEqual(changes[(3, 3)], '1')
+        self.assertEqual(changes[(2, 3)], HIDDEN_CELL)
+
+    def test_changes_big_flood(self):
+        mb = MineBoard(40, 30)
+        mb.plant_mine(39, 29)
+        mb.plant_mine(0, 29)
+        self.assertEqual(len(mb.changes()), 40 * 30)
+
+        # small changes are tracked cell by cell
+        mb.flag(20, 29)
+        mb.uncover(1, 29)
+        self.assertEqual(mb.changes(), {(20, 29): HIDDEN_CELL, (1, 29): '1'})
+
+        # a big flood marks the whole board, and what it reports matches the rendering
+        mb.uncover(20, 10)
+        changes = mb.changes()
+        self.assertEqual(len(changes), 40 * 30)
+        rendered = mb.render().splitlines()
+        self.assertTrue(all(rendered[y][x] == r for (x, y), r in changes.items()))
+        self.assertEqual(mb.changes(), {})
+
+    def test_changes_between_renders(self):
+        for packed in (False, True):
+            mb = MineBoard(10, 10, packed=packed)
+            mb.plant_mine(5, 5)
+            self.assertEqual(mb.render(), str(mb))
+
+            # the changes taken by `changes` are still rendered
+            mb.uncover(4, 4)
+            self.assertEqual(mb.changes(), {(4, 4): '1'})
+            self.assertEqual(mb.render(), str(mb))
+
+            mb.flag(5, 5)
+            mb.uncover(6, 6)
+            mb.changes()
+            mb.uncover(0, 9)
+            mb.changes()
+            self.assertEqual(mb.render(), str(mb))
+            self.assertEqual(mb.changes(), {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,57 @@
+import random
+import time
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard, BOARD_HEADER
+
+
+class TestMineBoardSerialization(TestCase):
+
+    def test_round_trip(self):
+        NO_OF_ROWS, NO_OF_COLS = 9, 16
+        for packed in (False, True):
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 20, packed=packed, rng=random.Random(5))
+            mb.uncover(0, 0)
+            mb.flag(NO_OF_COLS - 1, NO_OF_ROWS - 1)
+            print(mb)
+
+            data = mb.to_bytes()
+            self.assertEqual(len(data), BOARD_HEADER.size + NO_OF_ROWS * NO_OF_COLS)
+
+            for restore_packed in (False, True):
+                restored = MineBoard.from_bytes(data, packed=restore_packed)
+                self.assertEqual(repr(restored), repr(mb))
+                self.assertEqual(restored.status, mb.status)
+                self.assertEqual(restored.to_bytes(), data)
+
+    def test_round_trip_lazy(self):
+        mb = MineBoard(8, 8, 10, lazy=True, safe_neighbourhood=True)
+        restored = MineBoard.from_bytes(mb.to_bytes())
+        self.assertEqual(restored.number_of_mines, 0)
+        self.assertEqual(restored.uncover(4, 4).no_adjacent_mines, 0)
+        self.assertEqual(restored.number_of_mines, 10)
+
+    def test_invalid_data(self):
+        data = MineBoard(4, 4, 3).to_bytes()
+
+        with self.assertRaises(RuntimeError):
+            MineBoard.from_bytes(data[:5])
+        with self.assertRaises(RuntimeError):
+            MineBoard.from_bytes(b"XXXX" + data[4:])
+        with self.assertRaises(RuntimeError):
+            MineBoard.from_bytes(data[:-1])
+
+    def test_restore_big_board(self):
+        NO_OF_ROWS, NO_OF_COLS = 1000, 1000
+        data = MineBoard(NO_OF_COLS, NO_OF_ROWS, 100000, packed=True).to_bytes()
+
+        start = time.perf_counter()
+        mb = MineBoard.from_bytes(data)
+        elapsed = time.perf_counter() - start
+        print(f"restored {NO_OF_COLS}x{NO_OF_ROWS} board in {elapsed:.4f} s")
+        self.assertEqual(mb.number_of_mines, 100000)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
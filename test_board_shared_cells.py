@@ -0,0 +1,128 @@
+import copy
+import pickle
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.cell import Cell, SharedCell, UNTOUCHED_CELL, UNTOUCHED_CELLS, UNTOUCHED_MINE, REVEALED_CELLS
+
+
+class TestSharedCells(TestCase):
+
+    def test_cell_slots(self):
+        c = Cell()
+        self.assertFalse(hasattr(c, '__dict__'))
+        with self.assertRaises(AttributeError):
+            c.color = "red"
+
+    def test_shared_cell_is_immutable(self):
+        with self.assertRaises(RuntimeError):
+            UNTOUCHED_CELL.no_adjacent_mines = 1
+        with self.assertRaises(RuntimeError):
+            UNTOUCHED_MINE.reveal()
+        self.assertFalse(UNTOUCHED_CELL.uncovered)
+
+    def test_untouched_cells_are_shared(self):
+        mb = MineBoard(5, 4)
+        self.assertTrue(all(c is UNTOUCHED_CELL for row in mb.read_rows() for c in row))
+
+        # reading the cells copies nothing
+        self.assertEqual(sum(c.no_adjacent_mines for row in mb.cells for c in row), 0)
+        self.assertFalse(any(mb.cells[y][x].uncovered for y in range(4) for x in range(5)))
+        self.assertTrue(all(c is UNTOUCHED_CELL for row in mb.read_rows() for c in row))
+
+        # modifying a cell gives it a cell of its own
+        c = mb.cells[1][2]
+        c.no_adjacent_mines = 2
+        self.assertIs(type(mb.cell_at(2, 1)), Cell)
+        self.assertIs(mb.cells[1][2], mb.cell_at(2, 1))
+        self.assertEqual(c.no_adjacent_mines, 2)
+        self.assertEqual(sum(c.no_adjacent_mines for row in mb.cells for c in row), 2)
+
+        # rows still concatenate as lists
+        self.assertEqual(len(sum(mb.cells, [])), 20)
+
+    def test_generated_board(self):
+        mb1 = MineBoard(12, 9, 20, rng=random.Random(4))
+        mb2 = MineBoard(12, 9, 20, rng=random.Random(4), packed=True)
+        self.assertEqual(str(mb1), str(mb2))
+        print(mb1)
+        # nothing was modified individually, so all the cells are shared
+        self.assertTrue(all(type(c) is SharedCell for row in mb1.read_rows() for c in row))
+
+        mb1.uncover(0, 0)
+        mb2.uncover(0, 0)
+        self.assertEqual(str(mb1), str(mb2))
+        self.assertEqual(mb1.status, mb2.status)
+
+    def test_plant_mine_next_to_revealed_cell(self):
+        mb = MineBoard(5, 4)
+        mb.plant_mine(4, 3)
+        mb.uncover(0, 0)
+        self.assertTrue(mb.is_mine_at(4, 3))
+        self.assertEqual(mb.status.remaining, 0)
+
+        mb.plant_mine(0, 0)
+        self.assertTrue(mb.cells[1][1].uncovered)
+        self.assertEqual(mb.cells[1][1].no_adjacent_mines, 1)
+        self.assertTrue(mb.cells[2][3].uncovered)
+        self.assertEqual(mb.cells[2][3].no_adjacent_mines, 1)
+        with self.assertRaises(RuntimeError):
+            mb.flag(1, 1)
+
+    def test_serialization(self):
+        mb = MineBoard(8, 6, 7, rng=random.Random(5), lazy=True)
+        mb.uncover(4, 3)
+        x, y = next((x, y) for y in range(6) for x in range(8) if not mb.is_mine_at(x, y)
+                    and not mb.cell_at(x, y).uncovered)
+        mb.flag(x, y)
+        restored = MineBoard.from_bytes(mb.to_bytes(), packed=False)
+        self.assertEqual(restored.to_bytes(), mb.to_bytes())
+        # the flagged cell is not in any of the shared states
+        self.assertIs(type(restored.cell_at(x, y)), Cell)
+        self.assertTrue(restored.cells[y][x].flagged)
+
+    def test_row_access(self):
+        mb = MineBoard(4, 3)
+        mb.plant_mine(3, 2)
+        # cell_at (and read_rows) give the shared cells, read-only
+        self.assertIs(mb.cell_at(1, 0), UNTOUCHED_CELL)
+        with self.assertRaises(RuntimeError):
+            mb.cell_at(1, 0).flag(True)
+
+        # iterating and indexing give the same: the cells can be modified either way
+        for c in mb.cells[0]:
+            c.flag(True)
+        mb.cells[1][2].reveal()
+        self.assertTrue(all(mb.cells[0][x].flagged for x in range(4)))
+        self.assertTrue(list(mb.cells[1])[2].uncovered)
+        self.assertIs(type(mb.cell_at(2, 1)), Cell)
+        # only the modified cells got cells of their own
+        self.assertEqual(sum(type(c) is Cell for row in mb.read_rows() for c in row), 5)
+        self.assertIs(mb.cell_at(3, 1), UNTOUCHED_CELLS[1])
+
+        # a view is pickled (and copied) as the cell it shows
+        view = mb.cells[1][3]
+        self.assertEqual(copy.copy(view).get_debug_representation(), "[F1FF]")
+        self.assertIs(pickle.loads(pickle.dumps(view)), UNTOUCHED_CELLS[1])
+
+    def test_pickle(self):
+        mb = MineBoard(9, 9, 10, rng=random.Random(1))
+        mb.uncover(0, 0)
+        mb.flag(*next((x, y) for y in range(9) for x in range(9) if not mb.cell_at(x, y).uncovered))
+        data = mb.to_bytes()
+        for restored in (pickle.loads(pickle.dumps(mb)), copy.deepcopy(mb)):
+            self.assertEqual(restored.to_bytes(), mb.to_bytes())
+            # the shared cells stay shared
+            self.assertTrue(all(c is UNTOUCHED_CELLS[c.no_adjacent_mines] or c is REVEALED_CELLS[c.no_adjacent_mines]
+                                or c is UNTOUCHED_MINE for row in restored.read_rows() for c in row
+                                if type(c) is SharedCell))
+            # the copy is independent of the board
+            restored.cells[8][8].flag(True)
+            restored.uncover(8, 0)
+            self.assertEqual(mb.to_bytes(), data)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
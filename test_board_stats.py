@@ -0,0 +1,130 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.board_stats import BoardConfig, Histogram, board_metrics, collect_statistics, sample_statistics, \
+    format_statistics
+from model.openings import board_openings, board_layout, label_openings
+
+
+def clicks_to_clear(mb: MineBoard) -> int:
+    """
+    Clear the board the slow way: uncover a cell of every opening first, then the rest of the cells one by one.
+    """
+    clicks = 0
+    for zero_cells_first in (True, False):
+        for y in range(mb.height):
+            for x in range(mb.width):
+                c = mb.cells[y][x]
+                if c.uncovered or c.has_mine or (zero_cells_first and c.no_adjacent_mines):
+                    continue
+                mb.uncover(x, y)
+                clicks += 1
+    return clicks
+
+
+class TestOpenings(TestCase):
+
+    def test_openings(self):
+        mb = MineBoard(6, 4)
+        mb.plant_mines([(2, 0), (2, 1), (2, 2), (2, 3)])
+        print(mb)
+        openings = board_openings(mb)
+        # two openings (on both sides of the wall), the wall cells are their borders
+        self.assertEqual(len(openings.openings), 2)
+        self.assertEqual(sorted(openings.openings[0].zeros), [0, 6, 12, 18])
+        self.assertEqual(sorted(openings.openings[0].border), [1, 7, 13, 19])
+        self.assertEqual(len(openings.openings[1]), 12)
+        self.assertEqual(openings.labels[:6], [0, -1, -1, -1, 1, 1])
+        self.assertEqual(openings.three_bv, 2)
+        self.assertEqual(openings.largest, 12)
+
+    def test_no_openings(self):
+        mb = MineBoard(3, 3)
+        mb.plant_mine(1, 1)
+        openings = board_openings(mb)
+        self.assertEqual(openings.openings, [])
+        self.assertEqual(openings.three_bv, 8)
+        self.assertEqual(openings.largest, 1)
+
+    def test_three_bv(self):
+        for seed in range(20):
+            for packed, topology in ((False, "rectangle"), (True, "rectangle"), (False, "torus"), (True, "hex")):
+                mb = MineBoard(12, 9, 20, rng=random.Random(seed), packed=packed, topology=topology)
+                openings = board_openings(mb)
+                self.assertEqual(openings.three_bv, clicks_to_clear(mb))
+                self.assertTrue(mb.status.won)
+
+    def test_largest_flood(self):
+        mb = MineBoard(16, 16, 40, rng=random.Random(7))
+        openings = board_openings(mb)
+        sizes = []
+        for opening in openings.openings:
+            board = MineBoard.from_bytes(mb.to_bytes())
+            i = opening.zeros[0]
+            board.uncover(i % 16, i // 16)
+            sizes.append(board.status.uncovered)
+        self.assertEqual(max(sizes), openings.largest)
+
+    def test_label_without_table(self):
+        mb = MineBoard(10, 8, 12, rng=random.Random(2))
+        mines, counts = board_layout(mb)
+        expected = label_openings(mines, counts, 10, 8)
+
+        class Topology(type(mb.topology)):
+            def index_table(self, width, height):
+                return None
+        self.assertEqual(label_openings(mines, counts, 10, 8, Topology()), expected)
+
+
+class TestBoardStats(TestCase):
+
+    def test_histogram(self):
+        h = Histogram()
+        for value in (3, 1, 2, 3, 3):
+            h.add(value)
+        self.assertEqual(h.total, 5)
+        self.assertEqual(h.mean(), 2.4)
+        self.assertEqual(h.percentile(0), 1)
+        self.assertEqual(h.percentile(50), 3)
+        self.assertEqual(h.percentile(100), 3)
+        self.assertEqual(h.items(), [(1, 1), (2, 1), (3, 3)])
+        with self.assertRaises(RuntimeError):
+            Histogram().mean()
+
+    def test_sample_statistics(self):
+        config = BoardConfig(9, 9, 10)
+        statistics = sample_statistics(config, 50, 1)
+        self.assertEqual(statistics, sample_statistics(config, 50, 1))
+        self.assertEqual(statistics.boards, 50)
+        for histogram in (statistics.three_bv, statistics.openings, statistics.largest_flood):
+            self.assertEqual(histogram.total, 50)
+        print(format_statistics(statistics))
+
+    def test_collect_statistics(self):
+        configs = [BoardConfig(9, 9, 10), BoardConfig.with_density(8, 8, 0.2, "torus")]
+        self.assertEqual(configs[1].mines, 13)
+        results = list(collect_statistics(configs, 120, seed=5, workers=2, chunk_size=50))
+        # streamed after every chunk (3 chunks for every configuration)
+        self.assertEqual(len(results), 6)
+        final = {s.config: s for s in results if s.boards == 120}
+        self.assertEqual(set(final), set(configs))
+
+        # the same seed gives the same statistics, however the work is split between the workers
+        again = {s.config: s for s in collect_statistics(configs, 120, seed=5, workers=1, chunk_size=50)
+                 if s.boards == 120}
+        self.assertEqual(again, final)
+
+    def test_board_metrics(self):
+        mb = MineBoard(6, 4)
+        mb.plant_mines([(2, 0), (2, 1), (2, 2), (2, 3)])
+        self.assertEqual(tuple(board_metrics(mb)), (2, 2, 12))
+
+    def test_invalid(self):
+        with self.assertRaises(RuntimeError):
+            list(collect_statistics([BoardConfig(9, 9, 10)], 10, chunk_size=0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+
+
+def scan_status(mb: MineBoard):
+    """
+    Compute the status counters the slow way (scanning the whole board).
+    """
+    cells = [c for row in mb.cells for c in row]
+    uncovered = sum(c.uncovered and not c.has_mine for c in cells)
+    flags = sum(c.flagged for c in cells)
+    triggered = sum(c.uncovered and c.has_mine for c in cells)
+    remaining = sum(not c.uncovered and not c.has_mine for c in cells) - mb.pending_mines
+    return uncovered, flags, triggered, remaining
+
+
+class TestMineBoardStatus(TestCase):
+
+    def test_initial_status(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 5)
+        status = mb.status
+        self.assertEqual(tuple(status[:4]), (0, 0, 0, NO_OF_ROWS * NO_OF_COLS - 5))
+        self.assertFalse(status.won)
+        self.assertFalse(status.lost)
+
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 5, lazy=True)
+        self.assertEqual(mb.status.remaining, NO_OF_ROWS * NO_OF_COLS - 5)
+
+    def test_status_follows_moves(self):
+        NO_OF_ROWS, NO_OF_COLS = 9, 9
+        for seed in range(30):
+            rnd = random.Random(seed)
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 10, rng=rnd, packed=seed % 2 == 1)
+
+            while not mb.status.won and not mb.status.lost:
+                x, y = rnd.randrange(NO_OF_COLS), rnd.randrange(NO_OF_ROWS)
+                move = rnd.random()
+                if mb.cells[y][x].uncovered:
+                    continue
+                if move < 0.3:
+                    mb.flag(x, y, not mb.cells[y][x].flagged)
+                elif move < 0.4:
+                    mb.flag_many([(x, y)])
+                elif move < 0.5:
+                    mb.expand(x, y)
+                elif move < 0.6:
+                    mb.uncover_many([(x, y)])
+                elif move < 0.7 and not mb.is_mine_at(x, y):
+                    mb.plant_mine(x, y)
+                else:
+                    mb.uncover(x, y)
+                self.assertEqual(tuple(mb.status[:4]), scan_status(mb))
+
+            print(mb)
+            self.assertEqual(mb.status.won, mb.status.remaining == 0)
+
+    def test_won(self):
+        """
+        ■■■■■■
+        ■■■■■■
+        ■■▣■■■
+        ■■■■■■
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        mb.uncover(0, 0)
+        self.assertEqual(mb.status.remaining, 1)
+        self.assertFalse(mb.status.won)
+
+        result = mb.uncover_many([(2, 3)])
+        self.assertTrue(mb.status.won)
+        self.assertTrue(result.game_over)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
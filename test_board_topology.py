@@ -0,0 +1,90 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.neighbours import RECTANGLE, TORUS, HEX, get_topology
+
+
+class TestBoardTopology(TestCase):
+
+    def test_torus_neighbours(self):
+        mb = MineBoard(5, 4, topology="torus")
+        self.assertIs(mb.topology, TORUS)
+        for y in range(4):
+            for x in range(5):
+                self.assertEqual(len(mb.neighbours(x, y)), 8)
+        self.assertEqual(set(mb.neighbours(0, 0)),
+                         {(4, 3), (0, 3), (1, 3), (4, 0), (1, 0), (4, 1), (0, 1), (1, 1)})
+
+        # on tiny boards the wrapped neighbours coincide, they are listed once
+        mb = MineBoard(2, 2, topology="torus")
+        self.assertEqual(set(mb.neighbours(0, 0)), {(1, 0), (0, 1), (1, 1)})
+        self.assertEqual(len(mb.neighbours(0, 0)), 3)
+
+    def test_hex_neighbours(self):
+        mb = MineBoard(5, 4, topology=HEX)
+        # even row: the rows above and below are shifted to the right
+        self.assertEqual(set(mb.neighbours(2, 2)), {(1, 2), (3, 2), (1, 1), (2, 1), (1, 3), (2, 3)})
+        # odd row
+        self.assertEqual(set(mb.neighbours(2, 1)), {(1, 1), (3, 1), (2, 0), (3, 0), (2, 2), (3, 2)})
+        # corner
+        self.assertEqual(set(mb.neighbours(0, 0)), {(1, 0), (0, 1)})
+
+    def test_adjacency_is_symmetric(self):
+        for topology in (RECTANGLE, TORUS, HEX):
+            mb = MineBoard(7, 5, topology=topology)
+            for y in range(5):
+                for x in range(7):
+                    neighbours = mb.neighbours(x, y)
+                    self.assertNotIn((x, y), neighbours)
+                    self.assertEqual(len(set(neighbours)), len(neighbours))
+                    for col, row in neighbours:
+                        self.assertIn((x, y), mb.neighbours(col, row))
+
+    def test_plant_mines_matches_plant_mine(self):
+        for topology in ("torus", "hex"):
+            mines = random.Random(1).sample([(x, y) for y in range(6) for x in range(9)], 15)
+            mb1 = MineBoard(9, 6, topology=topology)
+            mb1.plant_mines(mines)
+            mb2 = MineBoard(9, 6, topology=topology, packed=True)
+            mb2.plant_mines(mines)
+            mb3 = MineBoard(9, 6, topology=topology)
+            for x, y in mines:
+                mb3.plant_mine(x, y)
+            print(mb3)
+            self.assertEqual(str(mb1), str(mb3))
+            self.assertEqual(str(mb2), str(mb3))
+            for y in range(6):
+                for x in range(9):
+                    if not mb3.is_mine_at(x, y):
+                        self.assertEqual(mb3.cells[y][x].no_adjacent_mines,
+                                         sum(mb3.is_mine_at(col, row) for col, row in mb3.neighbours(x, y)))
+
+    def test_torus_flood_wraps(self):
+        mb = MineBoard(6, 5, topology="torus")
+        mb.plant_mine(2, 2)
+        mb.uncover(0, 0)
+        # every cell but the mine is reachable (around the edges, too)
+        self.assertEqual(mb.status.remaining, 0)
+        self.assertTrue(mb.status.won)
+        self.assertTrue(mb.cells[4][5].uncovered)
+
+    def test_serialization_keeps_topology(self):
+        for topology in (RECTANGLE, TORUS, HEX):
+            mb = MineBoard(7, 5, 6, rng=random.Random(3), topology=topology, lazy=True, safe_neighbourhood=True)
+            mb.uncover(3, 2)
+            for packed in (False, True):
+                restored = MineBoard.from_bytes(mb.to_bytes(), packed=packed)
+                self.assertIs(restored.topology, topology)
+                self.assertTrue(restored.safe_neighbourhood)
+                self.assertEqual(str(restored), str(mb))
+
+    def test_unknown_topology(self):
+        with self.assertRaises(RuntimeError):
+            MineBoard(4, 4, topology="klein bottle")
+        self.assertIs(get_topology("rectangle"), RECTANGLE)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
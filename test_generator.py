@@ -0,0 +1,36 @@
+import unittest
+from unittest import TestCase
+
+from model.generator import generate_no_guess_board, generate_no_guess_boards, is_solvable
+from model.board import MineBoard
+
+
+class TestNoGuessGenerator(TestCase):
+
+    def test_generate_board(self):
+        seed, start, data = generate_no_guess_board(9, 9, 10, seed=1)
+        mb = MineBoard.from_bytes(data)
+        print(mb)
+        self.assertEqual(mb.number_of_mines, 10)
+        self.assertEqual(mb.status.uncovered, 0)
+        self.assertEqual(mb.cells[start[1]][start[0]].no_adjacent_mines, 0)
+        self.assertTrue(is_solvable(mb, *start))
+
+        # the same seed gives the same board
+        self.assertEqual(generate_no_guess_board(9, 9, 10, seed=1)[2], data)
+
+    def test_generate_boards(self):
+        seeds = [11, 12, 13, 14]
+        boards = list(generate_no_guess_boards(16, 16, 40, len(seeds), seeds=seeds, workers=2))
+        self.assertEqual(sorted(b.seed for b in boards), seeds)
+        for generated in boards:
+            self.assertEqual(generated.board.to_bytes(), generate_no_guess_board(16, 16, 40, generated.seed)[2])
+            self.assertTrue(is_solvable(generated.board, *generated.start))
+
+    def test_generate_invalid(self):
+        with self.assertRaises(RuntimeError):
+            list(generate_no_guess_boards(9, 9, 10, 2, seeds=[1]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
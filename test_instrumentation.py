@@ -0,0 +1,88 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import TestCase
+
+from model import instrumentation
+from model.board import MineBoard
+from model.mapped import MappedMineBoard
+
+
+class TestInstrumentation(TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled(self):
+        self.assertIsNone(instrumentation.STATS)
+        mb = MineBoard(6, 4, 3)
+        mb.uncover(0, 0)
+        self.assertIsNone(instrumentation.disable())
+        # no wrappers are installed
+        self.assertEqual(MineBoard.uncover.__code__.co_name, "uncover")
+
+    def test_enabled(self):
+        stats = instrumentation.enable()
+        self.assertIs(instrumentation.enable(), stats)
+
+        mb = MineBoard(30, 20, 10, rng=random.Random(1))
+        safe = [(x, y) for y in range(20) for x in range(30) if not mb.is_mine_at(x, y)]
+        mb.plant_mine(*safe[-1])
+        mb.uncover_many(safe[:5])
+        str(mb)
+
+        result = stats.as_dict()
+        print(result)
+        self.assertEqual(result["counters"]["generated_boards"], 1)
+        self.assertEqual(result["counters"]["generated_mines"], 10)
+        self.assertEqual(result["counters"]["plant_mine_calls"], 1)
+        self.assertEqual(result["timings"]["uncover_many"]["calls"], 1)
+        self.assertEqual(result["timings"]["__str__"]["calls"], 1)
+
+        prometheus = stats.to_prometheus()
+        print(prometheus)
+        self.assertIn("minesweeper_generated_mines_total 10\n", prometheus)
+        self.assertIn('minesweeper_method_calls_total{method="uncover_many"} 1\n', prometheus)
+
+        self.assertIs(instrumentation.disable(), stats)
+        self.assertIsNone(instrumentation.STATS)
+
+    def test_flood_stats(self):
+        stats = instrumentation.enable()
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        mb.uncover(0, 0)
+
+        self.assertEqual(stats.counters["flood_fills"], 1)
+        self.assertEqual(stats.counters["flood_revealed_cells"], NO_OF_ROWS * NO_OF_COLS - 3)
+        # all the empty cells get expanded
+        self.assertEqual(stats.counters["flood_expanded_cells"],
+                         sum(c.uncovered and c.no_adjacent_mines == 0 for row in mb.cells for c in row))
+        self.assertGreater(stats.maximums["flood_depth"], 0)
+        self.assertEqual(stats.counters["plant_mine_calls"], 1)
+        self.assertEqual(stats.timings["uncover"][0], 1)
+        # the flood is a part of the uncover, not a call of `expand`
+        self.assertNotIn("expand", stats.timings)
+        mb.expand(5, 0)
+        self.assertEqual(stats.timings["expand"][0], 1)
+
+    def test_mapped_board(self):
+        stats = instrumentation.enable()
+        with tempfile.TemporaryDirectory() as directory:
+            with MappedMineBoard.create(os.path.join(directory, "board.bin"), 8, 6) as mb:
+                # the override of the subclass is timed as well
+                mb.plant_mines([(1, 1), (6, 4)])
+                mb.uncover(0, 5)
+        self.assertEqual(stats.timings["plant_mines"][0], 1)
+        self.assertEqual(stats.timings["plant_mine"][0], 2)
+        self.assertEqual(stats.timings["uncover"][0], 1)
+
+        instrumentation.disable()
+        self.assertEqual(MappedMineBoard.plant_mines.__code__.co_name, "plant_mines")
+        self.assertIs(MappedMineBoard.uncover, MineBoard.uncover)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,3 +1,4 @@
+import random
 import unittest
 from unittest import TestCase
 
@@ -247,6 +248,41 @@ class TestMineBoard(TestCase):
         # check that the cell itself have not increased the value
         self.assertEqual(mb.cells[y][x].no_adjacent_mines, 0)
 
+    def test_plant_mines_same_as_plant_mine(self):
+        NO_OF_ROWS, NO_OF_COLS = 7, 11
+        rnd = random.Random(7)
+        for packed in (False, True):
+            for _ in range(20):
+                coords = [(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS)]
+                mines = rnd.sample(coords, rnd.randint(0, 30))
+                one_by_one = MineBoard(NO_OF_COLS, NO_OF_ROWS, packed=packed)
+                for x, y in mines:
+                    one_by_one.plant_mine(x, y)
+
+                # place the first half individually and the rest in bulk (bulk placement has to respect old mines)
+                bulk = MineBoard(NO_OF_COLS, NO_OF_ROWS, packed=packed)
+                for x, y in mines[:len(mines) // 2]:
+                    bulk.plant_mine(x, y)
+                bulk.plant_mines(mines[len(mines) // 2:])
+
+                self.assertEqual(repr(one_by_one), repr(bulk))
+
+    def test_plant_mines_invalid(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 4
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(1, 1)
+
+        with self.assertRaises(RuntimeError):
+            mb.plant_mines([(0, 0), (1, 1)])
+
+        with self.assertRaises(RuntimeError):
+            mb.plant_mines([(0, 0), (0, 0)])
+
+        with self.assertRaises(RuntimeError):
+            mb.plant_mines([(0, mb.height)])
+
+        self.assertEqual(mb.number_of_mines, 1)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,127 @@
+import itertools
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.probability import mine_probabilities
+
+
+def brute_force_probabilities(mb: MineBoard):
+    """
+    Check every placement of the mines in the hidden cells against the uncovered cells.
+    """
+    cells = mb.cells
+    hidden = [(x, y) for y in range(mb.height) for x in range(mb.width) if not cells[y][x].uncovered]
+    uncovered = [(x, y) for y in range(mb.height) for x in range(mb.width)
+                 if cells[y][x].uncovered and not cells[y][x].has_mine]
+    mines_left = mb.number_of_mines - sum(c.uncovered and c.has_mine for row in cells for c in row)
+
+    counts = {c: 0 for c in hidden}
+    total = 0
+    for placement in itertools.combinations(hidden, mines_left):
+        mines = set(placement)
+        if all(sum((n in mines) or (cells[n[1]][n[0]].uncovered and cells[n[1]][n[0]].has_mine)
+                   for n in mb.neighbours(x, y)) == cells[y][x].no_adjacent_mines for x, y in uncovered):
+            total += 1
+            for c in placement:
+                counts[c] += 1
+    return {c: cnt / total for c, cnt in counts.items()}
+
+
+class TestMineProbabilities(TestCase):
+
+    def test_exact(self):
+        NO_OF_ROWS, NO_OF_COLS = 5, 5
+        checked = 0
+        for seed in range(40):
+            rnd = random.Random(seed)
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 4, rng=rnd)
+            safe = [(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS) if not mb.is_mine_at(x, y)]
+            for x, y in rnd.sample(safe, 3):
+                mb.uncover(x, y)
+            hidden = sum(not c.uncovered for row in mb.cells for c in row)
+            if hidden > 16:
+                continue
+
+            expected = brute_force_probabilities(mb)
+            probabilities = mine_probabilities(mb)
+            self.assertEqual(set(probabilities), set(expected))
+            for c, p in expected.items():
+                self.assertAlmostEqual(probabilities[c], p, places=9)
+            checked += 1
+        self.assertGreater(checked, 5)
+
+    def test_certain(self):
+        """
+        ■■■■■■         □□□□□□
+        ■■■■■■   -->   □111□□
+        ■■▣■■■         □1▣1□□
+        ■■■■■■         □1■1□□
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        mb.uncover(0, 0)
+
+        probabilities = mine_probabilities(mb)
+        self.assertEqual(probabilities, {(2, 2): 1.0, (2, 3): 0.0})
+
+        # nothing uncovered yet: every cell has the same probability
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 6)
+        probabilities = mine_probabilities(mb)
+        self.assertEqual(len(probabilities), NO_OF_ROWS * NO_OF_COLS)
+        for p in probabilities.values():
+            self.assertAlmostEqual(p, 6 / (NO_OF_ROWS * NO_OF_COLS))
+
+    def test_long_frontier(self):
+        # the frontier is a single group of 1500 cells (deeper than the recursion limit), with at most
+        # two constraints open at once, so it is counted exactly
+        NO_OF_COLS = 1500
+        mb = MineBoard(NO_OF_COLS, 2)
+        rnd = random.Random(3)
+        mb.plant_mines((x, 1) for x in rnd.sample(range(NO_OF_COLS), 300))
+        for x in range(NO_OF_COLS):
+            mb.cells[0][x].reveal()
+
+        probabilities = mine_probabilities(mb, time_budget=0)
+        self.assertEqual(set(probabilities), {(x, 1) for x in range(NO_OF_COLS)})
+        self.assertAlmostEqual(sum(probabilities.values()), 300)
+        # the first cell decides the rest, so the mines are known
+        self.assertTrue(all(probabilities[(x, 1)] == mb.is_mine_at(x, 1) for x in range(NO_OF_COLS)))
+
+    def test_monte_carlo(self):
+        NO_OF_ROWS, NO_OF_COLS = 16, 16
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 40, rng=random.Random(2), lazy=True, safe_neighbourhood=True)
+        mb.uncover(8, 8)
+
+        exact = mine_probabilities(mb)
+        approximate = mine_probabilities(mb, max_open_constraints=0, time_budget=0.5, rng=random.Random(1))
+        self.assertEqual(set(exact), set(approximate))
+        for c, p in exact.items():
+            self.assertGreaterEqual(approximate[c], 0)
+            self.assertLessEqual(approximate[c], 1)
+            # certain cells stay certain
+            if p in (0, 1):
+                self.assertEqual(approximate[c], p)
+        self.assertAlmostEqual(sum(exact.values()), 40)
+        self.assertAlmostEqual(sum(approximate.values()), 40)
+
+    def test_monte_carlo_unbiased(self):
+        NO_OF_ROWS, NO_OF_COLS = 4, 5
+        for seed in range(10):
+            rnd = random.Random(seed)
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 5, rng=random.Random(seed))
+            safe = [(x, y) for y in range(NO_OF_ROWS) for x in range(NO_OF_COLS) if not mb.is_mine_at(x, y)]
+            for x, y in rnd.sample(safe, 3):
+                mb.uncover(x, y)
+
+            # every group goes through the sampler; the weighted samples converge to the exact probabilities
+            exact = mine_probabilities(mb)
+            approximate = mine_probabilities(mb, max_open_constraints=0, max_samples=5000, rng=random.Random(1))
+            for c, p in exact.items():
+                self.assertAlmostEqual(approximate[c], p, delta=0.08)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
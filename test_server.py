@@ -0,0 +1,146 @@
+import asyncio
+import json
+import random
+import unittest
+from unittest import TestCase
+
+from model.cell import HIDDEN_CELL, HIDDEN_MINE
+from server import GameServer, MAX_BOARD_SIZE
+
+
+class TestGameServer(TestCase):
+
+    def test_game(self):
+        async def scenario():
+            server = GameServer()
+            response = await server.handle({"id": 1, "cmd": "new", "width": 6, "height": 4, "mines": 3, "seed": 1})
+            self.assertTrue(response["ok"])
+            # all the cells are covered
+            self.assertEqual(response["diff"], [])
+            game = response["game"]
+
+            response = await server.handle({"id": 2, "cmd": "uncover", "game": game, "x": 0, "y": 0})
+            self.assertTrue(response["ok"])
+            self.assertIn([0, 0, server.games[game].board.cells[0][0].get_representation()], response["diff"])
+            self.assertFalse(response["status"]["lost"])
+
+            # flag on an uncovered cell is an error
+            response = await server.handle({"id": 3, "cmd": "flag", "game": game, "x": 0, "y": 0})
+            self.assertFalse(response["ok"])
+            self.assertEqual(response["id"], 3)
+
+            response = await server.handle({"id": 4, "cmd": "close", "game": game})
+            self.assertTrue(response["ok"])
+            response = await server.handle({"id": 5, "cmd": "uncover", "game": game, "x": 0, "y": 0})
+            self.assertFalse(response["ok"])
+
+        asyncio.run(scenario())
+
+    def test_mines_not_shown(self):
+        async def scenario():
+            server = GameServer()
+            rnd = random.Random(7)
+            for seed in range(20):
+                response = await server.handle({"cmd": "new", "width": 9, "height": 9, "mines": 10, "seed": seed})
+                game = response["game"]
+                board = server.games[game].board
+                while not response["status"]["lost"] and not response["status"]["won"]:
+                    x, y = rnd.randrange(9), rnd.randrange(9)
+                    cmd = "chord" if board.cell_at(x, y).uncovered else "uncover"
+                    response = await server.handle({"cmd": cmd, "game": game, "x": x, "y": y})
+                    self.assertTrue(response["ok"])
+                    values = [value for _, _, value in response["diff"]]
+                    if response["status"]["lost"]:
+                        # the game is over, the mines are shown
+                        self.assertEqual(values.count(HIDDEN_MINE) + values.count("M"), 10)
+                    else:
+                        # only the revealed cells are sent
+                        self.assertNotIn(HIDDEN_MINE, values)
+                        self.assertNotIn(HIDDEN_CELL, values)
+
+            # the first move on a big board sends the revealed cells only, a flag sends nothing
+            response = await server.handle({"cmd": "new", "width": MAX_BOARD_SIZE, "height": MAX_BOARD_SIZE,
+                                            "mines": 20000, "seed": 1})
+            game = response["game"]
+            response = await server.handle({"cmd": "uncover", "game": game, "x": 0, "y": 0})
+            self.assertEqual(len(response["diff"]), response["status"]["uncovered"])
+            self.assertLess(len(response["diff"]), MAX_BOARD_SIZE * MAX_BOARD_SIZE // 4)
+            response = await server.handle({"cmd": "flag", "game": game, "x": 100, "y": 100})
+            self.assertEqual(response["diff"], [])
+
+        asyncio.run(scenario())
+
+    def test_topology(self):
+        async def scenario():
+            server = GameServer()
+            response = await server.handle({"id": 1, "cmd": "new", "width": 6, "height": 4, "mines": 3, "seed": 1,
+                                            "topology": "torus"})
+            self.assertTrue(response["ok"])
+            self.assertEqual(server.games[response["game"]].board.topology.name, "torus")
+
+            response = await server.handle({"id": 2, "cmd": "new", "topology": "sphere"})
+            self.assertFalse(response["ok"])
+
+        asyncio.run(scenario())
+
+    def test_invalid_requests(self):
+        async def scenario():
+            server = GameServer()
+            game = (await server.handle({"id": 1, "cmd": "new", "width": 6, "height": 4, "mines": 3}))["game"]
+
+            for request, error in (({"cmd": "new", "width": MAX_BOARD_SIZE + 1}, "Invalid board size"),
+                                   ({"cmd": "new", "height": 0}, "Invalid board size"),
+                                   ({"cmd": "new", "mines": 10 ** 12}, "Invalid mine count"),
+                                   ({"cmd": "new", "width": float("inf")}, "Invalid parameter"),
+                                   ({"cmd": "uncover", "game": game, "x": float("inf"), "y": 0}, "Invalid parameter"),
+                                   ({"cmd": "uncover", "game": game, "x": "a", "y": 0}, "Invalid parameter"),
+                                   ({"cmd": "uncover", "game": game, "x": 0}, "Missing parameter"),
+                                   ({"cmd": "explode", "game": game}, "Unknown command"),
+                                   ({"cmd": "explode"}, "Unknown command")):
+                response = await server.handle(request)
+                self.assertFalse(response["ok"])
+                self.assertTrue(response["error"].startswith(error), response["error"])
+
+            # valid JSON, but not an object
+            for request in ([1], "new", 5, None):
+                response = await server.handle(request)
+                self.assertFalse(response["ok"])
+                self.assertTrue(response["error"].startswith("Invalid request"), response["error"])
+
+            # the game is still there and playable
+            response = await server.handle({"cmd": "uncover", "game": game, "x": 0, "y": 0})
+            self.assertTrue(response["ok"])
+
+        asyncio.run(scenario())
+
+    def test_tcp(self):
+        async def scenario():
+            server = GameServer()
+            tcp = await asyncio.start_server(server.serve_stream, "127.0.0.1", 0)
+            port = tcp.sockets[0].getsockname()[1]
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"id": 1, "cmd": "new", "width": 9, "height": 9, "mines": 10}\n')
+            writer.write(b'not json\n')
+            writer.write(b'[1]\n')
+            writer.write(b'{"id": 2, "cmd": "explode"}\n')
+            first = json.loads(await reader.readline())
+            second = json.loads(await reader.readline())
+            # the connection survives the requests that are not objects
+            third = json.loads(await reader.readline())
+            fourth = json.loads(await reader.readline())
+            writer.close()
+            tcp.close()
+            await tcp.wait_closed()
+
+            self.assertTrue(first["ok"])
+            self.assertFalse(second["ok"])
+            self.assertFalse(third["ok"])
+            self.assertEqual(fourth["id"], 2)
+            self.assertIn("Unknown command", fourth["error"])
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+import random
+import unittest
+from unittest import TestCase
+
+from model.board import MineBoard
+from model.cell import SharedCell
+from model.probability import mine_probabilities
+from model.solver import Solver, split_components, component_solutions
+
+
+class TestSolver(TestCase):
+
+    def test_components(self):
+        constraints = [
+            (frozenset({(0, 0), (1, 0)}), 1),
+            (frozenset({(1, 0), (2, 0)}), 1),
+            (frozenset({(5, 5)}), 1),
+        ]
+        components = split_components(constraints)
+        self.assertEqual(sorted(len(c) for c in components), [1, 2])
+
+        solutions = [list(values) for _, values in component_solutions(constraints[:2])]
+        # (0, 0), (1, 0), (2, 0)
+        self.assertEqual(sorted(solutions), [[0, 1, 0], [1, 0, 1]])
+
+    def test_simple(self):
+        """
+        ■■■■■■         □□□□□□
+        ■■■■■■   -->   □111□□
+        ■■▣■■■         □1▣1□□
+        ■■■■■■         □1■1□□
+        """
+        NO_OF_ROWS, NO_OF_COLS = 4, 6
+        mb = MineBoard(NO_OF_COLS, NO_OF_ROWS)
+        mb.plant_mine(2, 2)
+        solver = Solver(mb)
+        self.assertEqual(solver.next_safe_moves(), [])
+
+        mb.uncover(0, 0)
+        print(mb)
+        self.assertEqual(solver.next_certain_mines(), [(2, 2)])
+        self.assertEqual(solver.next_safe_moves(), [(2, 3)])
+
+    def test_deductions_are_sound(self):
+        NO_OF_ROWS, NO_OF_COLS = 16, 16
+        solved = 0
+        for seed in range(20):
+            mb = MineBoard(NO_OF_COLS, NO_OF_ROWS, 40, rng=random.Random(seed), lazy=True, safe_neighbourhood=True)
+            mb.uncover(NO_OF_COLS // 2, NO_OF_ROWS // 2)
+            solver = Solver(mb)
+
+            while not mb.status.won:
+                moves = solver.next_safe_moves()
+                for x, y in solver.next_certain_mines():
+                    self.assertTrue(mb.is_mine_at(x, y))
+                if not moves:
+                    break
+                for x, y in moves:
+                    self.assertFalse(mb.is_mine_at(x, y))
+                mb.uncover_many(moves)
+
+            # a solver following the board gives the same answers as one created from scratch
+            self.assertEqual(solver.next_safe_moves(), Solver(mb).next_safe_moves())
+            self.assertFalse(mb.status.lost)
+            solved += mb.status.won
+        print(f"solved without guessing: {solved}/20")
+        self.assertGreater(solved, 0)
+
+    def test_cells_stay_shared(self):
+        mb = MineBoard(30, 16, 99, rng=random.Random(4), lazy=True, safe_neighbourhood=True)
+        mb.uncover(10, 8)
+        private = sum(type(c) is not SharedCell for row in mb.cells for c in row)
+
+        solver = Solver(mb)
+        solver.next_safe_moves()
+        solver.next_certain_mines()
+        mine_probabilities(mb)
+        # the solver and the probabilities only read the cells
+        self.assertEqual(sum(type(c) is not SharedCell for row in mb.cells for c in row), private)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)